@@ -13,38 +13,99 @@ Notes:
 - Localization: Finnish (fi) and English (en).
 """
 
-import sys, io
+import itertools
+import json
+import sys
 import time
-import feedparser
-import configparser
-from google import genai
-from jeeves_logic import JeevesMemory, check_environment, CONFIG_FILE
-from jeeves_logic import get_config_value, get_localized_text
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from jeeves_logic import JeevesMemory, check_environment, force_utf8_output, CIRCUIT_STATE_FILE
+from jeeves_logic import get_classifier, get_config_value, get_dedup_index, get_localized_text
 from jeeves_archive import JeevesArchive
-
-# Pakotetaan standarditulosteet UTF-8 muotoon
-if sys.stdout.encoding != 'utf-8':
-    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+from jeeves_feedstate import JeevesFeedState
+from jeeves_ratelimit import get_rate_limiter, estimate_tokens
+from jeeves_cache import get_summary_cache
+from jeeves_providers import HedgedProviders, Provider
+from jeeves_settings import DEFAULT_GEMINI_MODEL, get_language, get_settings
+from flow_resilience import call_with_retry, classify_error, get_breaker, read_settings, QUOTA
+
+# [FEEDS]-lohkon avaimet, jotka ovat asetuksia eivätkä syötteitä
+FEED_OPTION_KEYS = ('concurrency', 'timeout')
+DEFAULT_FEED_CONCURRENCY = 4
+DEFAULT_FEED_TIMEOUT = 20.0
+FEED_USER_AGENT = "Jeeves/3.1 (+https://github.com/lahtis/Flow)"
+
+# [BATCH] size: montako otsikkoa yhteen Gemini-pyyntöön (1 = eräajo pois)
+DEFAULT_BATCH_SIZE = 1
+MAX_OUTPUT_PER_ITEM = 500
+
+# Eräajon vastauksen rakenne: Gemini ohjataan tähän muotoon ja tulos tarkistetaan vielä itse
+BATCH_RESPONSE_SCHEMA = {
+    "type": "ARRAY",
+    "items": {
+        "type": "OBJECT",
+        "properties": {"id": {"type": "INTEGER"}, "summary": {"type": "STRING"}},
+        "required": ["id", "summary"]
+    }
+}
+
+def parse_batch_response(text, expected_ids):
+    """Palauttaa {id: tiivistelmä} vain skeeman mukaisille, odotetuille kohteille."""
+    text = (text or "").strip()
+    if text.startswith("```"):
+        # Malli palautti koodilohkon JSON-tilasta huolimatta
+        text = text.strip("`").strip()
+        if text.lower().startswith("json"):
+            text = text[4:]
+    try:
+        items = json.loads(text)
+    except ValueError:
+        return {}
+    if not isinstance(items, list):
+        return {}
+
+    results = {}
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        summary = item.get("summary")
+        try:
+            item_id = int(item.get("id"))
+        except (TypeError, ValueError):
+            continue
+        if item_id in expected_ids and item_id not in results and isinstance(summary, str) and summary.strip():
+            results[item_id] = summary.strip()
+    return results
 
 class JeevesFetcher:
-    def __init__(self):
+    def __init__(self, memory=None, config=None):
+        """memory/config: jaetut oliot (esim. JeevesPipeline), muuten luodaan omat."""
         if not check_environment():
             sys.exit()
 
-        self.config = configparser.ConfigParser()
-        self.config.read(CONFIG_FILE, encoding='utf-8')
+        if config is None:
+            config = get_settings().config
+        self.config = config
 
-        self.lang = self.config['SETTINGS'].get('language', 'en').lower()
-        self.memory = JeevesMemory()
+        self.lang = get_language(self.config)
+        self.memory = memory or JeevesMemory()
 
-        self.api_key = self.config['SETTINGS'].get('api_key')
+        self.api_key = self.config.get('SETTINGS', 'api_key', fallback=None)
         self.model = get_config_value("gemini_model", self.lang) or \
-                     self.config['MODELS'].get('gemini', 'gemini-2.0-flash')
+                     self.config.get('MODELS', 'gemini', fallback=DEFAULT_GEMINI_MODEL)
 
         self.pending_msg = get_localized_text("pending", self.lang) or "Waiting for analysis."
         self.ai_instruction = get_localized_text("ai_instruction", self.lang)
 
+        # Raskas SDK tuodaan vasta, kun hakija oikeasti luodaan
+        from google import genai
         self.client = genai.Client(api_key=self.api_key)
+        self.limiter = get_rate_limiter("gemini", self.model, self.config)
+        self.cache = get_summary_cache(self.config)
+        self.breaker = get_breaker(self.limiter.name, CIRCUIT_STATE_FILE, read_settings(self.config))
+        self.batch_lock = threading.Lock()
+        self._mirror_instance = None
+        self.batch_stats = {"requests": 0, "items": 0, "fallbacks": 0}
 
     def run(self):
         self.fetch_all_feeds()
@@ -56,12 +117,90 @@ class JeevesFetcher:
 
         self.process_pending_summaries()
 
+    def _feed_settings(self):
+        """Lukee [FEEDS]-lohkon syötteet sekä rinnakkaisuus- ja aikakatkaisuasetukset."""
+        section = self.config['FEEDS']
+        try:
+            concurrency = max(1, section.getint('concurrency', fallback=DEFAULT_FEED_CONCURRENCY))
+        except ValueError:
+            concurrency = DEFAULT_FEED_CONCURRENCY
+        try:
+            timeout = section.getfloat('timeout', fallback=DEFAULT_FEED_TIMEOUT)
+        except ValueError:
+            timeout = DEFAULT_FEED_TIMEOUT
+
+        feeds = [(name, url) for name, url in section.items()
+                 if name not in FEED_OPTION_KEYS and url]
+        return feeds, concurrency, timeout
+
+    def _download_feed(self, url, timeout, conditional_headers=None):
+        """Lataa ja jäsentää yhden syötteen. Aikakatkaisu koskee koko latausta.
+
+        Jos palvelin vastaa 304 Not Modified, jäsennys ohitetaan kokonaan
+        ja palautetaan tulos, jonka 'feed' on None.
+        """
+        # HTTP- ja RSS-kirjastot tuodaan vasta ensimmäisellä latauksella
+        import urllib.error
+        import urllib.request
+        import feedparser
+
+        started = time.monotonic()
+        request_headers = {'User-Agent': FEED_USER_AGENT}
+        request_headers.update(conditional_headers or {})
+        request = urllib.request.Request(url, headers=request_headers)
+        try:
+            response = urllib.request.urlopen(request, timeout=timeout)
+        except urllib.error.HTTPError as e:
+            if e.code == 304:
+                return {'status': 304, 'feed': None}
+            raise
+
+        with response:
+            headers = {k.lower(): v for k, v in response.headers.items()}
+            chunks = []
+            while True:
+                chunk = response.read(65536)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+                if time.monotonic() - started > timeout:
+                    raise TimeoutError(f"feed download exceeded {timeout:.0f}s")
+
+        body = b"".join(chunks)
+        return {
+            'status': 200,
+            'feed': feedparser.parse(body, response_headers=headers),
+            'etag': headers.get('etag'),
+            'last_modified': headers.get('last-modified'),
+            'size': len(body)
+        }
+
+    def _fetch_feeds_concurrently(self, feeds, concurrency, timeout, feed_state):
+        """Hakee kaikki syötteet rajatulla säiepoolilla.
+
+        Palauttaa tulokset samassa järjestyksessä kuin jeeves.conf listaa ne,
+        jotta muistiin yhdistäminen on deterministinen.
+        """
+        results = [None] * len(feeds)
+        with ThreadPoolExecutor(max_workers=min(concurrency, len(feeds))) as pool:
+            futures = {pool.submit(self._download_feed, url, timeout,
+                                   feed_state.conditional_headers(url)): i
+                       for i, (_, url) in enumerate(feeds)}
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    results[i] = (future.result(), None)
+                except Exception as e:
+                    results[i] = (None, e)
+        return results
+
     def fetch_all_feeds(self):
         if 'FEEDS' not in self.config:
             return
 
         from jeeves_archive import JeevesArchive
         archive_manager = JeevesArchive()
+        feed_state = JeevesFeedState()
 
         fetch_label = get_localized_text("ui.fetching_news", self.lang) or "Fetching news"
         fetch_label = fetch_label.replace("[*] Jeeves: ", "").strip()
@@ -69,41 +208,119 @@ class JeevesFetcher:
         added_label = get_localized_text("added_news", self.lang) or "Added {} items."
         added_label = added_label.replace("[+] Jeeves: ", "").strip()
 
-        # --- TÄSSÄ ON KORJAUS: MUISTILISTA DUPLIKAATEILLE ---
-        seen_titles = set()
-
-        for feed_name, url in self.config['FEEDS'].items():
-            if not url: continue
-
-            category_label = "Security" if "security" in feed_name.lower() else "Linux"
-            display_name = feed_name.replace('_', ' ').title()
-
-            print(f"[*] Jeeves: {fetch_label} ({display_name})...")
-
-            try:
-                feed = feedparser.parse(url)
-                added = 0
-                for entry in feed.entries[:5]: # Tarkistetaan 5 uusinta
-                    # 1. ESTETÄÄN SAMAN AJON DUPLIKAATIT (esim. useat TF2 päivitykset)
-                    if entry.title in seen_titles:
-                        continue
-                    seen_titles.add(entry.title)
-
-                    # 2. Tarkistetaan onko uutinen jo muistissa (memory.json)
-                    already_in_memory = any(e['url'] == entry.link for e in self.memory.data['archive'])
-
-                    # 3. Tarkistetaan onko uutinen jo arkistossa (news_archive.jsonl)
-                    already_in_archive = archive_manager.is_already_archived(entry.link)
+        feeds, concurrency, timeout = self._feed_settings()
+        if not feeds:
+            return
 
-                    if not already_in_memory and not already_in_archive:
-                        self.memory.add_entry(entry.title, self.pending_msg, entry.link, category_label)
-                        added += 1
+        print(f"[*] Jeeves: {fetch_label} ({len(feeds)} feeds, {concurrency} parallel)...")
+        started = time.monotonic()
+        results = self._fetch_feeds_concurrently(feeds, concurrency, timeout, feed_state)
+        print(f"[*] Jeeves: Feeds fetched in {time.monotonic() - started:.1f}s.")
 
-                if added > 0:
-                    print(f"[+] Jeeves: {added_label.format(added)}")
+        # --- TÄSSÄ ON KORJAUS: MUISTILISTA DUPLIKAATEILLE ---
+        seen_titles = set()
+        classifier = get_classifier()
+        # Lähes samat uutiset (toinen syöte, muutettu otsikko) liitetään aiempaan analyysiin
+        dedup = get_dedup_index(self.memory)
+
+        # Yhdistetään tulokset konfiguraation järjestyksessä yhtenä tallennuseränä
+        with self.memory.batch():
+            for (feed_name, url), (result, error) in zip(feeds, results):
+                display_name = feed_name.replace('_', ' ').title()
+
+                if error is not None:
+                    print(f"[!] Jeeves: Error fetching {display_name}: {error}")
+                    continue
+
+                # 304 Not Modified: ei jäsennystä eikä duplikaattitarkistuksia
+                if result['status'] == 304:
+                    feed_state.record_not_modified(url)
+                    hits, misses = feed_state.stats(url)
+                    print(f"[=] Jeeves: {display_name}: not modified (hits {hits} / misses {misses})")
+                    continue
 
-            except Exception as e:
-                print(f"[!] Jeeves: Error fetching {display_name}: {e}")
+                try:
+                    fresh = []
+                    feed = result['feed']
+                    known_ids = feed_state.seen_ids(url)
+                    latest = feed.entries[:5] # Tarkistetaan 5 uusinta
+                    entry_ids = [entry.get('id') or entry.link for entry in latest]
+
+                    for entry, entry_id in zip(latest, entry_ids):
+                        # 1. ESTETÄÄN SAMAN AJON DUPLIKAATIT (esim. useat TF2 päivitykset)
+                        if entry.title in seen_titles:
+                            continue
+                        seen_titles.add(entry.title)
+
+                        # Aiemmalla ajolla jo käsitelty merkintä ohitetaan suoraan
+                        if entry_id in known_ids:
+                            continue
+
+                        # 2. Tarkistetaan onko uutinen jo muistissa (memory.json)
+                        already_in_memory = self.memory.has_url(entry.link)
+
+                        # 3. Tarkistetaan onko uutinen jo arkistossa (news_archive.jsonl)
+                        already_in_archive = archive_manager.is_already_archived(entry.link)
+
+                        if not already_in_memory and not already_in_archive \
+                                and all(entry.link != f.link for f in fresh):
+                            if dedup is not None and self._link_near_duplicate(dedup, entry, display_name, archive_manager):
+                                continue
+                            fresh.append(entry)
+
+                    # Koko syötteen uudet otsikot luokitellaan yhdellä kertaa (jeeves_classifier)
+                    categories = classifier.classify_many((entry.title, feed_name) for entry in fresh)
+                    for entry, category in zip(fresh, categories):
+                        self.memory.add_entry(entry.title, self.pending_msg, entry.link, category)
+                    added = len(fresh)
+
+                    feed_state.record_fetch(url, result['etag'], result['last_modified'],
+                                            entry_ids, result['size'])
+                    hits, misses = feed_state.stats(url)
+                    print(f"[*] Jeeves: {display_name}: fetched {result['size'] / 1024:.1f} KB (hits {hits} / misses {misses})")
+
+                    if added > 0:
+                        print(f"[+] Jeeves: {display_name}: {added_label.format(added)}")
+
+                except Exception as e:
+                    print(f"[!] Jeeves: Error fetching {display_name}: {e}")
+
+        feed_state.save()
+        if dedup is not None:
+            dedup.commit()
+            print(f"[*] Jeeves: {dedup.stats_line()}")
+        print(f"[*] Jeeves: Feed cache: {feed_state.run_hits} hits, {feed_state.run_misses} misses, "
+              f"~{feed_state.run_saved_bytes / 1024:.1f} KB not downloaded.")
+
+    def _link_near_duplicate(self, dedup, entry, display_name, archive):
+        """True, jos otsikko on lähes sama kuin aiempi, analysoitu uutinen; silloin sitä ei jonoteta.
+
+        Aiempi uutinen haetaan muistista ja sen jälkeen arkistosta (dedup-ikkuna on
+        pidempi kuin muistin rotaatio). Jos sitä ei löydy kummastakaan, otsikko
+        jonotetaan analyysiin tavalliseen tapaan.
+        """
+        if dedup.canonical(entry.link):
+            return True
+        feed_summary = entry.get('summary', '')
+        duplicate = dedup.find(entry.title, feed_summary, entry.link)
+        if duplicate is None:
+            # Uusi tarina: seuraavat syötteet vertautuvat jo tähän (samassa ajossa)
+            dedup.add(entry.link, entry.title, feed_summary, commit=False)
+            return False
+        if self.memory.link_duplicate(duplicate.url, entry.link, entry.title) is not None:
+            where = "linked to the earlier analysis"
+        elif archive.find(duplicate.url) is not None:
+            # Arkistoa ei muokata (segmentit ovat vain lisättäviä): viittaus jää aliakseen
+            where = "already analysed in the archive"
+        else:
+            # Aiempaa analyysiä ei ole enää tallessa: tämä versio analysoidaan,
+            # ja myöhemmät toisinnot vertautuvat nyt siihen
+            dedup.add(entry.link, entry.title, feed_summary, commit=False)
+            return False
+        dedup.add_alias(entry.link, duplicate.url, duplicate.similarity)
+        print(f"[=] Jeeves: {display_name}: '{entry.title}' ~ '{duplicate.title}' "
+              f"({duplicate.similarity:.2f}), {where}.")
+        return True
 
     def sync_from_metadata(self, metadata_path):
         """Kopioi kaikki valmiit uutiset metadatasta arkistoon, jos ne puuttuvat sieltä."""
@@ -128,11 +345,7 @@ class JeevesFetcher:
         from jeeves_archive import JeevesArchive
         archive_manager = JeevesArchive()
 
-        pending_fi = get_localized_text("pending", "fi")
-        pending_en = get_localized_text("pending", "en")
-
-        to_analyze = [e for e in self.memory.data['archive']
-                      if e['summary'] in [pending_fi, pending_en]]
+        to_analyze = self.memory.get_pending()
 
         if not to_analyze:
             no_work = get_localized_text("ui.no_pending_work", self.lang)
@@ -146,49 +359,76 @@ class JeevesFetcher:
         quota_err_txt = quota_err_txt.replace("[!] Jeeves: ", "").strip()
         done_txt = get_localized_text("analysis_done", self.lang) or "Done."
 
-        for entry in to_analyze:
-            print(f"[*] Jeeves: {analyzing_txt}: {entry['title']}...")
-            summary = self.summarize_with_ai(entry['title'], entry['url'])
+        # Kiinteiden taukojen sijaan kiintiö ohjaa tahtia: rajattu joukko
+        # työntekijöitä, joista jokainen odottaa token bucketin lupaa
+        limiter = self.limiter
+        print(f"[*] Jeeves: {limiter.name}: {limiter.rpm} req/min, {limiter.tpm} tokens/min, {limiter.workers} workers")
+        providers = self._providers()
+        if providers.secondary is not None:
+            mirror_act_msg = get_localized_text("activating_mirror", self.lang) or "Activating Mirror..."
+            mirror_act_msg = mirror_act_msg.replace("[*] Jeeves: ", "").strip()
+            print(f"[*] Jeeves: {mirror_act_msg} (hedge after {providers.hedge_delay():.1f}s)")
+
+        pool = ThreadPoolExecutor(max_workers=limiter.workers)
+        batch_size = self._batch_size()
+        futures = {}
+        if batch_size > 1:
+            # Eräajo: kategorioittain enintään batch_size otsikkoa per pyyntö
+            for chunk in self._plan_batches(to_analyze, batch_size):
+                future = pool.submit(self._summarize_chunk, chunk, providers)
+                for entry in chunk:
+                    futures[id(entry)] = future
+        else:
+            for entry in to_analyze:
+                futures[id(entry)] = pool.submit(providers.ask, entry['title'], entry['url'])
+
+        def result_for(entry):
+            result = futures[id(entry)].result()
+            return result[id(entry)] if batch_size > 1 else result
 
-            # Virheenkäsittely ja Groq-peiliin vaihtaminen
-            if "RESOURCE_EXHAUSTED" in summary or "429" in summary:
-                print(f"[!] Jeeves: {quota_err_txt}")
-                try:
-                    from jeeves_mirror import JeevesMirror
-                    mirror = JeevesMirror()
-                    if mirror.api_key:
-                        mirror_act_msg = get_localized_text("activating_mirror", self.lang) or "Activating Mirror..."
-                        mirror_act_msg = mirror_act_msg.replace("[*] Jeeves: ", "").strip()
-                        print(f"[*] Jeeves: {mirror_act_msg}")
-
-                        summary = mirror.ask_groq(entry['title'], entry['url'])
-                        if not summary: break
-                    else:
-                        break
-                except Exception as mirror_err:
-                    print(f"[!] Jeeves: Mirror failed: {mirror_err}")
-                    break
+        try:
+            with self.memory.batch():
+                # Tulokset käsitellään alkuperäisessä järjestyksessä
+                for entry in to_analyze:
+                    print(f"[*] Jeeves: {analyzing_txt}: {entry['title']}...")
+                    summary, provider_name, errors = result_for(entry)
+
+                    if not summary:
+                        # Kumpikaan tarjoaja ei vastannut: uutinen jää odottamaan
+                        for name, error in errors:
+                            print(f"[!] Jeeves: {name}: {error}")
+                        # Kaikkien kiintiö on täynnä (katkaisimet auki): loput ohitettaisiin heti
+                        if errors and all(classify_error(e) == QUOTA for _, e in errors):
+                            print(f"[!] Jeeves: {quota_err_txt}")
+                            break
+                        continue
 
-            # Päivitetään aktiivinen muisti
-            entry['summary'] = summary
-            self.memory._save_data()
+                    if provider_name != providers.primary.name:
+                        print(f"[*] Jeeves: ({provider_name})")
 
-            # --- UUSI: TALLENNUS PYSYVÄÄN ARKISTOON ---
-            # Tallennetaan vain, jos vastaus ei ole virheilmoitus
-            if summary and "429" not in str(summary) and "RESOURCE_EXHAUSTED" not in str(summary):
-                archive_manager.save_to_archive(entry)
+                    # Päivitetään aktiivinen muisti
+                    entry['summary'] = summary
+                    self.memory.update_entry(entry)
 
-                # Haetaan lokalisoitu teksti
-                archive_label = get_localized_text("ui.analysis_archived", self.lang) or "Analysis archived successfully."
-                print(f"[+] Jeeves: {archive_label}")
+                    # --- UUSI: TALLENNUS PYSYVÄÄN ARKISTOON ---
+                    archive_manager.save_to_archive(entry)
 
-            print(f"[+] Jeeves: {done_txt}")
+                    # Haetaan lokalisoitu teksti
+                    archive_label = get_localized_text("ui.analysis_archived", self.lang) or "Analysis archived successfully."
+                    print(f"[+] Jeeves: {archive_label}")
 
-            # Kohtelias odotus AI-kutsujen välillä
-            if "429" not in str(summary):
-                time.sleep(15)
-            else:
-                time.sleep(1)
+                    print(f"[+] Jeeves: {done_txt}")
+        finally:
+            # Keskeytyksen jälkeen jonossa olevia kutsuja ei enää lähetetä
+            pool.shutdown(wait=False, cancel_futures=True)
+            providers.close()
+
+        print(f"[*] Jeeves: {self.cache.stats_line()}")
+        print(f"[*] Jeeves: {providers.stats_line()}")
+        if batch_size > 1:
+            stats = self.batch_stats
+            print(f"[*] Jeeves: Batches: {stats['requests']} requests for {stats['items']} items "
+                  f"(size {batch_size}), {stats['fallbacks']} single-item fallbacks")
 
         work_finished = get_localized_text("ui.work_finished", self.lang)
         print(f"\n[*] Jeeves: {work_finished}")
@@ -196,6 +436,104 @@ class JeevesFetcher:
         # Lopuksi ajetaan vanha rotaatio, jos tarpeen
         self._handle_archive_rotation()
 
+    def _providers(self):
+        """Gemini ensisijaisena; Groq-peili varmistajana, jos sille on avain."""
+        primary = Provider(self.limiter.name, self._generate, self.limiter.workers)
+        secondary = None
+        mirror = self._mirror()
+        if mirror is not None:
+            secondary = Provider(mirror.limiter.name, mirror.complete, mirror.limiter.workers)
+        return HedgedProviders(primary, secondary, self.config)
+
+    def _mirror(self):
+        """Groq-peili luodaan kerran ja vain, jos sille on avain."""
+        if self._mirror_instance is None and 'API_KEYS' in self.config and self.config['API_KEYS'].get('groq'):
+            from jeeves_mirror import JeevesMirror
+            mirror = JeevesMirror(memory=self.memory, config=self.config)
+            if mirror.api_key:
+                self._mirror_instance = mirror
+        return self._mirror_instance
+
+    # --- ERÄAJO ---
+
+    def _batch_size(self):
+        try:
+            return max(1, self.config.getint('BATCH', 'size', fallback=DEFAULT_BATCH_SIZE))
+        except ValueError:
+            print("[!] Jeeves: Invalid [BATCH] size, batching disabled.")
+            return DEFAULT_BATCH_SIZE
+
+    def _plan_batches(self, entries, size):
+        """Ryhmittelee uutiset kategorioittain ja pilkkoo ne enintään size kokoisiksi eriksi."""
+        groups = {}
+        for entry in entries:
+            groups.setdefault(entry.get('category', ''), []).append(entry)
+        return [group[i:i + size] for group in groups.values() for i in range(0, len(group), size)]
+
+    def _generate_batch(self, entries):
+        """Yksi Gemini-kutsu usealle uutiselle. Palauttaa {numero (1..n): tiivistelmä}."""
+        p_title = get_localized_text("prompt_title", self.lang) or "News"
+        p_source = get_localized_text("prompt_source", self.lang) or "Source"
+        batch_instruction = get_localized_text("batch_instruction", self.lang) or \
+            'Summarize each numbered news item separately. Answer ONLY with a JSON array [{"id": <number>, "summary": "<summary>"}].'
+
+        lines = [self.ai_instruction, "", batch_instruction, ""]
+        for number, entry in enumerate(entries, 1):
+            lines.append(f"[{number}] {p_title}: {entry['title']}")
+            lines.append(f"    {p_source}: {entry['url']}")
+        prompt = "\n".join(lines)
+
+        def request():
+            self.limiter.acquire(estimate_tokens(prompt, max_output=MAX_OUTPUT_PER_ITEM * len(entries)))
+            return self.client.models.generate_content(
+                model=self.model,
+                contents=prompt,
+                config={"response_mime_type": "application/json", "response_schema": BATCH_RESPONSE_SCHEMA}
+            )
+
+        response = call_with_retry(request, self.breaker, on_retry=self._report_retry)
+        results = parse_batch_response(response.text, set(range(1, len(entries) + 1)))
+        for number, summary in results.items():
+            entry = entries[number - 1]
+            self.cache.put(entry['url'], entry['title'], self.model, self.ai_instruction, self.lang, summary)
+        return results
+
+    def _summarize_chunk(self, entries, providers):
+        """Eräkutsu yhdelle erälle; puuttuvat tai virheelliset kohteet haetaan yksitellen.
+
+        Palauttaa {id(entry): (tiivistelmä, tarjoaja, virheet)} kuten HedgedProviders.ask.
+        """
+        results = {}
+        pending = []
+        for entry in entries:
+            cached = self.cache.get(entry['url'], entry['title'], self.model, self.ai_instruction, self.lang)
+            if cached:
+                results[id(entry)] = (cached, self.limiter.name, [])
+            else:
+                pending.append(entry)
+
+        if len(pending) > 1:
+            try:
+                batch = self._generate_batch(pending)
+            except Exception as e:
+                print(f"[!] Jeeves: Batch of {len(pending)} failed ({classify_error(e)}): {e}")
+                batch = {}
+            for number, entry in enumerate(pending, 1):
+                if number in batch:
+                    results[id(entry)] = (batch[number], self.limiter.name, [])
+            with self.batch_lock:
+                self.batch_stats["requests"] += 1
+                self.batch_stats["items"] += len(batch)
+                self.batch_stats["fallbacks"] += len(pending) - len(batch)
+
+        for entry in pending:
+            if id(entry) not in results:
+                results[id(entry)] = providers.ask(entry['title'], entry['url'])
+        return results
+
+    def _report_retry(self, error, kind, delay):
+        print(f"[*] Jeeves: {self.limiter.name}: {kind} error, retrying in {delay:.1f}s ({error})")
+
     def _handle_archive_rotation(self):
         """Apumetodi arkiston hallintaan, sir."""
         try:
@@ -214,24 +552,99 @@ class JeevesFetcher:
 
 
     def summarize_with_ai(self, title, url):
+        """Palauttaa tiivistelmän tai None (virhe tulostetaan, ei tallenneta tiivistelmäksi)."""
+        try:
+            return self._generate(title, url)
+        except Exception as e:
+            print(f"[!] Jeeves: {self.limiter.name}: {classify_error(e)} error: {e}")
+            return None
+
+    def _build_prompt(self, title, url):
         p_title = get_localized_text("prompt_title", self.lang) or "News"
         p_source = get_localized_text("prompt_source", self.lang) or "Source"
 
-        prompt = (
+        return (
             f"{self.ai_instruction}\n\n"
             f"{p_title}: {title}\n"
             f"{p_source}: {url}"
         )
 
-        try:
-            response = self.client.models.generate_content(
+    def _generate(self, title, url, call=None):
+        """Gemini-kutsu; nostaa poikkeuksen virheestä. call: ProviderCall (peruutus ja ajoitus)."""
+        prompt = self._build_prompt(title, url)
+
+        # Sama uutinen samoilla ohjeilla ja mallilla on jo analysoitu: ei API-kutsua
+        cached = self.cache.get(url, title, self.model, self.ai_instruction, self.lang)
+        if cached:
+            return cached
+
+        def request():
+            self.limiter.acquire(estimate_tokens(prompt))
+            if call is not None and not call.send():
+                return None
+            return self.client.models.generate_content(
                 model=self.model,
                 contents=prompt
             )
-            return response.text.strip()
+
+        # Katkaisin ohittaa kutsun heti, jos kiintiön tiedetään olevan täynnä
+        response = call_with_retry(request, self.breaker, on_retry=self._report_retry)
+        if response is None:
+            return None
+        summary = response.text.strip()
+        self.cache.put(url, title, self.model, self.ai_instruction, self.lang, summary)
+        return summary
+
+    def stream_summary(self, title, url, on_chunk):
+        """Striimaa tiivistelmän: on_chunk(teksti) kutsutaan jokaiselle palaselle. Palauttaa koko tekstin."""
+        cached = self.cache.get(url, title, self.model, self.ai_instruction, self.lang)
+        if cached:
+            on_chunk(cached)
+            return cached
+
+        prompt = self._build_prompt(title, url)
+
+        def request():
+            self.limiter.acquire(estimate_tokens(prompt))
+            stream = iter(self.client.models.generate_content_stream(model=self.model, contents=prompt))
+            # Ensimmäinen palanen luetaan tässä, jotta yhteysvirheet kulkevat katkaisimen kautta
+            return next(stream, None), stream
+
+        first, stream = call_with_retry(request, self.breaker, on_retry=self._report_retry)
+        parts = []
+        for chunk in itertools.chain([first] if first is not None else [], stream):
+            text = getattr(chunk, "text", None)
+            if text:
+                parts.append(text)
+                on_chunk(text)
+
+        summary = "".join(parts).strip()
+        if summary:
+            self.cache.put(url, title, self.model, self.ai_instruction, self.lang, summary)
+        return summary
+
+    def stream_with_failover(self, title, url, on_chunk):
+        """Gemini-striimi; jos se epäonnistuu ennen ensimmäistä palasta, Groq-peili striimaa.
+
+        Palauttaa (tiivistelmä, tarjoajan nimi).
+        """
+        received = []
+
+        def forward(text):
+            received.append(text)
+            on_chunk(text)
+
+        try:
+            return self.stream_summary(title, url, forward), self.limiter.name
         except Exception as e:
-            return str(e)
+            # Kesken katkennutta vastausta ei jatketa toisen mallin tekstillä
+            mirror = self._mirror()
+            if received or mirror is None:
+                raise
+            print(f"[!] Jeeves: {self.limiter.name}: {classify_error(e)} error, streaming from the mirror: {e}")
+            return mirror.stream_summary(title, url, on_chunk), mirror.limiter.name
 
 if __name__ == "__main__":
+    force_utf8_output()
     fetcher = JeevesFetcher()
     fetcher.run()
@@ -11,71 +11,64 @@ Source: https://github.com/lahtis/Flow/tree/main/Ask%20Jeeves
 Description:
     Main orchestrator for the Jeeves system. Manages the workflow between
     RSS fetching (Gemini), Failover (Groq Mirror), and Archiving.
+    All stages run in this same process through jeeves_pipeline.JeevesPipeline.
+
+Usage:
+    python jeeves.py [--full]
+    python jeeves.py search <words> [--limit N] [--category NAME] [--reindex]
 """
 
-import subprocess
 import sys
-import configparser
-import os
-from jeeves_logic import check_environment, JeevesMemory, get_localized_text, CONFIG_FILE
-from jeeves_archive import JeevesArchive
-
-
-# Tuodaan arkistointi mukaan tarkistuksia varten
-from jeeves_archive import JeevesArchive
-
-def main():
-    config = configparser.ConfigParser()
-    config.read(CONFIG_FILE, encoding='utf-8')
-    lang = config['SETTINGS'].get('language', 'en').lower()
-
-    # Alustetaan muisti ja arkisto
-    memory = JeevesMemory()
-    archive = JeevesArchive()
-
-    # 3. Käynnistys
-    print(get_localized_text("starting_routines", lang) or "[*] Starting routines...")
-
-    # 4. Varmistus ja Gemini
+import time
+from datetime import datetime
+from jeeves_logic import force_utf8_output, check_environment, get_search_index, build_search_index
+
+def option(args, name, default=None):
+    """Palauttaa '--name arvo' -parin arvon ja poistaa parin args-listasta."""
+    if name in args:
+        i = args.index(name)
+        if i + 1 < len(args):
+            value = args[i + 1]
+            del args[i:i + 2]
+            return value
+        del args[i]
+    return default
+
+def search(args):
+    """Kokotekstihaku kaikesta tallennetusta (jeeves_search.py)."""
     check_environment()
-    print(get_localized_text("fetching_news_gemini", lang) or "[*] Fetching news...")
-    subprocess.run([sys.executable, "ask_jeeves.py"])
+    limit = int(option(args, "--limit", 20))
+    category = option(args, "--category")
+    if "--reindex" in args:
+        args.remove("--reindex")
+        index = get_search_index()
+        index.clear()
+        build_search_index(index)
+    index = get_search_index(build=True)
+    if not args:
+        print(f"[*] Jeeves: {index.count()} items in the search index, sir.")
+        return
+
+    started = time.perf_counter()
+    hits = index.search(" ".join(args), limit=limit, category=category)
+    elapsed = (time.perf_counter() - started) * 1000
+    print(f"[*] Jeeves: {len(hits)} results in {elapsed:.1f} ms, sir.\n")
+    for n, hit in enumerate(hits, 1):
+        day = datetime.fromtimestamp(float(hit.timestamp)).strftime('%Y-%m-%d') if hit.timestamp else "----------"
+        print(f"{n:>3}. {day} [{hit.category}] {hit.title}")
+        print(f"     {' '.join(hit.snippet.split())}")
+        print(f"     {hit.url}\n")
 
-    # --- UUSI VAIHE: SYNKRONOINTI ARKISTOON ---
-    # Tämä varmistaa, että myös aiemmin muistiin jääneet uutiset menevät arkistoon
-    metadata_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resources", "jeeves_metadata.json")
-    synced_count = archive.sync_from_metadata(metadata_path)
-    if synced_count > 0:
-        print(f"[*] Jeeves: Herra, synkronoitu {synced_count} uutta uutista arkistoon.")
-    # -----------------------------------------
-
-    # Päivitetään muisti-olio
-    memory = JeevesMemory()
-
-    # 5. Rästitunnistus (Varmistettu versio)
-    p_fi = get_localized_text("pending", "fi")
-    p_en = get_localized_text("pending", "en")
-
-    pending = [
-        e for e in memory.data['archive']
-        if e['summary'] in [p_fi, p_en] or len(e['summary']) < 100 or "quota" in e['summary'].lower()
-    ]
-
-    if pending:
-        p_msg = get_localized_text("pending_count_msg", lang) or "summaries are still pending."
-        m_msg = get_localized_text("activating_mirror", lang) or "[*] Activating Groq Mirror, sir..."
-
-        print(f"[*] Jeeves: {len(pending)} {p_msg}")
-        print(m_msg)
-
-        # AJETAAN PEILI
-        subprocess.run([sys.executable, "jeeves_mirror.py"])
-        memory = JeevesMemory()
-
-    # 6. Loppuraportti
-    report_ready_txt = get_localized_text('report_ready', lang) or "Report ready:"
-    print(f"\n{report_ready_txt}")
-    subprocess.run([sys.executable, "jeeves_logic.py"])
+def main():
+    force_utf8_output()
+    if len(sys.argv) > 1 and sys.argv[1] == "search":
+        search(sys.argv[2:])
+        return
+
+    from jeeves_pipeline import JeevesPipeline
+    # fetch -> analyze -> sync -> failover -> report, jaetulla muistilla
+    pipeline = JeevesPipeline(show_full="--full" in sys.argv)
+    pipeline.run()
 
 if __name__ == "__main__":
     main()
@@ -11,7 +11,13 @@ Source: https://github.com/lahtis/Flow/tree/main/Ask%20Jeeves
 Description:
     Fetches, analyzes, and archives news using AI (Gemini/Groq).
     Uses JSONL (JSON Lines) for persistent storage to ensure
-    efficient data appending and resilience.
+    efficient data appending and resilience. The archive is a folder of
+    day-partitioned segments (archive/news_archive/YYYY-MM-DD.jsonl, by
+    'archived_at') with a manifest; a legacy news_archive.jsonl is split
+    into segments once. A SQLite sidecar index (news_archive.jsonl.idx)
+    holds a 64-bit hash of every archived URL for O(1) duplicate checks.
+    compact() seals old segments into gzip blocks ([ARCHIVE] in
+    jeeves.conf, see jeeves_segments.py).
 
 Key Features:
     - Persistent 'Memory': Prevents re-analyzing old news.
@@ -24,10 +30,33 @@ Dependencies:
 
 import json
 import os
+import sqlite3
 from datetime import datetime
+from jeeves_segments import SegmentStore, url_key, record_key, cutoff_day, get_compaction_settings
+
+# URL-indeksin sivutiedoston pääte ja skeemaversio
+INDEX_SUFFIX = ".idx"
+INDEX_VERSION = 2
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+def archived_day(entry):
+    """Arkistorivin päivä tallennusajasta (vanhoissa riveissä: tänään)."""
+    archived_at = entry.get("archived_at")
+    if isinstance(archived_at, str) and len(archived_at) >= 10:
+        return archived_at[:10]
+    return datetime.now().strftime("%Y-%m-%d")
+
+def archived_time(entry):
+    """'archived_at' unix-aikaleimana lohkohakemistoa varten (strptime on tähän liian hidas)."""
+    s = entry.get("archived_at")
+    try:
+        return datetime(int(s[0:4]), int(s[5:7]), int(s[8:10]),
+                        int(s[11:13]), int(s[14:16]), int(s[17:19])).timestamp()
+    except (TypeError, ValueError):
+        return None
 
 class JeevesArchive:
-    def __init__(self, filename="news_archive.jsonl"):
+    def __init__(self, filename="news_archive.jsonl", index_search=True):
         # Määritetään polku archive-kansioon
         base_dir = os.path.dirname(os.path.abspath(__file__))
         archive_dir = os.path.join(base_dir, "archive")
@@ -37,30 +66,222 @@ class JeevesArchive:
             os.makedirs(archive_dir)
             print(f"[*] Created missing archive directory: {archive_dir}")
 
+        # news_archive.jsonl -> segmentit kansiossa news_archive/
         self.path = os.path.join(archive_dir, filename)
+        self.folder = os.path.splitext(self.path)[0]
+        self.store = SegmentStore(self.folder, archived_day, archived_time, record_key)
+        self.index_path = self.path + INDEX_SUFFIX
+        self._index = None
+        self._signature = None
+        # Tallennukset päivittävät myös kokotekstihaun (jeeves_search.py)
+        self.index_search = index_search
+        self._migrate_legacy()
 
-    def is_already_archived(self, url):
-        """Tarkistaa onko uutinen jo tallennettu URL:n perusteella."""
+    def _migrate_legacy(self):
+        """Jakaa vanhan yksittäisen JSONL-tiedoston päiväsegmentteihin (kertaluonteinen)."""
         if not os.path.exists(self.path):
-            return False
-
+            return
+        batch = []
+        moved = 0
         with open(self.path, "r", encoding="utf-8") as f:
             for line in f:
                 try:
-                    entry = json.loads(line)
-                    if entry.get("url") == url:
-                        return True
+                    batch.append(json.loads(line))
                 except json.JSONDecodeError:
                     continue
-        return False
+                if len(batch) >= 10000:
+                    moved += self.store.append(batch)
+                    batch = []
+        moved += self.store.append(batch)
+        os.replace(self.path, self.path + ".migrated")
+        print(f"[*] Jeeves: Arkisto jaettu päiväsegmentteihin ({moved} riviä): {self.folder}")
+
+    # --- URL-INDEKSI ---
+
+    def _open_index(self):
+        """Avaa indeksin laiskasti ensimmäisellä käyttökerralla."""
+        if self._index is not None:
+            return self._index
+
+        conn = sqlite3.connect(self.index_path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS urls (h INTEGER PRIMARY KEY)")
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (k TEXT PRIMARY KEY, v)")
+        # Segmenttikohtainen edistyminen: mihin tavuun / riviin asti päivä on luettu
+        conn.execute("CREATE TABLE IF NOT EXISTS segments (day TEXT PRIMARY KEY, covered INTEGER, records INTEGER)")
+        conn.commit()
+        self._index = conn
+        return conn
+
+    def _meta(self, key, default=None):
+        row = self._index.execute("SELECT v FROM meta WHERE k = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def _manifest_signature(self):
+        try:
+            st = os.stat(self.store.manifest_path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def rebuild_index(self):
+        """Rakentaa indeksin kokonaan uudelleen segmenteistä."""
+        conn = self._open_index()
+        conn.execute("DELETE FROM urls")
+        conn.execute("DELETE FROM segments")
+        conn.execute("INSERT OR REPLACE INTO meta (k, v) VALUES ('version', ?)", (INDEX_VERSION,))
+        conn.commit()
+        self._signature = None
+        return self._sync_index()
+
+    def _index_records(self, conn, records):
+        """Indeksoi valmiiksi jäsennetyt tietueet. Palauttaa (rivit, URL:t)."""
+        lines = 0
+        batch = []
+        for record in records:
+            lines += 1
+            if record.get("url"):
+                batch.append((url_key(record["url"]),))
+        conn.executemany("INSERT OR IGNORE INTO urls (h) VALUES (?)", batch)
+        return lines, len(batch)
+
+    def _index_segment(self, conn, day, covered):
+        """Indeksoi segmentin covered-tavusta loppuun. Palauttaa (uusi kohta, rivit, URL:t)."""
+        added = 0
+        lines = 0
+        batch = []
+        position = covered
+        with open(self.store.segment_path(day), "rb") as f:
+            f.seek(covered)
+            for line in f:
+                # Keskeneräistä (toisen prosessin kirjoittamaa) riviä ei indeksoida vielä
+                if not line.endswith(b"\n"):
+                    break
+                position += len(line)
+                lines += 1
+                try:
+                    url = json.loads(line).get("url")
+                except (json.JSONDecodeError, UnicodeDecodeError, AttributeError):
+                    continue
+                if url:
+                    batch.append((url_key(url),))
+                if len(batch) >= 10000:
+                    conn.executemany("INSERT OR IGNORE INTO urls (h) VALUES (?)", batch)
+                    added += len(batch)
+                    batch = []
+        if batch:
+            conn.executemany("INSERT OR IGNORE INTO urls (h) VALUES (?)", batch)
+            added += len(batch)
+        return position, lines, added
+
+    def _sync_index(self):
+        """Tuo indeksin ajan tasalle lukemalla vain indeksoimattomat rivit.
+
+        Manifesti kirjoitetaan jokaisen lisäyksen jälkeen, joten yksi stat()
+        kertoo, onko mikään muuttunut. Muuttuneesta manifestista verrataan
+        päivien rivimääriä indeksin tietoihin: vain kasvaneet segmentit
+        luetaan (ja niistäkin vain loppuosa). Lyhentynyt segmentti
+        rakentaa indeksin uudelleen.
+        """
+        conn = self._open_index()
+        signature = self._manifest_signature()
+        if signature is None or signature == self._signature:
+            return 0
+        if self._meta("version") != INDEX_VERSION:
+            return self.rebuild_index()
+
+        self.store.reload()
+        known = {day: (covered, records) for day, covered, records in
+                 conn.execute("SELECT day, covered, records FROM segments")}
+        added = 0
+        for day in self.store.days():
+            covered, records = known.get(day, (0, 0))
+            expected = self.store.info(day).get("records")
+            if expected is not None and expected == records:
+                continue
+            if day not in known and self.store.info(day).get("sealed"):
+                # Tiivistetty päivä, jota indeksi ei vielä tunne (esim. uudelleenrakennus)
+                records, count = self._index_records(conn, self.store.read_sealed(day))
+                added += count
+            path = self.store.segment_path(day)
+            size = os.path.getsize(path) if os.path.exists(path) else 0
+            if size < covered:
+                return self.rebuild_index()
+            if size > covered:
+                covered, lines, count = self._index_segment(conn, day, covered)
+                records += lines
+                added += count
+            conn.execute("INSERT OR REPLACE INTO segments (day, covered, records) VALUES (?, ?, ?)",
+                         (day, covered, records))
+
+        conn.commit()
+        self._signature = signature
+        return added
+
+    def is_already_archived(self, url):
+        """Tarkistaa onko uutinen jo tallennettu URL:n perusteella."""
+        if not url:
+            return False
+
+        self._sync_index()
+        if self._index is None:
+            return False
+        row = self._index.execute("SELECT 1 FROM urls WHERE h = ?", (url_key(url),)).fetchone()
+        return row is not None
+
+    def find(self, url):
+        """Palauttaa arkistoidun uutisen URL:n perusteella (tai None).
+
+        Tiivistetyistä päivistä puretaan vain lohkot, joiden bloom-suodatin
+        voi sisältää URL:n.
+        """
+        if not self.is_already_archived(url):
+            return None
+        return self.store.find(url_key(url), lambda record: record.get("url") == url)
+
+    def compact(self, settings=None):
+        """Tiivistää vanhat päiväsegmentit gzip-lohkoiksi. Palauttaa tiivistetyt päivät."""
+        if settings is None:
+            from jeeves_settings import get_settings
+            settings = get_compaction_settings(get_settings().config)
+        if not settings["compress"]:
+            return []
+
+        # Indeksi ajan tasalle ensin: tiivistys ei muuta rivimääriä, joten ne ohitetaan jatkossa
+        self._sync_index()
+        sealed = self.store.seal(cutoff_day(settings["seal_after_days"]),
+                                 settings["block_records"], settings["level"])
+        if sealed:
+            # Tavallinen tiedosto on poissa: mahdolliset uudet rivit luetaan sen alusta
+            self._index.executemany("UPDATE segments SET covered = 0 WHERE day = ?", [(d,) for d in sealed])
+            self._index.commit()
+        return sealed
 
     def save_to_archive(self, entry):
-        """Lisää uuden analyysin arkistoon."""
+        """Lisää uuden analyysin arkistoon (päivän segmentin loppuun)."""
         # Lisätään tallennusajankohta
-        entry["archived_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        entry["archived_at"] = datetime.now().strftime(TIME_FORMAT)
+        self.store.append([entry])
+
+        # Indeksoidaan juuri lisätty rivi
+        self._sync_index()
+        if self.index_search:
+            from jeeves_logic import index_for_search
+            index_for_search([entry])
+
+    def read(self, start=None, end=None):
+        """Arkistorivit aikaväliltä (unix-aikaleimat, 'archived_at' mukaan).
 
-        with open(self.path, "a", encoding="utf-8") as f:
-            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        Vain ikkunan päivien segmentit avataan.
+        """
+        self.store.reload()
+        low = datetime.fromtimestamp(start).strftime(TIME_FORMAT) if start is not None else None
+        high = datetime.fromtimestamp(end).strftime(TIME_FORMAT) if end is not None else None
+        for entry in self.store.read(start, end):
+            archived_at = entry.get("archived_at") or ""
+            if (low is None or archived_at >= low) and (high is None or archived_at <= high):
+                yield entry
 
     def sync_from_metadata(self, metadata_path):
         """Kopioi kaikki valmiit uutiset metadatasta arkistoon, jos ne puuttuvat sieltä."""
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+
+"""
+Jeeves - Personal News Butler
+File: jeeves_cache.py
+Author: Tuomas Lähteenmäki
+Version: 3.1.0
+Licence: GNU GPLv3
+Source: https://github.com/lahtis/Flow/tree/main/Ask%20Jeeves
+
+Description:
+    Content-addressed cache for AI summaries (archive/summary_cache.db).
+    The key is a hash of (url, title, model, instruction, language), so a
+    summary is reused only when every input of the prompt is identical.
+    Old and least recently used entries are evicted according to the
+    [CACHE] section of jeeves.conf:
+
+        [CACHE]
+        max_entries = 5000
+        max_age_days = 90
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_MAX_ENTRIES = 5000
+DEFAULT_MAX_AGE_DAYS = 90
+
+def cache_key(url, title, model, instruction, lang):
+    """SHA-256 tiiviste kaikista promptiin vaikuttavista syötteistä."""
+    parts = [url or "", title or "", model or "", instruction or "", lang or ""]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+class JeevesSummaryCache:
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_age_days=DEFAULT_MAX_AGE_DAYS,
+                 filename="summary_cache.db"):
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+        archive_dir = os.path.join(base_dir, "archive")
+        if not os.path.exists(archive_dir):
+            os.makedirs(archive_dir)
+
+        self.path = os.path.join(archive_dir, filename)
+        self.max_entries = max_entries
+        self.max_age = max_age_days * 24 * 60 * 60
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS summaries ("
+            "key TEXT PRIMARY KEY, summary TEXT, model TEXT, created REAL, last_used REAL)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_summaries_last_used ON summaries(last_used)")
+        self.conn.commit()
+        self.evict()
+
+    def get(self, url, title, model, instruction, lang):
+        """Palauttaa välimuistissa olevan tiivistelmän tai None."""
+        key = cache_key(url, title, model, instruction, lang)
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT summary, created FROM summaries WHERE key = ?", (key,)).fetchone()
+            if row and time.time() - row[1] <= self.max_age:
+                self.conn.execute("UPDATE summaries SET last_used = ? WHERE key = ?", (time.time(), key))
+                self.conn.commit()
+                self.hits += 1
+                return row[0]
+            self.misses += 1
+            return None
+
+    def put(self, url, title, model, instruction, lang, summary):
+        if not summary:
+            return
+        key = cache_key(url, title, model, instruction, lang)
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO summaries (key, summary, model, created, last_used) "
+                "VALUES (?, ?, ?, ?, ?)", (key, summary, model, now, now))
+            self.conn.commit()
+
+    def evict(self):
+        """Poistaa liian vanhat ja ylimääräiset (vähiten käytetyt) tiivistelmät."""
+        with self.lock:
+            self.conn.execute("DELETE FROM summaries WHERE created < ?", (time.time() - self.max_age,))
+            count = self.conn.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
+            if count > self.max_entries:
+                self.conn.execute(
+                    "DELETE FROM summaries WHERE key IN ("
+                    "SELECT key FROM summaries ORDER BY last_used LIMIT ?)", (count - self.max_entries,))
+            self.conn.commit()
+
+    def stats_line(self):
+        lookups = self.hits + self.misses
+        rate = (100.0 * self.hits / lookups) if lookups else 0.0
+        return f"Summary cache: {self.hits}/{lookups} hits ({rate:.0f}%)"
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_summary_cache(config=None):
+    """Palauttaa prosessinlaajuisen välimuistin; asetukset luetaan [CACHE]-lohkosta."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            max_entries, max_age_days = DEFAULT_MAX_ENTRIES, DEFAULT_MAX_AGE_DAYS
+            if config is not None:
+                try:
+                    max_entries = config.getint('CACHE', 'max_entries', fallback=DEFAULT_MAX_ENTRIES)
+                    max_age_days = config.getfloat('CACHE', 'max_age_days', fallback=DEFAULT_MAX_AGE_DAYS)
+                except ValueError:
+                    print("[!] Jeeves: Invalid [CACHE] settings, using defaults.")
+            _cache = JeevesSummaryCache(max_entries, max_age_days)
+        return _cache
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+
+"""
+Jeeves - Personal News Butler
+File: jeeves_classifier.py
+Author: Tuomas Lähteenmäki
+Version: 3.1.0
+Licence: GNU GPLv3
+Source: https://github.com/lahtis/Flow/tree/main/Ask%20Jeeves
+
+Description:
+    Keyword classifier for news categories. The taxonomy is declared in
+    resources/personality.json ("category_rules") and can be overridden in
+    the [CATEGORIES] section of jeeves.conf:
+
+        [CATEGORIES]
+        default = Linux
+        gaming = steam:3, proton, wine, steam deck
+        gaming.sources = gaming
+        security.weight = 2
+
+    Every keyword is a whole word (\\b...\\b); a trailing * matches a prefix
+    (e.g. vulnerabilit*) and :N gives the keyword its own weight. All
+    keywords are compiled into one regular expression, factored as a
+    character trie (keywords sharing a prefix share its branch). A title
+    scores the weights of its hits per category, a feed whose name
+    contains one of the rule's sources adds the rule weight, and the
+    highest score wins (ties go to the earlier rule).
+
+    classify_many() is only a loop over classify() for the ingestion call
+    site, not a faster batch path: one scan over the joined batch, a flat
+    alternation and plain substring searches were all measured and none
+    was faster in CPython.
+
+    The classifier costs more than the old substring chain it replaced:
+    test/bench_classifier.py measures it about 30% slower per title (the
+    regex scans every position of the title, the chain stopped at the
+    first hit). It is still well under 10 microseconds per title. On the
+    benchmark's synthetic headlines it picks the same category as the
+    old chain for 81.4% of them. The rest are deliberate changes: whole
+    words instead of substrings ("intel" no longer hits "intelligence")
+    and the highest score instead of the first rule that hits.
+"""
+
+import re
+
+DEFAULT_CATEGORY = "Linux"
+
+class CategoryRule:
+    def __init__(self, category, keywords=(), sources=(), weight=1.0):
+        self.category = category
+        self.keywords = list(keywords)
+        self.sources = [s.lower() for s in sources]
+        self.weight = float(weight)
+
+def _split_list(value):
+    return [part.strip() for part in value.split(',') if part.strip()]
+
+def parse_keyword(text, default_weight):
+    """'cve:3' -> ('cve', 3.0, False); 'exploit*' -> ('exploit', w, True)."""
+    word, _, weight = text.strip().lower().rpartition(':')
+    if not word or not weight.replace('.', '', 1).isdigit():
+        word, weight = text.strip().lower(), default_weight
+    prefix = word.endswith('*')
+    return word.rstrip('*'), float(weight), prefix
+
+def trie_pattern(keywords, hits):
+    """Kokoaa avainsanoista merkkipuun muotoisen lausekkeen.
+
+    keywords: [(sana, etuliite?, kategoria, paino)]. Jokainen sana päättyy
+    omaan ryhmäänsä; hits-listaan lisätään ryhmän numerolla (m.lastindex)
+    kaikki sanan (kategoria, paino) -parit, joten usean säännön yhteinen
+    sana pisteyttää jokaisen niistä.
+    """
+    trie = {}
+    for word, prefix, category, weight in keywords:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node.setdefault("", {}).setdefault(prefix, []).append((category, weight))
+
+    def build(node):
+        # Jatkot ensin, jotta "steam deck" voittaa pelkän "steam"-osuman
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        for prefix, scores in node.get("", {}).items():
+            hits.append(scores)
+            branches.append(r"(\w*)" if prefix else r"(\b)")
+        return branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+
+    return build(trie)
+
+class CategoryClassifier:
+    def __init__(self, rules, default=DEFAULT_CATEGORY):
+        self.rules = rules
+        self.default = default
+        self.order = {rule.category: i for i, rule in enumerate(rules)}
+        self._source_scores = {}
+
+        keywords = []
+        for rule in rules:
+            for text in rule.keywords:
+                word, weight, prefix = parse_keyword(text, rule.weight)
+                if word:
+                    keywords.append((word, prefix, rule.category, weight))
+        self.hits = [None]  # ryhmän numero -> [(kategoria, paino), ...]
+        self.pattern = re.compile(r"\b" + trie_pattern(keywords, self.hits)) if keywords else None
+
+    @classmethod
+    def from_taxonomy(cls, taxonomy, config=None):
+        """Rakentaa luokittelijan personality.json-taksonomiasta ja [CATEGORIES]-ohituksista."""
+        taxonomy = taxonomy or {}
+        default = taxonomy.get("default", DEFAULT_CATEGORY)
+        rules = [CategoryRule(r["category"], r.get("keywords", ()), r.get("sources", ()), r.get("weight", 1))
+                 for r in taxonomy.get("rules", []) if r.get("category")]
+
+        if config is not None and 'CATEGORIES' in config:
+            # configparser pienentää avaimet: kategoria haetaan kirjainkoosta välittämättä
+            by_name = {rule.category.lower(): rule for rule in rules}
+            for key, value in config['CATEGORIES'].items():
+                if key == 'default':
+                    default = value.strip() or default
+                    continue
+                name, _, field = key.partition('.')
+                rule = by_name.get(name)
+                if rule is None:
+                    rule = by_name[name] = CategoryRule(name.title())
+                    rules.append(rule)
+                try:
+                    if field == 'sources':
+                        rule.sources = [s.lower() for s in _split_list(value)]
+                    elif field == 'weight':
+                        rule.weight = float(value)
+                    elif not field:
+                        rule.keywords = _split_list(value)
+                    else:
+                        print(f"[!] Jeeves: Unknown [CATEGORIES] key: {key}")
+                except ValueError:
+                    print(f"[!] Jeeves: Invalid [CATEGORIES] {key} = {value}")
+        return cls(rules, default)
+
+    def source_scores(self, source):
+        """Lähteen (syötteen nimen) tuomat pisteet; syötteitä on vähän, joten tulos muistetaan."""
+        cached = self._source_scores.get(source)
+        if cached is None:
+            name = source.lower()
+            cached = self._source_scores[source] = [(rule.category, rule.weight) for rule in self.rules
+                                                    if any(s in name for s in rule.sources)]
+        return cached
+
+    def _decide(self, scores, source):
+        if source:
+            for category, weight in self.source_scores(source):
+                scores[category] = scores.get(category, 0.0) + weight
+        if not scores:
+            return self.default
+        if len(scores) == 1:
+            return next(iter(scores))
+        return min(scores, key=lambda cat: (-scores[cat], self.order.get(cat, len(self.order))))
+
+    def classify(self, title, source=""):
+        scores = {}
+        if self.pattern is not None:
+            for match in self.pattern.finditer(title.lower()):
+                for category, weight in self.hits[match.lastindex]:
+                    scores[category] = scores.get(category, 0.0) + weight
+        return self._decide(scores, source)
+
+    def classify_many(self, items):
+        """items: [(otsikko, lähde), ...] -> [kategoria, ...] (classify() yksi kerrallaan)."""
+        return [self.classify(title, source) for title, source in items]
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+
+"""
+Jeeves - Personal News Butler
+File: jeeves_console.py
+Author: Tuomas Lähteenmäki
+Version: 3.1.0
+Licence: GNU GPLv3
+Source: https://github.com/lahtis/Flow/tree/main/Ask%20Jeeves
+
+Description:
+    Log pipeline for the GUI system log. sys.stdout is replaced with a
+    ConsoleStream that only appends whole lines to a queue, so any thread
+    can print without touching Tk. The GUI drains the queue on the main
+    thread once per frame, inserts the lines in one batch and keeps at
+    most `scrollback` lines. Every line is also written to a rotating log
+    file (archive/jeeves_gui.log):
+
+        [CONSOLE]
+        frame_ms = 50
+        scrollback = 2000
+        max_bytes = 1048576
+        backups = 3
+"""
+
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque, namedtuple
+from logging.handlers import RotatingFileHandler
+
+DEFAULT_CONSOLE = {
+    "frame_ms": 50,
+    "scrollback": 2000,
+    "max_bytes": 1024 * 1024,
+    "backups": 3,
+}
+# Yhdessä ruudussa käsitellään enintään näin monta riviä; loput seuraavalla kierroksella
+MAX_LINES_PER_FRAME = 500
+
+LogRecord = namedtuple("LogRecord", "created thread level text")
+
+def level_of(text):
+    """Tulosteen etuliite tasoksi: [!] virhe, [+] onnistui, muuten info."""
+    head = text.lstrip()[:3]
+    if head == "[!]":
+        return "error"
+    if head == "[+]":
+        return "success"
+    return "info"
+
+def get_console_settings(config=None):
+    settings = dict(DEFAULT_CONSOLE)
+    if config is None or 'CONSOLE' not in config:
+        return settings
+    for key in DEFAULT_CONSOLE:
+        try:
+            settings[key] = config.getint('CONSOLE', key, fallback=settings[key])
+        except ValueError:
+            print(f"[!] Jeeves: Invalid [CONSOLE] {key} = {config['CONSOLE'][key]}")
+    return settings
+
+class ConsoleStream:
+    """sys.stdout-korvike: kokoaa rivit säiekohtaisesti ja vie valmiit rivit jonoon."""
+
+    encoding = "utf-8"
+
+    def __init__(self, records):
+        self.records = records
+        self.local = threading.local()
+
+    def write(self, text):
+        buffer = getattr(self.local, "buffer", "") + text
+        if "\n" in buffer:
+            *lines, buffer = buffer.split("\n")
+            name = threading.current_thread().name
+            now = time.time()
+            for line in lines:
+                self.records.put(LogRecord(now, name, level_of(line), line))
+        self.local.buffer = buffer
+        return len(text)
+
+    def flush(self):
+        # Keskeneräinen rivi (print(..., end="")) lähetetään sellaisenaan
+        buffer = getattr(self.local, "buffer", "")
+        if buffer:
+            self.local.buffer = ""
+            self.records.put(LogRecord(time.time(), threading.current_thread().name, level_of(buffer), buffer))
+
+    def isatty(self):
+        return False
+
+class ConsoleLog:
+    """Jono, rengaspuskuri ja lokitiedosto. drain() kutsutaan vain pääsäikeestä."""
+
+    def __init__(self, path=None, config=None):
+        self.settings = get_console_settings(config)
+        self.records = queue.SimpleQueue()
+        self.stream = ConsoleStream(self.records)
+        self.scrollback = deque(maxlen=self.settings["scrollback"])
+        self.logger = None
+        if path:
+            self.logger = self._open_log(path)
+
+    def _open_log(self, path):
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            handler = RotatingFileHandler(path, maxBytes=self.settings["max_bytes"],
+                                          backupCount=self.settings["backups"], encoding="utf-8")
+        except OSError as e:
+            print(f"[!] Jeeves: Log file unavailable ({path}): {e}")
+            return None
+        handler.setFormatter(logging.Formatter("%(asctime)s %(threadName)s %(levelname)s %(message)s"))
+        logger = logging.getLogger(f"jeeves.console.{id(self)}")
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        logger.addHandler(handler)
+        return logger
+
+    def drain(self, limit=MAX_LINES_PER_FRAME):
+        """Palauttaa jonoon kertyneet tietueet (enintään limit) ja kirjaa ne tiedostoon."""
+        batch = []
+        try:
+            while len(batch) < limit:
+                batch.append(self.records.get_nowait())
+        except queue.Empty:
+            pass
+        if not batch:
+            return batch
+        self.scrollback.extend(batch)
+
+        if self.logger:
+            for record in batch:
+                level = logging.ERROR if record.level == "error" else logging.INFO
+                self.logger.handle(logging.makeLogRecord({
+                    "name": self.logger.name, "levelno": level, "levelname": logging.getLevelName(level),
+                    "msg": record.text, "created": record.created, "threadName": record.thread,
+                    "msecs": (record.created % 1) * 1000}))
+        return batch
+
+    def clear(self):
+        self.scrollback.clear()
+
+    def close(self):
+        """Tyhjentää jonon tiedostoon ja sulkee sen (ikkunaa suljettaessa)."""
+        self.stream.flush()
+        while self.drain():
+            pass
+        if self.logger:
+            for handler in list(self.logger.handlers):
+                handler.close()
+                self.logger.removeHandler(handler)
@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+
+"""
+Jeeves - Personal News Butler
+File: jeeves_dedup.py
+Author: Tuomas Lähteenmäki
+Version: 3.1.0
+Licence: GNU GPLv3
+Source: https://github.com/lahtis/Flow/tree/main/Ask%20Jeeves
+
+Description:
+    Near-duplicate story detection before a headline is queued for AI
+    analysis. Titles (and feed summaries when the feed has them) are
+    normalized into word sets and MinHash signatures. A persistent LSH
+    index (archive/dedup_index.db) finds candidates with a few indexed
+    lookups; each candidate is then verified with the exact Jaccard
+    similarity of the word sets. Headlines whose version numbers differ
+    ("Linux 6.8-rc1" vs "Linux 6.8-rc2") are never duplicates.
+
+    A duplicate is not queued: it is recorded as an alias of the story
+    that was seen first and linked to that entry's analysis ("related").
+
+        [DEDUP]
+        enabled = yes
+        title_threshold = 0.6     ; Jaccard of title words
+        summary_threshold = 0.5   ; Jaccard of feed summary 3-word shingles
+        window_days = 30          ; older stories are dropped from the index
+"""
+
+import hashlib
+import random
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from array import array
+from collections import namedtuple
+from jeeves_segments import url_key
+
+DEFAULT_DEDUP = {
+    "enabled": True,
+    "title_threshold": 0.6,
+    "summary_threshold": 0.5,
+    "window_days": 30,
+}
+
+# 32 permutaatiota = 8 kaistaa x 4 riviä: ehdokkaaksi riittää noin 0,6 Jaccard-samankaltaisuus
+NUM_PERM = 32
+BANDS = 8
+ROWS = NUM_PERM // BANDS
+MERSENNE = (1 << 61) - 1
+MIN_TITLE_WORDS = 3
+
+_rng = random.Random(0x4A656576)  # kiinteä siemen: allekirjoitukset säilyvät ajojen välillä
+PERMUTATIONS = [(_rng.randrange(1, MERSENNE), _rng.randrange(0, MERSENNE)) for _ in range(NUM_PERM)]
+
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it its new now of on or the to with will
+ja on ei se että kun tai sekä myös uusi nyt jo
+""".split())
+
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+SUFFIXES = ("ing", "ed", "es", "e", "s")
+
+# kind: "t" = otsikko, "s" = syötteen tiivistelmä
+Duplicate = namedtuple("Duplicate", "url title similarity kind")
+
+def get_dedup_settings(config=None):
+    settings = dict(DEFAULT_DEDUP)
+    if config is None or 'DEDUP' not in config:
+        return settings
+    section = config['DEDUP']
+    for key, default in DEFAULT_DEDUP.items():
+        if key not in section:
+            continue
+        try:
+            if isinstance(default, bool):
+                settings[key] = section.getboolean(key)
+            else:
+                settings[key] = type(default)(float(section[key]))
+        except ValueError:
+            print(f"[!] Jeeves: Invalid [DEDUP] {key} = {section[key]}")
+    return settings
+
+def normalize(text):
+    """Pienaakkoset, ei aksentteja, ei täytesanoja; englannin yleisimmät päätteet karsitaan."""
+    text = unicodedata.normalize("NFKD", (text or "").casefold())
+    text = "".join(ch for ch in text if not unicodedata.combining(ch))
+    words = []
+    for word in WORD_RE.findall(text):
+        if word in STOPWORDS:
+            continue
+        if len(word) > 4 and not any(ch.isdigit() for ch in word):
+            for suffix in SUFFIXES:
+                if word.endswith(suffix):
+                    word = word[:-len(suffix)]
+                    break
+        words.append(word)
+    return words
+
+def title_features(title):
+    return frozenset(normalize(title))
+
+def summary_features(summary):
+    """Syötteen tiivistelmän 3 sanan jaksot (HTML-tagit pois)."""
+    words = normalize(re.sub(r"<[^>]+>", " ", summary or ""))
+    return frozenset(" ".join(words[i:i + 3]) for i in range(len(words) - 2))
+
+def numbers(features):
+    return {word for word in features if any(ch.isdigit() for ch in word)}
+
+def jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+def minhash(features):
+    hashes = [int.from_bytes(hashlib.blake2b(f.encode("utf-8"), digest_size=8).digest(), "big")
+              for f in features]
+    return [min((a * h + b) % MERSENNE for h in hashes) for a, b in PERMUTATIONS]
+
+def band_keys(signature):
+    """LSH-kaistojen avaimet (64-bittiset kokonaisluvut SQLite-indeksiin)."""
+    keys = []
+    for band in range(BANDS):
+        rows = array("Q", signature[band * ROWS:(band + 1) * ROWS]).tobytes()
+        digest = hashlib.blake2b(rows, digest_size=8, person=band.to_bytes(2, "big")).digest()
+        keys.append(int.from_bytes(digest, "big", signed=True))
+    return keys
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    url TEXT,
+    title TEXT,
+    features TEXT,
+    ts REAL,
+    PRIMARY KEY (id, kind)
+);
+CREATE INDEX IF NOT EXISTS idx_docs_ts ON docs(ts);
+CREATE TABLE IF NOT EXISTS bands (key INTEGER NOT NULL, id INTEGER NOT NULL, kind TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS idx_bands_key ON bands(key);
+CREATE INDEX IF NOT EXISTS idx_bands_id ON bands(id);
+CREATE TABLE IF NOT EXISTS aliases (url TEXT PRIMARY KEY, canonical TEXT, similarity REAL, ts REAL);
+CREATE TABLE IF NOT EXISTS meta (k TEXT PRIMARY KEY, v);
+"""
+
+class NearDuplicateIndex:
+    def __init__(self, path, settings=None):
+        self.path = path
+        self.settings = settings or dict(DEFAULT_DEDUP)
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+        self.checked = 0
+        self.duplicates = 0
+
+    # --- HAKU ---
+
+    def _candidates(self, kind, features):
+        keys = band_keys(minhash(features))
+        rows = self.conn.execute(
+            f"SELECT DISTINCT d.url, d.title, d.features FROM bands b JOIN docs d ON d.id = b.id AND d.kind = b.kind "
+            f"WHERE b.kind = ? AND b.key IN ({','.join('?' * len(keys))})", [kind] + keys)
+        return rows.fetchall()
+
+    def find(self, title, summary="", url=None):
+        """Palauttaa parhaan Duplicate-osuman tai None.
+
+        Otsikon sanajoukon on oltava riittävän samanlainen (title_threshold)
+        tai syötteen tiivistelmien (summary_threshold). Versionumerot eroavat
+        -> ei koskaan duplikaatti.
+        """
+        self.checked += 1
+        title_set = title_features(title)
+        summary_set = summary_features(summary)
+        best = None
+        with self.lock:
+            probes = []
+            if len(title_set) >= MIN_TITLE_WORDS:
+                probes.append(("t", title_set, self.settings["title_threshold"]))
+            if len(summary_set) >= MIN_TITLE_WORDS:
+                probes.append(("s", summary_set, self.settings["summary_threshold"]))
+            for kind, features, threshold in probes:
+                for cand_url, cand_title, cand_features in self._candidates(kind, features):
+                    if cand_url == url:
+                        continue
+                    if numbers(title_set) != numbers(title_features(cand_title)):
+                        continue
+                    similarity = jaccard(features, frozenset(cand_features.split("\n")))
+                    if similarity >= threshold and (best is None or similarity > best.similarity):
+                        best = Duplicate(cand_url, cand_title, similarity, kind)
+        if best:
+            self.duplicates += 1
+        return best
+
+    # --- KIRJOITUS ---
+
+    def add(self, url, title, summary="", timestamp=None, commit=True):
+        """Lisää tarinan indeksiin (otsikko ja mahdollinen syötteen tiivistelmä)."""
+        if not url:
+            return
+        doc_id = url_key(url)
+        ts = timestamp or time.time()
+        with self.lock:
+            for kind, features in (("t", title_features(title)), ("s", summary_features(summary))):
+                if len(features) < MIN_TITLE_WORDS:
+                    continue
+                self.conn.execute("DELETE FROM bands WHERE id = ? AND kind = ?", (doc_id, kind))
+                self.conn.execute("INSERT OR REPLACE INTO docs (id, kind, url, title, features, ts) VALUES (?, ?, ?, ?, ?, ?)",
+                                  (doc_id, kind, url, title, "\n".join(sorted(features)), ts))
+                self.conn.executemany("INSERT INTO bands (key, id, kind) VALUES (?, ?, ?)",
+                                      [(key, doc_id, kind) for key in band_keys(minhash(features))])
+            if commit:
+                self.conn.commit()
+
+    def add_alias(self, url, canonical, similarity):
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO aliases (url, canonical, similarity, ts) VALUES (?, ?, ?, ?)",
+                              (url, canonical, similarity, time.time()))
+            self.conn.commit()
+
+    def canonical(self, url):
+        row = self.conn.execute("SELECT canonical FROM aliases WHERE url = ?", (url,)).fetchone()
+        return row[0] if row else None
+
+    def prune(self, now=None):
+        """Poistaa window_days-ikkunaa vanhemmat tarinat indeksistä."""
+        cutoff = (now or time.time()) - self.settings["window_days"] * 86400
+        with self.lock:
+            old = self.conn.execute("SELECT id, kind FROM docs WHERE ts < ?", (cutoff,)).fetchall()
+            self.conn.executemany("DELETE FROM bands WHERE id = ? AND kind = ?", old)
+            self.conn.execute("DELETE FROM docs WHERE ts < ?", (cutoff,))
+            self.conn.execute("DELETE FROM aliases WHERE ts < ?", (cutoff,))
+            self.conn.commit()
+        return len(old)
+
+    def commit(self):
+        with self.lock:
+            self.conn.commit()
+
+    def get_meta(self, key, default=None):
+        row = self.conn.execute("SELECT v FROM meta WHERE k = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO meta (k, v) VALUES (?, ?)", (key, value))
+            self.conn.commit()
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM docs WHERE kind = 't'").fetchone()[0]
+
+    def stats_line(self):
+        return f"Near-duplicates: {self.duplicates} of {self.checked} new headlines linked to earlier stories"
+
+    def close(self):
+        with self.lock:
+            self.conn.commit()
+            self.conn.close()
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+"""
+Jeeves - Personal News Butler
+File: jeeves_feedstate.py
+Author: Tuomas Lähteenmäki
+Version: 3.1.0
+Licence: GNU GPLv3
+Source: https://github.com/lahtis/Flow/tree/main/Ask%20Jeeves
+
+Description:
+    Persistent per-feed state for conditional RSS requests.
+    Stores ETag, Last-Modified, recently seen entry IDs and fetch
+    statistics in archive/feed_state.json, so unchanged feeds can be
+    answered with 304 Not Modified and skipped before any parsing.
+"""
+
+import json
+import os
+import time
+
+# Montako viimeisintä entry-ID:tä muistetaan syötettä kohden
+MAX_SEEN_IDS = 200
+
+class JeevesFeedState:
+    def __init__(self, filename="feed_state.json"):
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+        archive_dir = os.path.join(base_dir, "archive")
+
+        if not os.path.exists(archive_dir):
+            os.makedirs(archive_dir)
+
+        self.path = os.path.join(archive_dir, filename)
+        self.feeds = self._load()
+        self.run_hits = 0
+        self.run_misses = 0
+        self.run_saved_bytes = 0
+
+    def _load(self):
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    return json.load(f).get("feeds", {})
+            except Exception as e:
+                print(f"[!] Jeeves: Feed state unreadable, starting fresh: {e}")
+        return {}
+
+    def save(self):
+        """Tallentaa tilan atomisesti (väliaikaistiedosto + rename)."""
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"feeds": self.feeds}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            print(f"[!] Jeeves: Could not save feed state: {e}")
+
+    def _state(self, url):
+        return self.feeds.setdefault(url, {
+            "etag": None,
+            "last_modified": None,
+            "seen_ids": [],
+            "last_fetch": None,
+            "last_size": 0,
+            "hits": 0,
+            "misses": 0
+        })
+
+    def conditional_headers(self, url):
+        """Palauttaa If-None-Match / If-Modified-Since -otsakkeet syötteelle."""
+        state = self.feeds.get(url, {})
+        headers = {}
+        if state.get("etag"):
+            headers["If-None-Match"] = state["etag"]
+        if state.get("last_modified"):
+            headers["If-Modified-Since"] = state["last_modified"]
+        return headers
+
+    def seen_ids(self, url):
+        return set(self.feeds.get(url, {}).get("seen_ids", []))
+
+    def record_not_modified(self, url):
+        """304: syöte ei ole muuttunut, säästettiin lataus ja jäsennys."""
+        state = self._state(url)
+        state["hits"] += 1
+        state["last_fetch"] = time.time()
+        self.run_hits += 1
+        self.run_saved_bytes += state.get("last_size", 0)
+
+    def record_fetch(self, url, etag, last_modified, entry_ids, size):
+        """200: tallennetaan validaattorit ja uusimmat entry-ID:t."""
+        state = self._state(url)
+        state["misses"] += 1
+        state["last_fetch"] = time.time()
+        state["last_size"] = size
+        state["etag"] = etag
+        state["last_modified"] = last_modified
+
+        # Uusimmat ensin, vanhimmat putoavat pois listan lopusta
+        merged = list(dict.fromkeys(list(entry_ids) + state["seen_ids"]))
+        state["seen_ids"] = merged[:MAX_SEEN_IDS]
+        self.run_misses += 1
+
+    def stats(self, url):
+        state = self.feeds.get(url, {})
+        return state.get("hits", 0), state.get("misses", 0)
@@ -4,10 +4,224 @@ Jeeves - Personal News Butler
 File: jeeves_formatter.py
 Version: 3.1.0
 Description: Handles the visual layout and references of a news report.
+    The report is written to any text sink (anything with write()) as it
+    is produced; nothing is joined in memory. Output formats are pluggable:
+
+        formatter.render(entries, matcher, greeting, pending, sys.stdout, fmt="markdown")
+
+    text = the terminal layout, markdown, html and json (see FORMATS).
 Source: https://github.com/lahtis/Flow/tree/main/Ask%20Jeeves
 """
 
 import html
+import json
+import random
+
+PRIORITY = "priority"
+PENDING = "pending"
+READY = "ready"
+
+class ReportWriter:
+    """Taustaosan rajapinta: jokainen kutsu kirjoittaa osansa heti sink-virtaan."""
+
+    def __init__(self, sink, lang="fi", show_full=False, pending_indicator=""):
+        self.sink = sink
+        self.lang = lang
+        self.show_full = show_full
+        self.pending_indicator = pending_indicator
+
+    def begin(self, greeting):
+        pass
+
+    def idle(self, message):
+        pass
+
+    def category(self, name, comment):
+        pass
+
+    def item(self, number, title, url, state, pending, entry):
+        """state: merkki (PRIORITY/PENDING/READY); pending: tiivistelmä puuttuu vielä.
+
+        Tärkeä uutinen voi olla yhä analysoimatta: silloin state on PRIORITY
+        ja pending True.
+        """
+        pass
+
+    def end_category(self):
+        pass
+
+    def sources(self, label, sources):
+        """sources: (numero, url) -pareja numerojärjestyksessä."""
+        pass
+
+    def end(self):
+        pass
+
+class TextReport(ReportWriter):
+    """Päätteen tekstiasettelu (sama kuin ennen)."""
+
+    PREFIXES = {PRIORITY: "[!!!]", PENDING: "[ ? ]", READY: "[ + ]"}
+
+    def begin(self, greeting):
+        self.sink.write(f"\n{'='*60}\n    {greeting.upper()}\n{'='*60}\n\n")
+
+    def idle(self, message):
+        self.sink.write(f"[*] Jeeves: \"{message}\"\n")
+
+    def category(self, name, comment):
+        self.sink.write(f"[*] Jeeves: \"{comment}\"\n--- {name.upper()} ---\n")
+
+    def item(self, number, title, url, state, pending, entry):
+        self.sink.write(f"  {self.PREFIXES[state]} {title} [{number}]\n")
+        # Jos --full on päällä, näytetään tiivistelmä
+        if self.show_full:
+            if pending:
+                self.sink.write(f"      ({self.pending_indicator})\n")
+            else:
+                summary = entry.get('summary', '').replace('\n', '\n      ')
+                self.sink.write(f"      {summary}\n")
+            self.sink.write(f"      Lähde: {url}\n\n")
+
+    def end_category(self):
+        self.sink.write("\n")  # Tyhjä rivi kategorioiden väliin
+
+    def sources(self, label, sources):
+        self.sink.write(f"{'-'*30}\n{label}\n")
+        for number, url in sources:
+            self.sink.write(f"[{number}] {url}\n")
+        self.sink.write(f"{'-'*30}\n")
+
+def _md_escape(text):
+    for char in "\\`*_[]<>#|":
+        text = text.replace(char, "\\" + char)
+    return text
+
+class MarkdownReport(ReportWriter):
+    MARKERS = {PRIORITY: "**!!!** ", PENDING: "*(?)* ", READY: ""}
+
+    def begin(self, greeting):
+        self.sink.write(f"# {_md_escape(greeting)}\n\n")
+
+    def idle(self, message):
+        self.sink.write(f"> {_md_escape(message)}\n")
+
+    def category(self, name, comment):
+        self.sink.write(f"## {_md_escape(name)}\n\n*{_md_escape(comment)}*\n\n")
+
+    def item(self, number, title, url, state, pending, entry):
+        link = f"[[{number}]](<{url}>)" if url else f"[{number}]"
+        self.sink.write(f"- {self.MARKERS[state]}{_md_escape(title)} {link}\n")
+        if self.show_full:
+            if pending:
+                self.sink.write(f"\n  *({_md_escape(self.pending_indicator)})*\n\n")
+            else:
+                summary = _md_escape(entry.get('summary', '').strip()).replace('\n', '\n  ')
+                self.sink.write(f"\n  {summary}\n\n")
+
+    def end_category(self):
+        self.sink.write("\n")
+
+    def sources(self, label, sources):
+        self.sink.write(f"---\n\n**{_md_escape(label)}**\n\n")
+        for number, url in sources:
+            self.sink.write(f"{number}. <{url}>\n")
+
+class HtmlReport(ReportWriter):
+    def begin(self, greeting):
+        greeting = html.escape(greeting)
+        self.sink.write(f"<!DOCTYPE html>\n<html lang=\"{html.escape(self.lang)}\">\n"
+                        f"<head><meta charset=\"utf-8\"><title>{greeting}</title></head>\n"
+                        f"<body>\n<h1>{greeting}</h1>\n")
+
+    def idle(self, message):
+        self.sink.write(f"<p class=\"idle\">{html.escape(message)}</p>\n")
+
+    def category(self, name, comment):
+        self.sink.write(f"<section>\n<h2>{html.escape(name)}</h2>\n"
+                        f"<p class=\"comment\">{html.escape(comment)}</p>\n<ul>\n")
+
+    def item(self, number, title, url, state, pending, entry):
+        link = f"<a href=\"{html.escape(url)}\">[{number}]</a>" if url else f"[{number}]"
+        self.sink.write(f"<li class=\"{state}\">{html.escape(title)} {link}")
+        if self.show_full:
+            if pending:
+                self.sink.write(f"<p><em>({html.escape(self.pending_indicator)})</em></p>")
+            else:
+                summary = html.escape(entry.get('summary', '').strip()).replace('\n', '<br>\n')
+                self.sink.write(f"<p>{summary}</p>")
+        self.sink.write("</li>\n")
+
+    def end_category(self):
+        self.sink.write("</ul>\n</section>\n")
+
+    def sources(self, label, sources):
+        self.sink.write(f"<h2>{html.escape(label)}</h2>\n<ol>\n")
+        for number, url in sources:
+            url = html.escape(url)
+            self.sink.write(f"<li value=\"{number}\"><a href=\"{url}\">{url}</a></li>\n")
+        self.sink.write("</ol>\n")
+
+    def end(self):
+        self.sink.write("</body>\n</html>\n")
+
+class JsonReport(ReportWriter):
+    """Yksi JSON-olio, joka kirjoitetaan paloina (ei koota muistiin)."""
+
+    def _dump(self, value):
+        return json.dumps(value, ensure_ascii=False)
+
+    def begin(self, greeting):
+        self.in_categories = False
+        self.first_item = True
+        self.sink.write(f"{{\"greeting\": {self._dump(greeting)}, \"lang\": {self._dump(self.lang)}")
+
+    def _close_categories(self):
+        if self.in_categories:
+            self.sink.write("\n]")
+            self.in_categories = False
+
+    def idle(self, message):
+        self.sink.write(f", \"idle\": {self._dump(message)}")
+
+    def category(self, name, comment):
+        if not self.in_categories:
+            self.sink.write(", \"categories\": [\n")
+            self.in_categories = True
+        else:
+            self.sink.write(",\n")
+        self.sink.write(f"{{\"name\": {self._dump(name)}, \"comment\": {self._dump(comment)}, \"items\": [")
+        self.first_item = True
+
+    def item(self, number, title, url, state, pending, entry):
+        record = {"number": number, "title": title, "url": url, "state": state,
+                  "pending": pending, "timestamp": entry.get("timestamp")}
+        if self.show_full:
+            record["summary"] = None if pending else entry.get("summary", "")
+        self.sink.write(("\n  " if self.first_item else ",\n  ") + self._dump(record))
+        self.first_item = False
+
+    def end_category(self):
+        self.sink.write("]}")
+
+    def sources(self, label, sources):
+        self._close_categories()
+        self.sink.write(", \"sources\": [")
+        separator = ""
+        for number, url in sources:
+            self.sink.write(f"{separator}\n  {{\"number\": {number}, \"url\": {self._dump(url)}}}")
+            separator = ","
+        self.sink.write("\n]")
+
+    def end(self):
+        self._close_categories()
+        self.sink.write("}\n")
+
+FORMATS = {
+    "text": TextReport,
+    "markdown": MarkdownReport,
+    "html": HtmlReport,
+    "json": JsonReport,
+}
 
 class JeevesFormatter:
     def __init__(self, lang_func, lang="fi"):
@@ -17,7 +231,7 @@ class JeevesFormatter:
         """
         self.get_text = lang_func
         self.lang = lang
-        self.sources = []
+        self.sources = {}
 
     def _get_category_comment(self, category):
         """Hakee hovimestarin kommentin kategorialle."""
@@ -29,80 +243,77 @@ class JeevesFormatter:
             comment = self.get_text("personality.category_comments.Default", self.lang)
         return comment
 
-    def build_report(self, entries, keywords, greeting, pending_indicator, show_full=False):
-        """Rakentaa koko raportin tekstimuodossa."""
-        self.sources = []  # Nollataan lähdelista
-        lines = []
+    def source_number(self, url):
+        """Lähteen numero; uusi URL saa seuraavan numeron (dict: O(1))."""
+        if not url:
+            return "?"
+        number = self.sources.get(url)
+        if number is None:
+            number = self.sources[url] = len(self.sources) + 1
+        return number
+
+    def render(self, entries, matcher, greeting, pending_indicator, sink, fmt="text", show_full=False):
+        """Kirjoittaa raportin sink-virtaan valitussa muodossa.
+
+        matcher: jaettu PriorityMatcher (jeeves_logic.get_priority_matcher)
+        Palauttaa {'items': n, 'pending': n, 'sources': n}.
+        """
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown report format: {fmt}")
+        writer = FORMATS[fmt](sink, self.lang, show_full, pending_indicator)
+        self.sources = {}  # Nollataan lähdelista
+        counts = {"items": 0, "pending": 0, "sources": 0}
 
         # 1. Alkurakenne (Tervehdys)
-        lines.append(f"\n{'='*60}")
-        lines.append(f"    {greeting.upper()}")
-        lines.append(f"{'='*60}\n")
+        writer.begin(greeting)
 
-        if not entries:
-            import random
+        # 2. Ryhmitellään uutiset kategorioittain (vain viittaukset merkintöihin)
+        report_data = {}
+        for e in entries:
+            report_data.setdefault(e.get('category', 'General'), []).append(e)
+
+        if not report_data:
             idle_msg = self.get_text("personality.idle_comments", self.lang)
             if isinstance(idle_msg, list):
                 idle_msg = random.choice(idle_msg)
-            lines.append(f"[*] Jeeves: \"{idle_msg}\"")
-            return "\n".join(lines)
-
-        # 2. Ryhmitellään uutiset kategorioittain
-        report_data = {}
-        for e in entries:
-            cat = e.get('category', 'General')
-            if cat not in report_data:
-                report_data[cat] = []
-            report_data[cat].append(e)
+            writer.idle(idle_msg)
+            writer.end()
+            return counts
 
         # 3. Käydään kategoriat läpi
         for category, items in report_data.items():
-            comment = self._get_category_comment(category)
-            lines.append(f"[*] Jeeves: \"{comment}\"")
-            lines.append(f"--- {category.upper()} ---")
-
+            writer.category(category, self._get_category_comment(category))
             for item in items:
-                # Kerätään URL ja määritetään sen numero
                 url = item.get('url', '')
-                if url and url not in self.sources:
-                    self.sources.append(url)
-
-                source_idx = self.sources.index(url) + 1 if url else "?"
+                source_idx = self.source_number(url)
 
                 # Tarkistetaan tila ja prioriteetti
                 is_pending = pending_indicator in item.get('summary', '')
-                is_priority = any(k in item.get('title', '').lower() for k in keywords)
-
-                if is_priority:
-                    prefix = "[!!!]"
+                if matcher.score_entry(item) > 0:
+                    state = PRIORITY
                 elif is_pending:
-                    prefix = "[ ? ]"
+                    state = PENDING
                 else:
-                    prefix = "[ + ]"
+                    state = READY
+                counts["items"] += 1
+                counts["pending"] += is_pending
 
-                # Lisätään uutisrivi
                 clean_title = html.unescape(item.get('title', ''))
-                lines.append(f"  {prefix} {clean_title} [{source_idx}]")
-
-                # Jos --full on päällä, näytetään tiivistelmä
-                if show_full:
-                    if is_pending:
-                        lines.append(f"      ({pending_indicator})")
-                    else:
-                        summary = item.get('summary', '')
-                        indented_summary = summary.replace('\n', '\n      ')
-                        lines.append(f"      {indented_summary}")
-                    lines.append(f"      Lähde: {url}\n")
-
-            lines.append("") # Tyhjä rivi kategorioiden väliin
+                writer.item(source_idx, clean_title, url, state, is_pending, item)
+            writer.end_category()
 
         # 4. Lähdeluettelo loppuun
+        counts["sources"] = len(self.sources)
         if self.sources:
             sources_label = self.get_text("ui.sources_label", self.lang) or "LÄHTEET JA VIITTEET:"
-            lines.append("-" * 30)
-            lines.append(sources_label)
-            for i, url in enumerate(self.sources, 1):
-                lines.append(f"[{i}] {url}")
-            lines.append("-" * 30)
+            writer.sources(sources_label, ((number, url) for url, number in self.sources.items()))
+        writer.end()
+        return counts
 
-        return "\n".join(lines)
+    def build_report(self, entries, matcher, greeting, pending_indicator, show_full=False):
+        """Rakentaa koko raportin tekstimuodossa (merkkijonona)."""
+        import io
+        buffer = io.StringIO()
+        self.render(entries, matcher, greeting, pending_indicator, buffer, show_full=show_full)
+        report = buffer.getvalue()
+        return report[:-1] if report.endswith("\n") else report
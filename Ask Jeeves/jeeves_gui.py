@@ -14,32 +14,120 @@ Notes:
 """
 
 import customtkinter as ctk
-import subprocess
+import queue
 import sys
 import threading
 import webbrowser
 import json
 import os
-from jeeves_logic import MEMORY_FILE, METADATA_FILE, JeevesMemory, get_localized_text, get_priority_keywords, get_time_based_greeting
-from PIL import Image
+from jeeves_logic import MEMORY_DIR, METADATA_FILE, JeevesMemory, get_localized_text, get_priority_matcher, get_search_index, get_time_based_greeting
 from jeeves_personality import JeevesPersonality
+from jeeves_priority import PREFIXES
+from jeeves_settings import get_settings
+from jeeves_console import ConsoleLog
+from jeeves_newslist import NewsListModel, NewsRow, ROW_HEIGHT, WHEEL_ROWS
 from jeeves_updater import check_for_updates
+from jeeves_watch import MemoryWatcher
 
 # Päivitetty versionumero tähän
 CURRENT_VERSION = "3.1.0"
 
-class ConsoleRedirector:
-    def __init__(self, textbox):
-        self.textbox = textbox
-
-    def write(self, text):
-        self.textbox.configure(state="normal")
-        self.textbox.insert("end", text)
-        self.textbox.see("end")
-        self.textbox.configure(state="disabled")
-
-    def flush(self):
-        pass
+# Kuinka usein striimatut palaset siirretään jonosta tekstikenttään (ms)
+STREAM_POLL_MS = 30
+
+# Kuinka usein muistin muutokset (jeeves_watch) viedään listaan (ms)
+WATCH_POLL_MS = 100
+
+# Kuinka usein jeeves.conf tarkistetaan (jeeves_settings) (ms)
+SETTINGS_POLL_MS = 1000
+SETTINGS_SECTIONS = {"KEYWORDS", "FEEDS", "CATEGORIES"}
+
+# Hakukentän viive: haku tehdään, kun kirjoittaminen on pysähtynyt näin pitkäksi aikaa (ms)
+SEARCH_DELAY_MS = 200
+SEARCH_LIMIT = 200
+
+# Lokirivien värit tason mukaan (jeeves_console.level_of)
+CONSOLE_COLORS = {"error": "#ff6b6b", "success": "#7ee787"}
+
+class VirtualNewsList(ctk.CTkFrame):
+    """Uutislista, jossa painikkeita on vain näkyvien rivien verran (ks. jeeves_newslist.py)."""
+
+    def __init__(self, master, on_select, label_text="", row_height=ROW_HEIGHT, **kwargs):
+        super().__init__(master, **kwargs)
+        self.on_select = on_select
+        self.row_height = row_height
+        self.model = NewsListModel()
+        self.pool = []
+        self.bound = []
+
+        self.label = ctk.CTkLabel(self, text=label_text, font=ctk.CTkFont(weight="bold"))
+        self.label.pack(fill="x", pady=(4, 2))
+
+        self.scrollbar = ctk.CTkScrollbar(self, width=8, command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.body = ctk.CTkFrame(self, fg_color="transparent")
+        self.body.pack(side="left", expand=True, fill="both")
+        self.body.bind("<Configure>", self._on_configure)
+        self._bind_wheel(self.body)
+
+    def _bind_wheel(self, widget):
+        widget.bind("<MouseWheel>", lambda e: self.scroll_by(-WHEEL_ROWS if e.delta > 0 else WHEEL_ROWS))
+        widget.bind("<Button-4>", lambda e: self.scroll_by(-WHEEL_ROWS))
+        widget.bind("<Button-5>", lambda e: self.scroll_by(WHEEL_ROWS))
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * len(self.model.rows)))
+        elif action == "scroll":
+            step = self.model.visible if unit == "pages" else 1
+            self.scroll_by(int(amount) * step)
+
+    def _on_configure(self, event):
+        """Painikkeita luodaan näkyvän alueen verran (+1 osittain näkyvälle riville)."""
+        needed = max(1, event.height // self.row_height + 1)
+        while len(self.pool) < needed:
+            slot = len(self.pool)
+            button = ctk.CTkButton(self.body, text="", anchor="w", height=self.row_height - 4,
+                                   command=lambda s=slot: self._click(s))
+            self._bind_wheel(button)
+            self.pool.append(button)
+            self.bound.append(None)
+        while len(self.pool) > needed:
+            self.pool.pop().destroy()
+            self.bound.pop()
+        self.model.visible = needed
+        self.model.clamp()
+        self._render()
+
+    def _click(self, slot):
+        index = self.model.top + slot
+        if index < len(self.model.rows):
+            self.on_select(self.model.rows[index].payload)
+
+    def set_rows(self, rows, keep_position=True):
+        """Päivittää rivit; vain muuttuneet näkyvät painikkeet konfiguroidaan uudelleen."""
+        if not keep_position:
+            self.model.top = 0
+        self.model.set_rows(rows)
+        self._render()
+
+    def scroll_to(self, top):
+        if self.model.scroll_to(top):
+            self._render()
+
+    def scroll_by(self, rows):
+        self.scroll_to(self.model.top + rows)
+
+    def _render(self):
+        for slot, row in self.model.render_plan(self.bound):
+            button = self.pool[slot]
+            if row is None:
+                button.place_forget()
+            else:
+                button.configure(text=row.text, fg_color=row.color)
+                button.place(x=0, y=slot * self.row_height, relwidth=1.0)
+        self.scrollbar.set(*self.model.fractions())
 
 class JeevesGUI(ctk.CTk):
     def __init__(self):
@@ -84,6 +172,16 @@ class JeevesGUI(ctk.CTk):
                                         command=self.on_refresh)
         self.refresh_btn.pack(pady=(20, 10), padx=10, fill="x")
 
+        # Kokotekstihaku koko historiasta (jeeves_search); tyhjä kenttä = viikon uutiset
+        self.search_var = ctk.StringVar()
+        self.search_entry = ctk.CTkEntry(self.sidebar, textvariable=self.search_var,
+                                         placeholder_text=get_localized_text("ui.search_placeholder", self.lang))
+        self.search_entry.pack(pady=(0, 10), padx=10, fill="x")
+        self.search_entry.bind("<KeyRelease>", self._schedule_search)
+        self.search_entry.bind("<Escape>", lambda event: self.search_var.set("") or self._run_search())
+        self.search_query = ""
+        self._search_job = None
+
         # --- JAETAAN ALAPUOLI: IKONIT JA LISTA ---
         self.sidebar_content = ctk.CTkFrame(self.sidebar, fg_color="transparent")
         self.sidebar_content.pack(expand=True, fill="both")
@@ -93,20 +191,21 @@ class JeevesGUI(ctk.CTk):
         self.icon_bar.pack(side="left", fill="y", padx=(2, 0), pady=5)
         self.icon_bar.pack_propagate(False)
 
-        # B. Uutislista (Oikea reuna)
-        self.scrollable_list = ctk.CTkScrollableFrame(self.sidebar_content,
-                                                     label_text=get_localized_text("gui_news_feed", self.lang))
+        # B. Uutislista (Oikea reuna): virtualisoitu, painikkeet kierrätetään vierittäessä
+        self.scrollable_list = VirtualNewsList(self.sidebar_content,
+                                               on_select=self.show_details,
+                                               label_text=get_localized_text("gui_news_feed", self.lang))
         self.scrollable_list.pack(side="left", expand=True, fill="both", padx=5, pady=5)
-        self.scrollable_list._scrollbar.configure(width=8)
+        self.report_entries = None
+        self.category_totals = {}
+        self.priority = get_priority_matcher()
+        self.active_filter = None
 
-        # 2. Luodaan suodatin-ikonit pystyriviin
-        current_news = self.memory.get_report()
+        # 2. Luodaan suodatin-ikonit pystyriviin (määrät päivittyvät load_news-kutsussa)
         for cat, style in self.category_styles.items():
-            count = len(current_news) if cat == "Default" else sum(1 for e in current_news if e.get('category') == cat)
-
             btn = ctk.CTkButton(
                 self.icon_bar,
-                text=f"{style['icon']}\n{count}",
+                text=f"{style['icon']}\n0",
                 width=40,
                 height=45,
                 fg_color=style['color'],
@@ -132,6 +231,7 @@ class JeevesGUI(ctk.CTk):
 
         image_path = os.path.join(current_dir, "resources", "jeeves_avatar.png")
         try:
+            from PIL import Image
             self.jeeves_image = ctk.CTkImage(
                 light_image=Image.open(image_path),
                 dark_image=Image.open(image_path),
@@ -174,6 +274,11 @@ class JeevesGUI(ctk.CTk):
                                           command=self.open_url, state="disabled")
         self.open_web_btn.pack(side="right")
 
+        self.analyze_btn = ctk.CTkButton(self.button_frame,
+                                         text=get_localized_text("gui_analyze_now", self.lang),
+                                         command=self.analyze_now, state="disabled")
+        self.analyze_btn.pack(side="left")
+
         self.console_label = ctk.CTkLabel(self.content,
                                           text=get_localized_text("gui_system_log", self.lang),
                                           font=ctk.CTkFont(size=11, weight="bold"))
@@ -181,11 +286,33 @@ class JeevesGUI(ctk.CTk):
 
         self.console_box = ctk.CTkTextbox(self.content, height=150, font=("Consolas", 11), fg_color="#1a1a1a", text_color="#00ff00")
         self.console_box.pack(fill="x", pady=(5, 0))
+        for level, color in CONSOLE_COLORS.items():
+            self.console_box.tag_config(level, foreground=color)
         self.console_box.configure(state="disabled")
 
-        sys.stdout = ConsoleRedirector(self.console_box)
+        # Kaikki säikeet tulostavat jonoon; vain pääsäie kirjoittaa lokilaatikkoon
+        self.console = ConsoleLog(os.path.join(MEMORY_DIR, "jeeves_gui.log"), self.memory.config)
+        self.console_lines = 0
+        sys.stdout = self.console.stream
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.after(self.console.settings["frame_ms"], self._drain_console)
         self.current_entry = None
 
+        # "Analysoi nyt": taustasäie kirjoittaa jonoon, pääsäie tyhjentää sen after()-kutsuilla
+        self.stream_queue = queue.Queue()
+        self.streaming_entry = None
+        self._fetcher = None
+
+        # Elävä päivitys: seuraaja vie muistin muutokset jonoon, pääsäie soveltaa ne
+        self.watch_queue = queue.SimpleQueue()
+        self.watcher = None
+
+        # Asetusten muutokset: ilmoitus voi tulla mistä säikeestä tahansa, joten jonon kautta
+        self.settings_queue = queue.SimpleQueue()
+        self._unsubscribe_settings = get_settings().subscribe(
+            lambda settings, changed: self.settings_queue.put(changed), sections=SETTINGS_SECTIONS)
+        self.after(SETTINGS_POLL_MS, self._apply_settings_changes)
+
         # Luodaan pieni 100 millisekunnin viive, jotta loki ehtii mukaan
         self.after(100, self.start_up_routines)
 
@@ -193,9 +320,144 @@ class JeevesGUI(ctk.CTk):
         """Suorittaa alkutoimet niin, että ne ehtivät lokiin saakka."""
         startup_msg = get_localized_text("gui_startup_msg", self.lang)
         print(startup_msg)
+        # Seuraaja luodaan ennen latausta, jotta välissä tullut kirjoitus ei jää huomaamatta
+        self.watcher = MemoryWatcher(self.memory.path, lambda: JeevesMemory().get_report(days=7), self.watch_queue.put)
         self.load_news()
+        self.watcher.prime([entry for entry, _ in self.report_entries or []])
+        self.watcher.start()
+        self.after(WATCH_POLL_MS, self._apply_memory_changes)
         self.check_for_app_updates()
 
+    def _drain_console(self):
+        """Pääsäie: siirtää jonon rivit lokilaatikkoon kerralla, tasoittain ryhmiteltyinä."""
+        batch = self.console.drain()
+        if batch:
+            self.console_box.configure(state="normal")
+            group, level = [], None
+            for record in batch:
+                if record.level != level and group:
+                    self.console_box.insert("end", "\n".join(group) + "\n", level)
+                    group = []
+                level = record.level
+                group.append(record.text)
+            self.console_box.insert("end", "\n".join(group) + "\n", level)
+
+            # Rengaspuskuri: vanhimmat rivit pois, kun scrollback täyttyy
+            self.console_lines += len(batch)
+            excess = self.console_lines - self.console.scrollback.maxlen
+            if excess > 0:
+                self.console_box.delete("1.0", f"{excess + 1}.0")
+                self.console_lines -= excess
+            self.console_box.see("end")
+            self.console_box.configure(state="disabled")
+        self.after(self.console.settings["frame_ms"], self._drain_console)
+
+    def _apply_memory_changes(self):
+        """Pääsäie: soveltaa vain lisätyt, muuttuneet ja poistetut merkinnät listaan."""
+        deltas = []
+        try:
+            while True:
+                deltas.append(self.watch_queue.get_nowait())
+        except queue.Empty:
+            pass
+
+        if deltas and self.report_entries is not None:
+            # Uudet merkinnät tuovat priority_score-arvonsa mukanaan (jeeves_priority)
+            self.priority = get_priority_matcher()
+            added = changed = 0
+            for delta in deltas:
+                added += len(delta.added)
+                changed += len(delta.changed)
+                self._merge_delta(delta)
+            self._update_filter_counts()
+            self.load_news(filter_cat=self.active_filter)
+            if added or changed:
+                print(f"[*] Jeeves: Live update: {added} new, {changed} updated.")
+        self.after(WATCH_POLL_MS, self._apply_memory_changes)
+
+    def _merge_delta(self, delta):
+        totals = self.category_totals
+        if delta.removed:
+            removed = set(delta.removed)
+            kept = []
+            for entry, is_priority in self.report_entries:
+                if entry.get('url') in removed:
+                    totals[entry.get('category')] = totals.get(entry.get('category'), 1) - 1
+                else:
+                    kept.append((entry, is_priority))
+            self.report_entries = kept
+
+        resort = False
+        if delta.changed:
+            positions = {entry.get('url'): i for i, (entry, _) in enumerate(self.report_entries)}
+            for entry in delta.changed:
+                i = positions.get(entry.get('url'))
+                if i is None:
+                    continue
+                old, was_priority = self.report_entries[i]
+                is_priority = self.priority.score_entry(entry)
+                self.report_entries[i] = (entry, is_priority)
+                resort |= is_priority != was_priority
+                if old.get('category') != entry.get('category'):
+                    totals[old.get('category')] = totals.get(old.get('category'), 1) - 1
+                    totals[entry.get('category')] = totals.get(entry.get('category'), 0) + 1
+
+                # Avoinna oleva uutinen näytetään uudelleen (ellei sitä juuri analysoida)
+                if self.current_entry and self.current_entry.get('url') == entry.get('url'):
+                    self.current_entry = entry
+                    if self.streaming_entry is None:
+                        self.show_details(entry)
+
+        for entry in delta.added:
+            is_priority = self.priority.score_entry(entry)
+            self.report_entries.append((entry, is_priority))
+            totals[entry.get('category')] = totals.get(entry.get('category'), 0) + 1
+            resort |= bool(is_priority)
+
+        if resort:
+            # Vakaa lajittelu: järjestys säilyy muuten ennallaan
+            self.report_entries.sort(key=lambda x: x[1], reverse=True)
+
+    def _apply_settings_changes(self):
+        """Pääsäie: ottaa muuttuneet avainsanat käyttöön ilman uudelleenkäynnistystä."""
+        get_settings()  # tarkistaa mtime-arvon ja ilmoittaa muutoksista jonoon
+        changed = set()
+        try:
+            while True:
+                changed |= self.settings_queue.get_nowait()
+        except queue.Empty:
+            pass
+
+        if changed:
+            print(f"[*] Jeeves: Settings reloaded: {', '.join(sorted(changed))}")
+            if "KEYWORDS" in changed and self.report_entries is not None:
+                # Tallennetut priority_score-arvot ovat vanhoilla avainsanoilla: lasketaan uudelleen
+                self.priority = get_priority_matcher()
+                self.report_entries = [(entry, self.priority.score_entry(entry)) for entry, _ in self.report_entries]
+                self.report_entries.sort(key=lambda x: x[1], reverse=True)
+                self.load_news(filter_cat=self.active_filter)
+                if self.current_entry and self.streaming_entry is None:
+                    self.show_details(self.current_entry)
+            if "FEEDS" in changed or "CATEGORIES" in changed:
+                # Seuraava päivitys (JeevesPipeline) lukee uudet syötteet ja luokittelusäännöt
+                print("[*] Jeeves: New feeds and category rules apply from the next refresh.")
+        self.after(SETTINGS_POLL_MS, self._apply_settings_changes)
+
+    def _update_filter_counts(self):
+        counts = self.category_totals
+        for cat, style in self.category_styles.items():
+            if cat in self.filter_buttons:
+                count = sum(counts.values()) if cat == "Default" else counts.get(cat, 0)
+                self.filter_buttons[cat].configure(text=f"{style['icon']}\n{count}")
+
+    def on_close(self):
+        if self.watcher:
+            self.watcher.stop()
+        self._unsubscribe_settings()
+        sys.stdout = sys.__stdout__
+        self.console.close()
+        self.destroy()
+
     def check_for_app_updates(self):
         import threading
         from jeeves_logic import PersonalityEngine
@@ -254,26 +516,40 @@ class JeevesGUI(ctk.CTk):
         # 5. Suoritetaan varsinainen haku
         self.load_news(filter_cat=category)
 
-    def check_priority(self, title):
-        # Haetaan sanat configista
-        priority_keywords = self.get_keywords_from_config()
-
-        # Määritellään oikeasti kriittiset termit
-        critical_terms = ["CVE", "CRITICAL", "SECURITY", "VULNERABILITY"]
-
-        title_upper = title.upper()
-        for word in priority_keywords:
-            if word.upper() in title_upper:
-                # Jos sana on kriittisellä listalla -> [!!!]
-                if any(crit in word.upper() for crit in critical_terms):
-                    return True, "[!!!]"
-                # Muutoin se on vain kiinnostava -> [⭐]
-                return True, "[⭐]"
+    def _schedule_search(self, event=None):
+        """Hakua ei tehdä jokaisella näppäilyllä, vaan kun kirjoittaminen pysähtyy."""
+        if self._search_job is not None:
+            self.after_cancel(self._search_job)
+        self._search_job = self.after(SEARCH_DELAY_MS, self._run_search)
+
+    def _run_search(self):
+        self._search_job = None
+        query = self.search_var.get().strip()
+        if query == self.search_query:
+            return
+        self.search_query = query
+        self.load_news(filter_cat=self.active_filter)
+        # Uusi haku aloitetaan listan alusta
+        self.scrollable_list.scroll_to(0)
+
+    def _search_rows(self, filter_cat):
+        """Hakutulokset listan riveinä; kategoriasuodatin rajaa myös hakua."""
+        category = filter_cat if filter_cat and filter_cat != "Default" else None
+        try:
+            hits = get_search_index(build=True).search(self.search_query, limit=SEARCH_LIMIT, category=category)
+        except Exception as e:
+            print(f"[!] Jeeves: Search failed: {e}")
+            return []
+        return [{"title": h.title, "summary": h.summary, "url": h.url,
+                 "category": h.category, "timestamp": h.timestamp} for h in hits]
 
-        return False, ""
+    def check_priority(self, title):
+        # Kriittinen termi -> [!!!], muu prioriteettisana -> [⭐] (jeeves_priority)
+        level = get_priority_matcher().level(title)
+        return level > 0, PREFIXES[level]
 
     def update_speech_bubble(self, title):
-        is_priority, prefix = self.check_priority_status(title)
+        is_priority, prefix = self.check_priority(title)
 
         if is_priority:
             # TÄMÄ on se teidän toivoma lause:
@@ -285,34 +561,44 @@ class JeevesGUI(ctk.CTk):
             msg = get_localized_text("ui.gui_select_news", self.lang)
             self.speech_bubble.configure(text=msg)
 
-    def load_news(self, filter_cat=None):
-        for widget in self.scrollable_list.winfo_children():
-            widget.destroy()
+    def load_news(self, filter_cat=None, reload=False):
+        """Näyttää uutiset. Muisti ja asetukset luetaan vain ensimmäisellä kerralla ja päivityksessä."""
         try:
-            self.memory = JeevesMemory()
-            entries = self.memory.get_report(days=7)
-            prio_keywords = get_priority_keywords()
-            entries.sort(key=lambda x: any(k in x['title'].lower() for k in prio_keywords), reverse=True)
+            if reload or self.report_entries is None:
+                self.memory = JeevesMemory()
+                self.priority = get_priority_matcher()
+                entries = [(entry, self.priority.score_entry(entry)) for entry in self.memory.get_report(days=7)]
+                entries.sort(key=lambda x: x[1], reverse=True)
+                self.report_entries = entries
+                self.category_totals = {}
+                for entry, _ in entries:
+                    cat = entry.get('category')
+                    self.category_totals[cat] = self.category_totals.get(cat, 0) + 1
+                self._update_filter_counts()
+
+            if self.search_query:
+                # Haku: järjestys tulee BM25-pisteistä, ei prioriteetista
+                entries = [(entry, self.priority.score_entry(entry)) for entry in self._search_rows(filter_cat)]
+            else:
+                entries = self.report_entries
 
-            for entry in entries:
+            rows = []
+            for entry, is_priority in entries:
                 cat_name = entry.get('category', 'Default')
                 if filter_cat and filter_cat != "Default" and cat_name != filter_cat:
                     continue
 
-                is_priority = any(k in entry['title'].lower() for k in prio_keywords)
                 orig_title = entry.get('title', 'No Title')
                 disp_title = (orig_title[:38] + "..") if len(orig_title) > 38 else orig_title
                 style = self.category_styles.get(cat_name, self.category_styles.get("Default", {"icon": "•", "color": "transparent"}))
 
                 bg_color = "#3d1414" if is_priority else style['color']
                 icon = "⚠️" if is_priority else style['icon']
+                rows.append(NewsRow(entry.get('url') or id(entry), f"{icon} {disp_title}", bg_color, entry))
 
-                btn = ctk.CTkButton(self.scrollable_list,
-                                    text=f"{icon} {disp_title}",
-                                    anchor="w",
-                                    fg_color=bg_color,
-                                    command=lambda e=entry: self.show_details(e))
-                btn.pack(fill="x", pady=2, padx=5)
+            # Suodattimen vaihtuessa aloitetaan alusta, päivityksessä pysytään kohdalla
+            self.scrollable_list.set_rows(rows, keep_position=(filter_cat == self.active_filter))
+            self.active_filter = filter_cat
         except Exception as e:
             print(f"[!] Error loading news: {e}")
 
@@ -320,70 +606,138 @@ class JeevesGUI(ctk.CTk):
         self.current_entry = entry
         self.title_var.set(entry['title'])
         self.open_web_btn.configure(state="normal")
+        if self.streaming_entry is None:
+            self.analyze_btn.configure(state="normal")
         category = entry.get('category', 'Default')
-        priority_keywords = get_priority_keywords()
-        priority = "Critical" if any(k in entry['title'].lower() for k in priority_keywords) else "Normal"
+        priority = "Critical" if get_priority_matcher().score_entry(entry) else "Normal"
         self.speech_bubble.configure(text=self.personality.get_commentary(category, priority, self.lang))
 
         intro = get_localized_text("analysis_intro", self.lang)
         source_label = get_localized_text("ui.sources_label", self.lang) or "LÄHTEET JA VIITTEET:"
         full_display_text = f"{intro}\n\n{entry.get('summary', '').strip()}\n"
-        full_display_text += f"\n{'-'*60}\n{source_label}\n• Lähde: {entry.get('url', '#')}\n• Kategoria: {category}\n{'-'*60}"
+        full_display_text += f"\n{'-'*60}\n{source_label}\n• Lähde: {entry.get('url', '#')}\n• Kategoria: {category}"
+        # Lähes samat uutiset muista syötteistä (jeeves_dedup) käyttävät tätä analyysiä
+        for related in entry.get('related', []):
+            full_display_text += f"\n• Sama uutinen: {related.get('url')}"
+        full_display_text += f"\n{'-'*60}"
 
         self.summary_text.configure(state="normal")
         self.summary_text.delete("0.0", "end")
         self.summary_text.insert("0.0", full_display_text)
         self.summary_text.configure(state="disabled")
 
+    def analyze_now(self):
+        """Analysoi valitun uutisen heti; vastaus striimataan summary_text-kenttään."""
+        entry = self.current_entry
+        if not entry or self.streaming_entry is not None:
+            return
+        self.streaming_entry = entry
+        self.analyze_btn.configure(state="disabled", text=get_localized_text("gui_analyzing_now", self.lang))
+
+        intro = get_localized_text("analysis_intro", self.lang)
+        self.summary_text.configure(state="normal")
+        self.summary_text.delete("0.0", "end")
+        self.summary_text.insert("0.0", f"{intro}\n\n")
+        self.summary_text.configure(state="disabled")
+
+        threading.Thread(target=self._stream_worker, args=(entry,), daemon=True).start()
+        self.after(STREAM_POLL_MS, self._drain_stream)
+
+    def _stream_worker(self, entry):
+        """Taustasäie: ei koske widgetteihin, vaan vie palaset jonoon."""
+        try:
+            if self._fetcher is None:
+                # Gemini-SDK tuodaan vasta ensimmäisellä analyysillä
+                from ask_jeeves import JeevesFetcher
+                self._fetcher = JeevesFetcher(memory=self.memory)
+            summary, provider = self._fetcher.stream_with_failover(
+                entry['title'], entry['url'], lambda text: self.stream_queue.put(("chunk", text)))
+            self.stream_queue.put(("done", (summary, provider)))
+        except Exception as e:
+            self.stream_queue.put(("error", e))
+
+    def _drain_stream(self):
+        """Pääsäie: siirtää kertyneet palaset tekstikenttään yhdellä päivityksellä."""
+        chunks = []
+        finished = None
+        try:
+            while finished is None:
+                kind, payload = self.stream_queue.get_nowait()
+                if kind == "chunk":
+                    chunks.append(payload)
+                else:
+                    finished = (kind, payload)
+        except queue.Empty:
+            pass
+
+        entry = self.streaming_entry
+        # Jos käyttäjä vaihtoi uutista kesken, teksti tallennetaan mutta ei näytetä
+        if chunks and self.current_entry is entry:
+            self.summary_text.configure(state="normal")
+            self.summary_text.insert("end", "".join(chunks))
+            self.summary_text.see("end")
+            self.summary_text.configure(state="disabled")
+
+        if finished is None:
+            self.after(STREAM_POLL_MS, self._drain_stream)
+            return
+
+        self.streaming_entry = None
+        self.analyze_btn.configure(state="normal" if self.current_entry else "disabled",
+                                   text=get_localized_text("gui_analyze_now", self.lang))
+        kind, payload = finished
+        if kind == "done" and payload[0]:
+            summary, provider = payload
+            self._save_streamed_summary(entry, summary)
+            print(f"[+] Jeeves: {provider}: {get_localized_text('analysis_done', self.lang)}")
+            if self.current_entry is entry:
+                self.show_details(entry)
+        else:
+            print(f"[!] Jeeves: Analysis failed: {payload}")
+
+    def _save_streamed_summary(self, entry, summary):
+        """Valmis teksti talteen aktiiviseen muistiin ja pysyvään arkistoon."""
+        entry['summary'] = summary
+        try:
+            # Tuore muisti: taustapäivitys on voinut kirjoittaa tiedostoa välillä
+            saved = JeevesMemory().update_summary(entry['url'], summary)
+            from jeeves_archive import JeevesArchive
+            JeevesArchive().save_to_archive(saved or entry)
+        except Exception as e:
+            print(f"[!] Jeeves: Could not save the analysis: {e}")
+
     def open_url(self):
         if self.current_entry:
             webbrowser.open(self.current_entry['url'])
 
     def run_logic_task(self):
-        """Suorittaa uutisten haun taustalla ja lukee lokia UTF-8 muodossa."""
-        # 1. Pakotetaan ympäristö käyttämään UTF-8 (korjaa ääkköset)
-        env = os.environ.copy()
-        env["PYTHONIOENCODING"] = "utf-8"
-
+        """Suorittaa uutisten haun taustalla samassa prosessissa (JeevesPipeline)."""
         try:
-            # 2. Käynnistetään prosessi parannetuilla asetuksilla
-            process = subprocess.Popen(
-                [sys.executable, "jeeves.py"],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                encoding="utf-8", # Varmistaa, että Python lukee tekstin oikein
-                env=env
-            )
+            # Tuodaan vasta tarvittaessa: SDK:t ladataan ensimmäisellä päivityksellä
+            from jeeves_pipeline import JeevesPipeline
 
-            # 3. Luetaan lokia reaaliajassa
-            if process.stdout:
-                for line in process.stdout:
-                    print(line, end="") # Ohjautuu vihreään laatikkoon
-
-            process.wait()
+            # Tulosteet ohjautuvat jonon kautta vihreään lokilaatikkoon (jeeves_console)
+            JeevesPipeline().run()
         except Exception as e:
             print(f"[!] Virhe uutisten haussa: {e}")
 
-        # 4. Palataan pääsäikeeseen päivittämään lista
+        # Palataan pääsäikeeseen päivittämään lista
         self.after(0, self.finish_refresh)
 
     def on_refresh(self):
         self.console_box.configure(state="normal")
         self.console_box.delete("0.0", "end")
         self.console_box.configure(state="disabled")
+        self.console.clear()
+        self.console_lines = 0
         self.refresh_btn.configure(state="disabled", text=get_localized_text("gui_refreshing", self.lang))
         threading.Thread(target=self.run_logic_task, daemon=True).start()
 
     def finish_refresh(self):
         self.refresh_btn.configure(state="normal", text=get_localized_text("gui_refresh", self.lang))
-        self.memory = JeevesMemory()
-        current_news = self.memory.get_report()
-        for cat, style in self.category_styles.items():
-            if cat in self.filter_buttons:
-                count = len(current_news) if cat == "Default" else sum(1 for e in current_news if e.get('category') == cat)
-                self.filter_buttons[cat].configure(text=f"{style['icon']}\n{count}")
-        self.load_news()
+        # Muutokset tulevat seuraajan kautta; tarkistetaan heti, ettei odoteta tapahtumaa
+        if self.watcher:
+            self.watcher.check_now()
 
     def check_for_app_updates(self):
         import threading
@@ -19,122 +19,290 @@ import sys, io
 import configparser
 import time
 import shutil
+import threading
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-
-# Pakotetaan standarditulosteet UTF-8 muotoon
-if sys.stdout.encoding != 'utf-8':
-    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+from jeeves_settings import get_settings, get_language
 
 # 1. Peruspolut
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
+# Flow-työkalujen yhteiset moduulit (flow_resilience.py) ovat repositorion juuressa
+FLOW_ROOT = os.path.dirname(BASE_DIR)
+if FLOW_ROOT not in sys.path:
+    sys.path.append(FLOW_ROOT)
+
 # 2. Kansioiden määritykset
 RESOURCES_DIR = os.path.join(BASE_DIR, "resources")
 MEMORY_DIR = os.path.join(BASE_DIR, "archive")
 
-# --- AUTOMAATTINEN TARKISTUS ---
-# Luodaan kansiot, jos niitä ei ole olemassa
-for directory in [RESOURCES_DIR, MEMORY_DIR]:
-    if not os.path.exists(directory):
-        os.makedirs(directory)
-        print(f"[*] Jeeves: Created missing folder: {directory}")
-# -------------------------------
-
 # 3. Tiedostojen polut
 MEMORY_FILE = os.path.join(MEMORY_DIR, "jeeves_memory.json")
+MEMORY_DB_FILE = os.path.join(MEMORY_DIR, "jeeves_memory.db") # [MEMORY] backend = sqlite
+MEMORY_SEGMENTS_DIR = os.path.join(MEMORY_DIR, "memory") # [MEMORY] backend = segments
+RETIRED_DIR = os.path.join(MEMORY_DIR, "retired") # rotaatiossa poistetut päiväsegmentit
+SEARCH_DB_FILE = os.path.join(MEMORY_DIR, "search_index.db") # kokotekstihaku (jeeves_search)
+DEDUP_DB_FILE = os.path.join(MEMORY_DIR, "dedup_index.db") # lähes samat uutiset (jeeves_dedup)
 # METADATA_FILE = os.path.join(RESOURCES_DIR, "jeeves_metadata.json") # metadata (Localization)
 METADATA_FILE = os.path.join(RESOURCES_DIR, "personality.json")
-CONFIG_FILE = os.path.join(BASE_DIR, "jeeves.conf") # Pidetään juuressa turvassa
-
-if not os.path.exists(METADATA_FILE):
-    print(f"[!] WARNING: {METADATA_FILE} is missing. The program may not function properly.")
+CONFIG_FILE = os.path.join(BASE_DIR, "jeeves.conf") # Pidetään juuressa turvassa (ks. jeeves_settings.py)
+CIRCUIT_STATE_FILE = os.path.join(MEMORY_DIR, "circuit_state.json") # katkaisimet (flow_resilience)
+
+# Moduulin tuonti ei tee levyoperaatioita eikä tulosta mitään: alla olevat
+# funktiot kutsutaan vasta ohjelman käynnistyessä (check_environment, __main__).
+
+def force_utf8_output():
+    """Pakotetaan standarditulosteet UTF-8 muotoon (vain komentoriviltä ajettaessa)."""
+    if getattr(sys.stdout, 'encoding', 'utf-8') != 'utf-8' and hasattr(sys.stdout, 'buffer'):
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
+
+def ensure_directories():
+    """Luodaan kansiot, jos niitä ei ole olemassa."""
+    for directory in [RESOURCES_DIR, MEMORY_DIR]:
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+            print(f"[*] Jeeves: Created missing folder: {directory}")
+
+class LocalizationCatalog:
+    """Prosessinlaajuinen välimuisti personality.json-tiedostolle.
+
+    Tiedosto jäsennetään kerran ja jokainen pisteellä eroteltu avainpolku
+    (esim. "personality.greetings.morning") litistetään valmiiksi hakutauluun.
+    Tiedosto ladataan uudelleen vain, jos sen muokkausaika (mtime) muuttuu.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.mtime = None
+        self.data = {}
+        self.paths = {}
+        self.error = None
+
+    def _flatten(self, node, prefix, table):
+        for key, value in node.items():
+            path = f"{prefix}.{key}" if prefix else key
+            table[path] = value
+            if isinstance(value, dict):
+                self._flatten(value, path, table)
+
+    def _refresh(self):
+        """Tarkistaa mtime-arvon ja lataa tiedoston uudelleen tarvittaessa."""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            self.mtime, self.data, self.paths = None, {}, {}
+            self.error = FileNotFoundError(self.path)
+            return
 
-def get_config_value(key, lang="fi"):
-    """Hakee teknisen konfiguraation metadatasta."""
-    try:
-        with open(METADATA_FILE, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            return data.get(lang, {}).get("system_config", {}).get(key)
-    except Exception as e:
-        print(f"[!] Error retrieving configuration: {e}")
-        return None
+        if mtime == self.mtime:
+            return
 
-def get_localized_text(key_path, lang="fi"):
-    try:
-        # Varmistetaan, että käytetään globaalia polkua
-        if not os.path.exists(METADATA_FILE):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.error = None
+        except Exception as e:
+            data = {}
+            self.error = e
+
+        paths = {}
+        for lang, lang_data in data.items():
+            if isinstance(lang_data, dict):
+                table = {}
+                self._flatten(lang_data, "", table)
+                paths[lang] = table
+
+        self.data, self.paths, self.mtime = data, paths, mtime
+
+    def language(self, lang):
+        """Palauttaa kielen hakutaulun ja alkuperäisen datan (fallback: en)."""
+        self._refresh()
+        if lang in self.data:
+            return self.paths.get(lang, {}), self.data[lang]
+        return self.paths.get("en", {}), self.data.get("en", {})
+
+    def get_system_config(self, key, lang):
+        self._refresh()
+        if self.error is not None:
+            raise self.error
+        return self.data.get(lang, {}).get("system_config", {}).get(key)
+
+    def lookup(self, key_path, lang):
+        table, lang_data = self.language(lang)
+        if self.error is not None:
             return f"[{key_path}]"
 
-        with open(METADATA_FILE, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-
-        # Valitaan kieli tai fallback englantiin
-        lang_data = data.get(lang, data.get("en", {}))
-
-        # 1. Piste-navigointi (esim. "personality.greetings.morning")
-        keys = key_path.split('.')
-        val = lang_data
-        for k in keys:
-            if isinstance(val, dict) and k in val:
-                val = val[k]
-            else:
-                val = None
-                break
-
-        # Jos löytyi validi merkkijono, palautetaan se
+        # 1. Piste-navigointi valmiiksi litistetystä taulusta
+        val = table.get(key_path)
         if val and isinstance(val, str):
             return val
 
         # 2. Varajärjestelmä automaattisille lohkohauille
         for section in ["ui", "personality"]:
-            if section in lang_data and key_path in lang_data[section]:
-                result = lang_data[section][key_path]
+            block = lang_data.get(section)
+            if block is not None and key_path in block:
                 # Jos kyseessä on lista (kuten idle_comments), palautetaan se sellaisenaan
-                return result
+                return block[key_path]
 
         return f"[{key_path}]"
-    except Exception:
-        return f"[{key_path}]"
 
-def get_priority_keywords():
-    """Hakee prioriteettiavainsanat konfiguraatiosta vikasietoisesti."""
-    config = configparser.ConfigParser()
-    if os.path.exists(CONFIG_FILE):
-        try:
-            # Yritetään ensin standardia UTF-8
-            config.read(CONFIG_FILE, encoding='utf-8')
-        except (UnicodeDecodeError, Exception):
-            # Jos epäonnistuu, käytetään latin-1 (joka lukee Windowsin ä-kirjaimet oikein)
-            config.read(CONFIG_FILE, encoding='latin-1')
 
-        if 'KEYWORDS' in config and 'priority' in config['KEYWORDS']:
-            return [k.strip() for k in config['KEYWORDS']['priority'].split(',') if k.strip()]
-    return []
+_catalog = LocalizationCatalog(METADATA_FILE)
 
-def get_news_category(title, source_name=""):
-    """Määrittää uutisen kategorian avainsanojen ja lähteen perusteella."""
-    t = title.lower()
-    s = source_name.lower()
+def get_config_value(key, lang="fi"):
+    """Hakee teknisen konfiguraation metadatasta."""
+    try:
+        return _catalog.get_system_config(key, lang)
+    except Exception as e:
+        print(f"[!] Error retrieving configuration: {e}")
+        return None
 
-    # 1. Pelit ja Steam
-    if any(x in t for x in ['steam', 'gaming', 'proton', 'wine', 'valve', 'peli', 'fps']) or "gaming" in s:
-        return "Gaming"
+def get_localized_text(key_path, lang="fi"):
+    try:
+        return _catalog.lookup(key_path, lang)
+    except Exception:
+        return f"[{key_path}]"
 
-    # 2. Laitteisto (Hardware)
-    if any(x in t for x in ['nvidia', 'amd', 'intel', 'cpu', 'gpu', 'rtx', 'ryzen', 'benchmarks', 'displayport']):
-        return "Hardware"
+_priority_matcher = None
+_priority_key = None
 
-    # 3. Tietoturva (Security)
-    if any(x in t for x in ['cve', 'vulnerability', 'security', 'haavoittuvuus', 'patched', 'exploit']):
-        return "Security"
+def get_priority_matcher():
+    """Palauttaa jaetun prioriteettivertailijan (jeeves_priority.py).
 
-    # 4. Ubuntu
-    if "ubuntu" in t or "canonical" in t:
-        return "Ubuntu"
+    Avainsanat käännetään uudelleen vain, kun jeeves.conf on muuttunut
+    (JeevesSettings.version); muuten jokainen kutsu on pelkkä stat().
+    """
+    global _priority_matcher, _priority_key
+    settings = get_settings()
+    if _priority_matcher is None or settings.version != _priority_key:
+        from jeeves_priority import PriorityMatcher, DEFAULT_CRITICAL
+        _priority_matcher = PriorityMatcher(settings.priority_keywords, settings.critical_terms or DEFAULT_CRITICAL)
+        _priority_key = settings.version
+    return _priority_matcher
 
-    # Oletus
-    return "Linux"
+def get_priority_keywords():
+    """Hakee prioriteettiavainsanat konfiguraatiosta vikasietoisesti."""
+    return list(get_priority_matcher().keywords)
+
+_classifier = None
+_classifier_key = None
+
+def get_classifier():
+    """Palauttaa käännetyn kategorialuokittelijan (jeeves_classifier.py).
+
+    Taksonomia luetaan personality.json-tiedostosta ("category_rules") ja
+    jeeves.conf-tiedoston [CATEGORIES]-lohkosta. Luokittelija käännetään
+    uudelleen vain, jos jompikumpi tiedosto muuttuu.
+    """
+    global _classifier, _classifier_key
+    _catalog._refresh()
+    settings = get_settings()
+    key = (_catalog.mtime, settings.version)
+    if _classifier is None or key != _classifier_key:
+        from jeeves_classifier import CategoryClassifier
+        _classifier = CategoryClassifier.from_taxonomy(_catalog.data.get("category_rules"), settings.config)
+        _classifier_key = key
+    return _classifier
 
+def get_news_category(title, source_name=""):
+    """Määrittää uutisen kategorian avainsanojen ja lähteen perusteella."""
+    return get_classifier().classify(title, source_name)
+
+
+_search_index = None
+_search_lock = threading.Lock()
+
+def get_search_index(build=False):
+    """Palauttaa prosessin jaetun hakuindeksin (jeeves_search.py).
+
+    build=True täyttää indeksin kerran olemassa olevasta datasta: vanhat
+    jeeves_archive_*.json-tiedostot, archive/retired/, uutisarkisto ja
+    aktiivinen muisti (tässä järjestyksessä, joten uusin versio jää voimaan).
+    Kirjoitukset (add_entry, save_to_archive) eivät odota täyttöä.
+    """
+    global _search_index
+    with _search_lock:
+        if _search_index is None:
+            from jeeves_search import SearchIndex
+            ensure_directories()
+            _search_index = SearchIndex(SEARCH_DB_FILE)
+        if build and not _search_index.get_meta("built"):
+            build_search_index(_search_index)
+    return _search_index
+
+def build_search_index(index, memory=None):
+    """Indeksoi kaiken tallennetun datan uudelleen. Palauttaa indeksoitujen määrän."""
+    import glob
+    from jeeves_archive import JeevesArchive
+    from jeeves_segments import SegmentStore, entry_day, live_records
+
+    started = time.perf_counter()
+    total = 0
+    index.begin()
+    try:
+        for path in sorted(glob.glob(os.path.join(MEMORY_DIR, "jeeves_archive_*.json"))):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    total += index.upsert(json.load(f).get('archive', []))
+            except (OSError, ValueError, AttributeError) as e:
+                print(f"[!] Jeeves: Skipped {os.path.basename(path)} in search index: {e}")
+
+        batch = []
+        sources = (live_records(SegmentStore(RETIRED_DIR, entry_day)), JeevesArchive(index_search=False).store.read())
+        for source in sources:
+            for record in source:
+                batch.append(record)
+                if len(batch) >= 5000:
+                    total += index.upsert(batch)
+                    batch = []
+        total += index.upsert(batch)
+
+        memory = memory or JeevesMemory()
+        total += index.upsert(memory.data['archive'])
+        index.set_meta("built", time.time())
+    finally:
+        index.end()
+    index.optimize()
+    print(f"[*] Jeeves: Search index built: {total} items in {time.perf_counter() - started:.1f}s")
+    return total
+
+_dedup_index = None
+
+def get_dedup_index(memory=None):
+    """Palauttaa lähes-duplikaattien LSH-indeksin (jeeves_dedup.py) tai None, jos [DEDUP] enabled = no.
+
+    Ensimmäisellä kerralla indeksi täytetään aktiivisesta muistista ja
+    arkiston window_days-ikkunasta (vain ikkunan päiväsegmentit luetaan).
+    """
+    global _dedup_index
+    from jeeves_dedup import NearDuplicateIndex, get_dedup_settings
+    settings = get_dedup_settings(get_settings().config)
+    if not settings["enabled"]:
+        return None
+    with _search_lock:
+        if _dedup_index is None:
+            ensure_directories()
+            _dedup_index = NearDuplicateIndex(DEDUP_DB_FILE, settings)
+            _dedup_index.prune()
+            if not _dedup_index.get_meta("built"):
+                from jeeves_archive import JeevesArchive
+                from jeeves_storage import entry_timestamp
+                since = time.time() - settings["window_days"] * 86400
+                stories = list(JeevesArchive(index_search=False).read(start=since))
+                stories += (memory or JeevesMemory()).get_report(days=settings["window_days"])
+                for entry in stories:
+                    _dedup_index.add(entry.get('url'), entry.get('title'), timestamp=entry_timestamp(entry), commit=False)
+                _dedup_index.set_meta("built", time.time())
+                print(f"[*] Jeeves: Near-duplicate index built from {len(stories)} stories.")
+        _dedup_index.settings = settings
+    return _dedup_index
+
+def index_for_search(entries):
+    """Päivittää merkinnät hakuindeksiin; virhe ei koskaan estä tallennusta."""
+    try:
+        get_search_index().upsert(entries)
+    except Exception as e:
+        print(f"[!] Jeeves: Search index update failed: {e}")
 
 def format_summary(text):
     """Lisää sisennykset ja kauneusvirheet tekstiin, sir."""
@@ -145,6 +313,11 @@ def format_summary(text):
 
 def check_environment():
     """Varmistaa, että tarvittavat tiedostot ovat olemassa, luo ne tarvittaessa."""
+    # 0. Kansiot ja lokalisointitiedosto
+    ensure_directories()
+    if not os.path.exists(METADATA_FILE):
+        print(f"[!] WARNING: {METADATA_FILE} is missing. The program may not function properly.")
+
     # 1. Luodaan konfiguraatio, jos se puuttuu
     if not os.path.exists(CONFIG_FILE):
         print(f"[*] Jeeves: Luodaan uusi konfiguraatiotiedosto: {CONFIG_FILE}")
@@ -157,7 +330,9 @@ def check_environment():
         }
         config['FEEDS'] = {
             'linux_primary': 'https://www.phoronix.com/rss.php',
-            'security_primary': 'https://nvd.nist.gov/feeds/xml/cve/misc/nvd-rss.xml'
+            'security_primary': 'https://nvd.nist.gov/feeds/xml/cve/misc/nvd-rss.xml',
+            'concurrency': '4',
+            'timeout': '20'
         }
         config['KEYWORDS'] = {'priority': 'CVE, Kernel, Security, Critical, CachyOS'}
 
@@ -165,8 +340,9 @@ def check_environment():
             config.write(f)
         print("[!] Huomio: Käykää lisäämässä API-avaimet tiedostoon, sir.")
 
-    # 2. Luodaan muisti, jos se puuttuu
-    if not os.path.exists(MEMORY_FILE):
+    # 2. Luodaan muisti, jos se puuttuu (sqlite- ja segments-muisti luovat omansa)
+    backend = get_settings().config.get('MEMORY', 'backend', fallback='json').strip().lower()
+    if backend == 'json' and not os.path.exists(MEMORY_FILE):
         print(f"[*] Jeeves: Alustetaan uusi arkisto: {MEMORY_FILE}")
         with open(MEMORY_FILE, 'w', encoding='utf-8') as f:
             json.dump({"archive": []}, f, indent=4)
@@ -182,39 +358,171 @@ def check_environment():
 
 import configparser
 
+def get_pending_markers():
+    """Palauttaa odotustilan tekstit molemmilla kielillä (analyysi puuttuu)."""
+    return {get_localized_text("pending", "fi"), get_localized_text("pending", "en")}
+
 class JeevesMemory:
     def __init__(self):
-        # 1. Ladataan konfiguraatio (TÄRKEÄÄ: Lisätty tämä osa)
-        self.config = configparser.ConfigParser()
-        if os.path.exists(CONFIG_FILE):
-            self.config.read(CONFIG_FILE, encoding='utf-8')
+        # 1. Konfiguraatio jaetusta asetusoliosta (luetaan uudelleen vain muuttuessaan)
+        self.config = get_settings().config
 
-        # 2. Asetetaan kieli attribuuttiin (KORJAA AIEMMAT VIRHEET)
-        # Katsotaan SETTINGS-lohkosta language, oletus 'fi'
-        try:
-            self.lang = self.config['SETTINGS'].get('language', 'fi').lower()
-        except (KeyError, Exception):
-            self.lang = 'fi'
+        # 2. Asetetaan kieli attribuuttiin (sama oletus kaikkialla, ks. jeeves_settings.py)
+        self.lang = get_language(self.config)
 
-        # 3. Ladataan uutisdata (alkuperäinen logiikka)
-        self.data = self._load_data()
+        # 3. Tallennusasetukset [MEMORY]-lohkosta
+        # compact = yes kirjoittaa tiiviin (sisentämättömän) JSON:n
+        # flush_every / flush_interval rajaavat erätallennuksen kokoa ja kestoa
+        try:
+            self.compact = self.config.getboolean('MEMORY', 'compact', fallback=False)
+            self.flush_every = self.config.getint('MEMORY', 'flush_every', fallback=50)
+            self.flush_interval = self.config.getfloat('MEMORY', 'flush_interval', fallback=5.0)
+        except ValueError:
+            self.compact, self.flush_every, self.flush_interval = False, 50, 5.0
+
+        self._batch_depth = 0
+        self._dirty = 0
+        self._last_flush = time.monotonic()
+        self._urls = None
+        # Erän aikana hakuindeksin päivitykset kerätään tähän (URL -> merkintä)
+        self._search_pending = {}
+        self._search_flushed = time.monotonic()
+
+        # 4. Tallennustapa: json (oletus), sqlite tai segments
+        self.backend = self.config.get('MEMORY', 'backend', fallback='json').strip().lower()
+        self.store = None
+        if self.backend in ('sqlite', 'segments'):
+            ensure_directories()
+            if self.backend == 'sqlite':
+                from jeeves_storage import SqliteMemoryStore
+                self.store = SqliteMemoryStore(MEMORY_DB_FILE, get_pending_markers())
+            else:
+                from jeeves_segments import SegmentMemoryStore
+                self.store = SegmentMemoryStore(MEMORY_SEGMENTS_DIR)
+            # Kertaluonteinen migraatio vanhasta JSON-muistista
+            if os.path.exists(MEMORY_FILE):
+                migrated = self.store.migrate_from_json(MEMORY_FILE)
+                print(f"[*] Jeeves: Siirretty {migrated} uutista muistiin: {self.store.path}")
+            self._data = None
+        else:
+            # 5. Ladataan uutisdata (alkuperäinen logiikka)
+            self._data = self._load_data()
+
+    @property
+    def data(self):
+        """Koko aktiivinen muisti muodossa {"archive": [...]}.
+
+        SQLite-tilassa lista muodostetaan vasta pyydettäessä; nopeammat
+        kyselyt (get_report, get_pending, has_url) eivät tarvitse sitä.
+        """
+        if self.store:
+            return self.store.materialize()
+        return self._data
+
+    @property
+    def path(self):
+        """Tiedosto, jonka muuttuminen tarkoittaa muistin muuttumista (GUI:n seuranta)."""
+        return self.store.path if self.store else MEMORY_FILE
 
     def _load_data(self):
         if os.path.exists(MEMORY_FILE):
             try:
                 with open(MEMORY_FILE, 'r', encoding='utf-8') as f:
                     return json.load(f)
-            except Exception:
+            except Exception as e:
+                # Rikkinäistä tiedostoa ei ylikirjoiteta hiljaa: siirretään se talteen
+                broken = f"{MEMORY_FILE}.corrupt-{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+                try:
+                    os.replace(MEMORY_FILE, broken)
+                    print(f"[!] Jeeves: Muistitiedosto oli vioittunut ({e}). Varmuuskopio: {broken}")
+                except OSError:
+                    print(f"[!] Jeeves: Muistitiedosto oli vioittunut: {e}")
                 return {"archive": []}
         return {"archive": []}
 
-    def _save_data(self):
-        """ Tallentaa nykyisen tiedon muistiin """
-        try:
-            with open(MEMORY_FILE, 'w', encoding='utf-8') as f:
+    def _write_atomic(self):
+        """Kirjoittaa muistin väliaikaistiedostoon ja vaihtaa sen paikalleen atomisesti."""
+        ensure_directories()
+        tmp_path = f"{MEMORY_FILE}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            if self.compact:
+                json.dump(self.data, f, ensure_ascii=False, separators=(',', ':'))
+            else:
                 json.dump(self.data, f, indent=4, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, MEMORY_FILE)
+
+    def flush(self):
+        """Kirjoittaa odottavat muutokset levylle heti."""
+        try:
+            if self.store:
+                self.store.save_changed()
+            else:
+                self._write_atomic()
+            self._dirty = 0
+            self._last_flush = time.monotonic()
         except Exception as e:
             print(f"[!] Virhe tallennettaessa muistia: {e}")
+        self._flush_search()
+
+    def _flush_search(self):
+        """Kirjoittaa kerätyt hakuindeksin päivitykset yhdellä lyhyellä transaktiolla."""
+        if self._search_pending:
+            entries = list(self._search_pending.values())
+            self._search_pending = {}
+            index_for_search(entries)
+        self._search_flushed = time.monotonic()
+
+    def _index_for_search(self, entry):
+        """Erän ulkopuolella indeksoidaan heti; erässä kerätään ja kirjoitetaan rajojen täyttyessä.
+
+        Hakuindeksin kirjoitustransaktiota ei pidetä auki koko erän (minuuttien
+        AI-kutsujen) ajan, jotta muut prosessit (GUI, cron) voivat tallentaa.
+        """
+        if self._batch_depth == 0:
+            index_for_search([entry])
+            return
+        self._search_pending[entry.get('url')] = entry
+        if len(self._search_pending) >= self.flush_every or \
+                time.monotonic() - self._search_flushed >= self.flush_interval:
+            self._flush_search()
+
+    def _save_data(self):
+        """ Tallentaa nykyisen tiedon muistiin.
+
+        Erän (batch) sisällä muutos vain merkitään, ja levylle kirjoitetaan
+        vasta erän lopussa tai kun koko- tai aikaraja täyttyy.
+        """
+        self._dirty += 1
+        if self._batch_depth == 0:
+            self.flush()
+        elif self._dirty >= self.flush_every or \
+                time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    @contextmanager
+    def batch(self):
+        """Kerää useamman muutoksen yhdeksi tallennukseksi.
+
+        Käyttö:
+            with memory.batch():
+                memory.add_entry(...)
+                entry['summary'] = ...; memory._save_data()
+        """
+        self._batch_depth += 1
+        if self.store:
+            self.store.begin()
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0 and self._dirty:
+                self.flush()
+            if self.store:
+                self.store.end()
+            if self._batch_depth == 0:
+                self._flush_search()
 
     def add_entry(self, title, summary, url, category):
         """ Lisää uuden uutisen arkistoon """
@@ -227,15 +535,134 @@ class JeevesMemory:
             "timestamp": now.timestamp(),
             "date": now.strftime('%Y-%m-%d')  # Lisätään ISO-päivämäärä rotaatiota varten
         }
+        # Prioriteetti lasketaan kerran tässä; näkymät lukevat sen merkinnästä
+        get_priority_matcher().stamp(entry)
+        self._index_for_search(entry)
+        if self.store:
+            self.store.insert(entry)
+            if self._batch_depth:
+                # Erässä flush_every/flush_interval koskevat myös kantaa
+                self._save_data()
+            return entry
+
         self.data['archive'].append(entry)
+        if self._urls is not None:
+            self._urls.add(url)
         self._save_data()
+        return entry
+
+    def update_entry(self, entry):
+        """Tallentaa yhden (esim. analysoidun) merkinnän muutokset."""
+        self._index_for_search(entry)
+        if self.store:
+            self.store.update(entry)
+            if self._batch_depth:
+                self._save_data()
+        else:
+            self._save_data()
+
+    def update_summary(self, url, summary):
+        """Asettaa URL:n mukaisen merkinnän tiivistelmän. Palauttaa merkinnän tai None."""
+        if self.store:
+            matches = self.store.by_url(url)
+        else:
+            matches = [e for e in self.data['archive'] if e.get('url') == url]
+        if not matches:
+            return None
+        entry = matches[0]
+        entry['summary'] = summary
+        self.update_entry(entry)
+        return entry
+
+    def link_duplicate(self, canonical_url, url, title):
+        """Liittää lähes saman uutisen (jeeves_dedup) aiemman uutisen analyysiin ('related')."""
+        if self.store:
+            matches = self.store.by_url(canonical_url)
+        else:
+            matches = [e for e in self.data['archive'] if e.get('url') == canonical_url]
+        if not matches:
+            return None
+        entry = matches[0]
+        related = entry.setdefault('related', [])
+        if all(r.get('url') != url for r in related):
+            related.append({"url": url, "title": title})
+            self.update_entry(entry)
+        return entry
+
+    def has_url(self, url):
+        """Onko URL jo aktiivisessa muistissa."""
+        if self.store:
+            return self.store.has_url(url)
+        if self._urls is None:
+            self._urls = {e.get('url') for e in self.data['archive']}
+        return url in self._urls
+
+    def remove_entries(self, entries):
+        """Poistaa annetut (memory.data:sta haetut) merkinnät; ylläpitotyökaluille.
+
+        Segmenttimuistissa poisto on hautakivi merkinnän päivän segmentissä.
+        Palauttaa poistettujen määrän.
+        """
+        if self.store:
+            before = len(self.data['archive'])
+            self.store.delete(entries)
+            return before - len(self.data['archive'])
+
+        removed = {id(e) for e in entries}
+        before = len(self.data['archive'])
+        self.data['archive'] = [e for e in self.data['archive'] if id(e) not in removed]
+        self._urls = None
+        self._save_data()
+        return before - len(self.data['archive'])
+
+    def get_pending(self, markers=None, min_length=None, error_terms=()):
+        """Palauttaa analyysiä odottavat merkinnät.
+
+        markers: odotustekstit (oletus: molempien kielten 'pending')
+        min_length: myös tätä lyhyemmät tiivistelmät lasketaan keskeneräisiksi
+        error_terms: tiivistelmät, joissa esiintyy jokin näistä (esim. 'quota')
+        """
+        markers = set(markers) if markers else get_pending_markers()
+        if self.store:
+            return self.store.pending(markers, min_length, error_terms)
+        return [e for e in self.data['archive']
+                if e['summary'] in markers
+                or (min_length and len(e['summary']) < min_length)
+                or any(t in e['summary'].lower() for t in error_terms)]
+
+    def category_counts(self, days=7):
+        """Kategoriakohtaiset määrät raporttiikkunassa."""
+        if self.store:
+            return self.store.category_counts(time.time() - days * 24 * 60 * 60)
+        counts = {}
+        for e in self.get_report(days):
+            cat = e.get('category')
+            counts[cat] = counts.get(cat, 0) + 1
+        return counts
 
     def rotate_archive(self, days_to_keep=14):
-        """Siirtää vanhat uutiset erilliseen arkistotiedostoon."""
+        """Siirtää vanhat uutiset päiväsegmentteihin (archive/retired/).
+
+        Palauttaa (määrä, kansio). Segmenttimuistissa kokonaiset päivät
+        siirretään sellaisenaan: yksi tiedostosiirto päivää kohden.
+        """
         cutoff_date = datetime.now() - timedelta(days=days_to_keep)
         to_keep = []
         to_archive = []
 
+        if self.backend == 'segments':
+            retired = self._retired_store()
+            count = self.store.retire(cutoff_date.timestamp(), retired)
+            self._compact_retired(retired)
+            return (count, RETIRED_DIR) if count else (0, None)
+
+        if self.store:
+            # Kirjoitetaan arkistotiedosto ennen kuin rivit poistetaan kannasta
+            to_archive = self.store.older_than(cutoff_date.timestamp())
+            result = self._write_rotated(to_archive)
+            self.store.delete(to_archive)
+            return result
+
         for entry in self.data['archive']:
             # Ensisijaisesti katsotaan 'timestamp', toissijaisesti 'date'
             try:
@@ -253,26 +680,40 @@ class JeevesMemory:
             except Exception:
                 to_keep.append(entry)
 
+        result = self._write_rotated(to_archive)
         if to_archive:
-            # Luodaan kansio arkistoille jos se puuttuu
-            if not os.path.exists(MEMORY_DIR):
-                os.makedirs(MEMORY_DIR)
-
-            timestamp_str = datetime.now().strftime('%Y%m%d_%H%M%S')
-            archive_filename = os.path.join(MEMORY_DIR, f"jeeves_archive_{timestamp_str}.json")
-
-            with open(archive_filename, 'w', encoding='utf-8') as f:
-                json.dump({'archive': to_archive}, f, ensure_ascii=False, indent=4)
-
             self.data['archive'] = to_keep
+            self._urls = None
             self._save_data()
-            return len(to_archive), archive_filename
+        return result
+
+    def _retired_store(self):
+        from jeeves_segments import SegmentStore, entry_day, record_key
+        from jeeves_storage import entry_timestamp
+        return SegmentStore(RETIRED_DIR, entry_day, entry_timestamp, record_key)
+
+    def _compact_retired(self, retired):
+        """Rotaatiossa poistetut päivät ovat kylmää dataa: ne tiivistetään heti."""
+        from jeeves_segments import get_compaction_settings, cutoff_day
+        settings = get_compaction_settings(self.config)
+        if settings["compress"]:
+            retired.seal(cutoff_day(0), settings["block_records"], settings["level"])
+
+    def _write_rotated(self, to_archive):
+        """Lisää rotaatiossa poistetut merkinnät omien päiviensä segmentteihin."""
+        if to_archive:
+            retired = self._retired_store()
+            retired.append(to_archive)
+            self._compact_retired(retired)
+            return len(to_archive), RETIRED_DIR
 
         return 0, None
 
     def get_report(self, days=7):
         now = time.time()
         cutoff = now - (days * 24 * 60 * 60)
+        if self.store:
+            return self.store.since(cutoff)
         return [e for e in self.data["archive"] if float(e.get("timestamp", 0)) >= cutoff]
 
 
@@ -305,22 +746,21 @@ def get_category_comment(category, lang="fi"):
 
     return comment
 
-if __name__ == "__main__":
-    check_environment()
+def print_report(memory=None, show_full=False, fmt="text", sink=None):
+    """Tulostaa viikkoraportin. memory: jaettu JeevesMemory (esim. JeevesPipeline).
 
-    config = configparser.ConfigParser()
-    config.read(CONFIG_FILE, encoding='utf-8')
+    fmt: text, markdown, html tai json (jeeves_formatter.FORMATS)
+    sink: mikä tahansa write()-olio; oletuksena sys.stdout
+    """
+    if memory is None:
+        memory = JeevesMemory()
+    config = memory.config
+    out = sink or sys.stdout
 
     # 1. Haetaan asetukset
-    current_lang = config['SETTINGS'].get('language', 'fi').lower()
-    show_full = "--full" in sys.argv
+    current_lang = get_language(config)
 
-    # Haetaan prioriteettisanat
-    keywords_str = config['KEYWORDS'].get('priority', '') if 'KEYWORDS' in config else ''
-    keywords = [k.strip().lower() for k in keywords_str.split(',') if k.strip()]
-
-    # 2. Alustetaan muisti
-    memory = JeevesMemory()
+    # 2. Haetaan raportin uutiset
     entries = memory.get_report(days=7)
 
     # --- UUSI MODULAARINEN TULOSTUS ---
@@ -332,24 +772,44 @@ if __name__ == "__main__":
         greeting = get_time_based_greeting(current_lang)
         pending_indicator = get_localized_text("ui.pending", current_lang)
 
-        # Rakennetaan raportti käyttäen uutta luokkaa
-        full_report = formatter.build_report(
+        # Raportti kirjoitetaan virtaan sitä mukaa kuin se valmistuu
+        counts = formatter.render(
             entries=entries,
-            keywords=keywords,
+            matcher=get_priority_matcher(),
             greeting=greeting,
             pending_indicator=pending_indicator,
+            sink=out,
+            fmt=fmt,
             show_full=show_full
         )
 
-        # Tulostetaan koko komeus kerralla
-        print(full_report)
-
     except ImportError:
         print("[!] Jeeves: Muotoilumoduulia (jeeves_formatter.py) ei löytynyt!")
+        return
     # ----------------------------------
 
-    # 3. Loppustatus (montako analysoimatonta)
-    pending_count = sum(1 for e in entries if get_localized_text("ui.pending", current_lang) in e['summary'])
-    if pending_count > 0:
+    # 3. Loppustatus (montako analysoimatonta); ei sotketa JSON/HTML-tulostetta
+    if counts["pending"] > 0 and (fmt == "text" or out is not sys.stdout):
         processing_text = get_localized_text("ui.processing", current_lang)
-        print(f"[*] Status: {pending_count} {processing_text}")
+        print(f"[*] Status: {counts['pending']} {processing_text}")
+
+if __name__ == "__main__":
+    force_utf8_output()
+    check_environment()
+    args = sys.argv[1:]
+    report_format = "text"
+    output_path = None
+    if "--format" in args and args.index("--format") + 1 < len(args):
+        report_format = args[args.index("--format") + 1]
+    if "--output" in args and args.index("--output") + 1 < len(args):
+        output_path = args[args.index("--output") + 1]
+
+    try:
+        if output_path:
+            with open(output_path, "w", encoding="utf-8") as f:
+                print_report(show_full="--full" in args, fmt=report_format, sink=f)
+            print(f"[+] Jeeves: Raportti kirjoitettu: {output_path}")
+        else:
+            print_report(show_full="--full" in args, fmt=report_format)
+    except ValueError as e:
+        print(f"[!] Jeeves: {e} (text, markdown, html, json)")
@@ -13,53 +13,50 @@ Notes:
 - Localization: Finnish (fi) and English (en).
 """
 
-import json
-import os
-import time
-import sys
-import io
-import configparser
-from groq import Groq
-from jeeves_logic import JeevesMemory, CONFIG_FILE, get_localized_text
-
-# Pakotetaan standarditulosteet UTF-8 muotoon
-if sys.stdout.encoding != 'utf-8':
-    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from jeeves_logic import JeevesMemory, CIRCUIT_STATE_FILE, get_localized_text, force_utf8_output
+from jeeves_settings import DEFAULT_GROQ_MODEL, get_language, get_settings
+from jeeves_ratelimit import get_rate_limiter, estimate_tokens
+from jeeves_cache import get_summary_cache
+from flow_resilience import call_with_retry, get_breaker, read_settings
 
 class JeevesMirror:
-    def __init__(self):
-        self.config = configparser.ConfigParser()
-        self.config.read(CONFIG_FILE, encoding='utf-8')
+    def __init__(self, memory=None, config=None):
+        """memory/config: jaetut oliot (esim. JeevesPipeline), muuten luodaan omat."""
+        if config is None:
+            config = get_settings().config
+        self.config = config
 
         # Haetaan kieli
-        self.lang = self.config['SETTINGS'].get('language', 'fi').lower()
+        self.lang = get_language(self.config)
 
         # Haetaan API-avain
         self.api_key = self.config['API_KEYS'].get('groq') if 'API_KEYS' in self.config else None
 
         # Haetaan malli
-        self.model = "llama-3.3-70b-versatile"
-        if 'MODELS' in self.config:
-            self.model = self.config['MODELS'].get('groq', self.model)
+        self.model = self.config.get('MODELS', 'groq', fallback=DEFAULT_GROQ_MODEL)
+
+        self.limiter = get_rate_limiter("groq", self.model, self.config)
+        self.cache = get_summary_cache(self.config)
+        self.breaker = get_breaker(self.limiter.name, CIRCUIT_STATE_FILE, read_settings(self.config))
 
         if not self.api_key:
             print(get_localized_text("error_no_api", self.lang) or "[!] Groq API-key missing.")
             return
 
         try:
+            # Groq-SDK tuodaan vasta, kun peiliä oikeasti tarvitaan
+            from groq import Groq
             self.client = Groq(api_key=self.api_key)
-            self.memory = JeevesMemory()
+            self.memory = memory or JeevesMemory()
         except Exception as e:
             print(f"[!] Alustusvirhe: {e}")
             self.api_key = None
 
     def process_queue(self):
         # Tunnistetaan uutiset molemmilla kielillä (varmistetaan ristiinyhteensopivuus)
-        pending_fi = get_localized_text("pending", "fi")
-        pending_en = get_localized_text("pending", "en")
-
-        pending = [e for e in self.memory.data['archive']
-                  if e['summary'] in [pending_fi, pending_en]]
+        pending = self.memory.get_pending()
 
         if not pending:
             msg = get_localized_text("no_pending_work", self.lang) or "No news to analyze."
@@ -72,21 +69,39 @@ class JeevesMirror:
         # Haetaan dynaaminen kuittaus (esim. "Analyysi valmis." tai "Analysis complete.")
         done_txt = get_localized_text("analysis_done", self.lang) or "Done."
 
-        for entry in pending:
-            print(f"[*] {analyzing_txt}: {entry['title']}...")
-            summary = self.ask_groq(entry['title'], entry['url'])
+        # Kiintiön mukaan tahditetut rinnakkaiset kutsut, tulokset järjestyksessä
+        pool = ThreadPoolExecutor(max_workers=self.limiter.workers)
+        futures = [pool.submit(self.ask_groq, e['title'], e['url']) for e in pending]
 
-            if summary:
-                entry['summary'] = summary
-                self.memory._save_data()
-                # Tulostetaan lokalisoitu kuittaus
-                print(f"[+] {done_txt}")
-                time.sleep(1)
-            else:
-                # Jos ask_groq palauttaa None (virhe), keskeytetään
-                break
+        try:
+            with self.memory.batch():
+                for entry, future in zip(pending, futures):
+                    print(f"[*] {analyzing_txt}: {entry['title']}...")
+                    summary = future.result()
+
+                    if summary:
+                        entry['summary'] = summary
+                        self.memory.update_entry(entry)
+                        # Tulostetaan lokalisoitu kuittaus
+                        print(f"[+] {done_txt}")
+                    else:
+                        # Jos ask_groq palauttaa None (virhe), keskeytetään
+                        break
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        print(f"[*] Jeeves Mirror: {self.cache.stats_line()}")
 
     def ask_groq(self, title, url):
+        """Palauttaa tiivistelmän tai None (virhe tulostetaan)."""
+        try:
+            return self.complete(title, url)
+        except Exception as e:
+            print(f"[!] Groq-Error: {e}")
+            return None
+
+    def _build_request(self, title, url):
+        """Palauttaa (system_role, prompt, välimuistin ohjeavain)."""
         # Haetaan AI-ohjeistus ja otsikot metadatasta
         base_instruction = get_localized_text("ai_instruction", self.lang)
         p_title = get_localized_text("prompt_title", self.lang) or "Uutinen"
@@ -105,22 +120,76 @@ class JeevesMirror:
             f"{p_source}: {url}"
         )
 
-        try:
-            chat_completion = self.client.chat.completions.create(
+        return system_role, prompt, f"{system_role}\n{base_instruction}"
+
+    def _messages(self, system_role, prompt):
+        return [
+            {"role": "system", "content": system_role}, # Käytetään dynaamista roolia
+            {"role": "user", "content": prompt}
+        ]
+
+    def complete(self, title, url, call=None):
+        """Groq-kutsu; nostaa poikkeuksen virheestä. call: ProviderCall (peruutus ja ajoitus)."""
+        system_role, prompt, instruction = self._build_request(title, url)
+
+        # Sama uutinen samoilla ohjeilla ja mallilla on jo analysoitu: ei API-kutsua
+        cached = self.cache.get(url, title, self.model, instruction, self.lang)
+        if cached:
+            return cached
+
+        def request():
+            self.limiter.acquire(estimate_tokens(system_role + prompt, max_output=500))
+            if call is not None and not call.send():
+                return None
+            return self.client.chat.completions.create(
                 model=self.model,
-                messages=[
-                    {"role": "system", "content": system_role}, # Käytetään dynaamista roolia
-                    {"role": "user", "content": prompt}
-                ],
+                messages=self._messages(system_role, prompt),
                 temperature=0.3, # Laskettu hieman tarkkuuden vuoksi
                 max_tokens=500
             )
-            return chat_completion.choices[0].message.content.strip()
-        except Exception as e:
-            print(f"[!] Groq-Error: {e}")
+
+        chat_completion = call_with_retry(request, self.breaker)
+        if chat_completion is None:
             return None
+        summary = chat_completion.choices[0].message.content.strip()
+        self.cache.put(url, title, self.model, instruction, self.lang, summary)
+        return summary
+
+    def stream_summary(self, title, url, on_chunk):
+        """Striimaa tiivistelmän (stream=True): on_chunk(teksti) jokaiselle palaselle. Palauttaa koko tekstin."""
+        system_role, prompt, instruction = self._build_request(title, url)
+        cached = self.cache.get(url, title, self.model, instruction, self.lang)
+        if cached:
+            on_chunk(cached)
+            return cached
+
+        def request():
+            self.limiter.acquire(estimate_tokens(system_role + prompt, max_output=500))
+            stream = iter(self.client.chat.completions.create(
+                model=self.model,
+                messages=self._messages(system_role, prompt),
+                temperature=0.3,
+                max_tokens=500,
+                stream=True
+            ))
+            # Ensimmäinen palanen luetaan tässä, jotta yhteysvirheet kulkevat katkaisimen kautta
+            return next(stream, None), stream
+
+        first, stream = call_with_retry(request, self.breaker)
+        parts = []
+        for chunk in itertools.chain([first] if first is not None else [], stream):
+            text = chunk.choices[0].delta.content if chunk.choices else None
+            if text:
+                parts.append(text)
+                on_chunk(text)
+
+        summary = "".join(parts).strip()
+        if summary:
+            self.cache.put(url, title, self.model, instruction, self.lang, summary)
+        return summary
 
 if __name__ == "__main__":
+    force_utf8_output()
     mirror = JeevesMirror()
     if hasattr(mirror, 'api_key') and mirror.api_key:
         mirror.process_queue()
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+"""
+Jeeves - Personal News Butler
+File: jeeves_newslist.py
+Author: Tuomas Lähteenmäki
+Version: 3.1.0
+Licence: GNU GPLv3
+Source: https://github.com/lahtis/Flow/tree/main/Ask%20Jeeves
+
+Description:
+    State of the virtualized news list in jeeves_gui.py (VirtualNewsList).
+    Only the rows that fit in the viewport exist as widgets; scrolling
+    rebinds the same buttons to other entries. set_rows() diffs the new
+    rows against the old ones by entry id, so a refresh only reconfigures
+    the buttons whose text or colour actually changed.
+
+    The model has no Tk dependency, so test/bench_newslist.py can run it
+    without a display.
+"""
+
+from collections import namedtuple
+
+ROW_HEIGHT = 34
+WHEEL_ROWS = 3  # hiiren rulla vierittää näin monta riviä
+
+# key: uutisen tunniste (URL), text/color: näkyvä sisältö, payload: merkintä (dict)
+NewsRow = namedtuple("NewsRow", "key text color payload")
+
+class NewsListModel:
+    """Listan rivit ja näkyvä ikkuna; ei riipu Tk:sta."""
+
+    def __init__(self):
+        self.rows = []
+        self.index = {}
+        self.top = 0
+        self.visible = 0
+
+    def set_rows(self, rows):
+        """Korvaa rivit. Palauttaa muuttuneiden, lisättyjen ja poistettujen avainten joukon."""
+        old = {row.key: (row.text, row.color) for row in self.rows}
+        self.rows = list(rows)
+        self.index = {row.key: i for i, row in enumerate(self.rows)}
+        changed = {row.key for row in self.rows if old.get(row.key) != (row.text, row.color)}
+        changed.update(old.keys() - self.index.keys())
+        self.clamp()
+        return changed
+
+    def clamp(self):
+        self.top = max(0, min(self.top, len(self.rows) - self.visible))
+
+    def scroll_to(self, top):
+        previous = self.top
+        self.top = top
+        self.clamp()
+        return self.top != previous
+
+    def window(self):
+        """Näkyvät rivit (enintään visible kappaletta) alkaen top-rivistä."""
+        return self.rows[self.top:self.top + self.visible]
+
+    def fractions(self):
+        """Vierityspalkin (alku, loppu) osuudet."""
+        if not self.rows:
+            return 0.0, 1.0
+        total = len(self.rows)
+        return self.top / total, min(1.0, (self.top + self.visible) / total)
+
+    def render_plan(self, bound):
+        """Vertaa painikkeiden nykyistä sisältöä näkyvään ikkunaan.
+
+        bound: (key, text, color) tai None jokaiselle painikkeelle; päivitetään paikallaan.
+        Palauttaa [(paikka, rivi tai None)] vain niille painikkeille, jotka pitää muuttaa.
+        """
+        window = self.window()
+        updates = []
+        for slot in range(len(bound)):
+            row = window[slot] if slot < len(window) else None
+            shown = (row.key, row.text, row.color) if row else None
+            if bound[slot] != shown:
+                bound[slot] = shown
+                updates.append((slot, row))
+        return updates
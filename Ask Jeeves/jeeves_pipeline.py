@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+"""
+Jeeves - Personal News Butler
+File: jeeves_pipeline.py
+Author: Tuomas Lähteenmäki
+Version: 3.1.0
+Licence: GNU GPLv3
+Source: https://github.com/lahtis/Flow/tree/main/Ask%20Jeeves
+
+Description:
+    In-process pipeline: fetch -> analyze -> sync -> failover -> report.
+    All stages share one JeevesMemory and one configuration object, so
+    the SDKs are imported and the JSON files read only once per run.
+    Used by jeeves.py (CLI) and jeeves_gui.py (refresh button).
+
+    Stage hooks:
+        pipeline = JeevesPipeline()
+        pipeline.add_hook("analyze", lambda stage, phase, pipe: print(stage, phase))
+        pipeline.run()
+"""
+
+import os
+import time
+from jeeves_logic import check_environment, JeevesMemory, get_localized_text, print_report
+from jeeves_settings import get_language
+
+STAGES = ("fetch", "analyze", "sync", "failover", "report")
+
+class JeevesPipeline:
+    def __init__(self, memory=None, show_full=False):
+        check_environment()
+        self.memory = memory or JeevesMemory()
+        self.config = self.memory.config
+        self.lang = get_language(self.config)
+        self.show_full = show_full
+        self.hooks = {stage: [] for stage in STAGES}
+        self.timings = {}
+        self._fetcher = None
+
+    def add_hook(self, stage, callback):
+        """Rekisteröi kutsun callback(stage, phase, pipeline); phase on 'start' tai 'end'."""
+        if stage not in self.hooks:
+            raise ValueError(f"Unknown pipeline stage: {stage}")
+        self.hooks[stage].append(callback)
+
+    def _emit(self, stage, phase):
+        for callback in self.hooks[stage]:
+            try:
+                callback(stage, phase, self)
+            except Exception as e:
+                print(f"[!] Jeeves: Pipeline hook failed ({stage}/{phase}): {e}")
+
+    @property
+    def fetcher(self):
+        """JeevesFetcher luodaan vasta tarvittaessa (tuo Gemini-SDK:n)."""
+        if self._fetcher is None:
+            from ask_jeeves import JeevesFetcher
+            self._fetcher = JeevesFetcher(memory=self.memory, config=self.config)
+        return self._fetcher
+
+    # --- VAIHEET ---
+
+    def stage_fetch(self):
+        if 'FEEDS' not in self.config:
+            return
+        print(get_localized_text("fetching_news_gemini", self.lang) or "[*] Fetching news...")
+        self.fetcher.fetch_all_feeds()
+
+    def stage_analyze(self):
+        # Ei avoimia töitä: Gemini-asiakasta ei tarvitse edes luoda
+        if not self.memory.get_pending():
+            no_work = get_localized_text("ui.no_pending_work", self.lang)
+            print(f"[*] Jeeves: {no_work.replace('[*] Jeeves: ', '').strip()}")
+            count, arch_path = self.memory.rotate_archive(days_to_keep=14)
+            if count > 0:
+                rot_msg = get_localized_text("ui.archive_rotation", self.lang) or "Moved {} items to archive: {}"
+                print(f"[*] Jeeves: {rot_msg.format(count, os.path.basename(arch_path))}")
+            return
+        start_msg = get_localized_text("analysis_start", self.lang) or "Starting analysis..."
+        print(f"\n[*] Jeeves: {start_msg.replace('[*] Jeeves: ', '').strip()}")
+        self.fetcher.process_pending_summaries()
+
+    def stage_sync(self):
+        # Tämä varmistaa, että myös aiemmin muistiin jääneet uutiset menevät arkistoon
+        from jeeves_archive import JeevesArchive
+        metadata_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resources", "jeeves_metadata.json")
+        archive = JeevesArchive()
+        synced_count = archive.sync_from_metadata(metadata_path)
+        if synced_count > 0:
+            print(f"[*] Jeeves: Herra, synkronoitu {synced_count} uutta uutista arkistoon.")
+
+        # Vanhat päivät tiivistetään gzip-lohkoiksi ([ARCHIVE] jeeves.conf-tiedostossa)
+        sealed = archive.compact()
+        if sealed:
+            print(f"[*] Jeeves: Tiivistetty {len(sealed)} arkistopäivää ({sealed[0]} ... {sealed[-1]}).")
+
+    def stage_failover(self):
+        # Odottavat, liian lyhyet (alle 100 merkkiä) ja kiintiövirheen sisältävät tiivistelmät
+        pending = self.memory.get_pending(min_length=100, error_terms=("quota",))
+        if not pending:
+            return
+
+        p_msg = get_localized_text("pending_count_msg", self.lang) or "summaries are still pending."
+        m_msg = get_localized_text("activating_mirror", self.lang) or "[*] Activating Groq Mirror, sir..."
+        print(f"[*] Jeeves: {len(pending)} {p_msg}")
+        print(m_msg)
+
+        from jeeves_mirror import JeevesMirror
+        mirror = JeevesMirror(memory=self.memory, config=self.config)
+        if mirror.api_key:
+            mirror.process_queue()
+
+    def stage_report(self):
+        report_ready_txt = get_localized_text('report_ready', self.lang) or "Report ready:"
+        print(f"\n{report_ready_txt}")
+        print_report(self.memory, show_full=self.show_full)
+
+    def run(self, stages=STAGES):
+        """Ajaa valitut vaiheet järjestyksessä samassa prosessissa."""
+        print(get_localized_text("starting_routines", self.lang) or "[*] Starting routines...")
+        for stage in stages:
+            self._emit(stage, "start")
+            started = time.perf_counter()
+            try:
+                getattr(self, f"stage_{stage}")()
+            except Exception as e:
+                print(f"[!] Jeeves: Stage '{stage}' failed: {e}")
+            self.timings[stage] = time.perf_counter() - started
+            self._emit(stage, "end")
+        return self.timings
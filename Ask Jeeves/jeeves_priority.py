@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+"""
+Jeeves - Personal News Butler
+File: jeeves_priority.py
+Author: Tuomas Lähteenmäki
+Version: 3.1.0
+Licence: GNU GPLv3
+Source: https://github.com/lahtis/Flow/tree/main/Ask%20Jeeves
+
+Description:
+    Shared priority-keyword matcher for the report, the GUI and ingestion.
+    The keywords from [KEYWORDS] in jeeves.conf are compiled once into a
+    single case-folded pattern; match() returns the priority level and the
+    matched terms in one pass:
+
+        [KEYWORDS]
+        priority = CVE, Kernel, Security, Critical, CachyOS
+        critical = CVE, Critical, Security, Vulnerability
+
+    A keyword that contains a critical term makes the title critical.
+    JeevesMemory.add_entry stores the level as "priority_score" (with the
+    keyword set's "priority_version"), so views read it from the entry and
+    only rescan entries scored under older keywords.
+"""
+
+import re
+import zlib
+from collections import namedtuple
+
+NONE, PRIORITY, CRITICAL = 0, 1, 2
+DEFAULT_CRITICAL = ("CVE", "Critical", "Security", "Vulnerability")
+
+# Raportin ja GUI:n etuliitteet tasoittain
+PREFIXES = {NONE: "", PRIORITY: "[⭐]", CRITICAL: "[!!!]"}
+
+PriorityMatch = namedtuple("PriorityMatch", "level terms")
+
+class PriorityMatcher:
+    def __init__(self, keywords, critical_terms=DEFAULT_CRITICAL):
+        # casefold() eikä lower(): esim. saksan ß ja kreikan sigma vertautuvat oikein
+        self.keywords = [k.strip() for k in keywords if k.strip()]
+        folded = {k.casefold(): k for k in self.keywords}
+        critical = [c.casefold() for c in critical_terms]
+        self.critical = {f for f in folded if any(c in f for c in critical)}
+        # Pisimmät ensin, jotta "kernel panic" voittaa pelkän "kernel"-osuman
+        ordered = sorted(folded, key=len, reverse=True)
+        self.pattern = re.compile("|".join(map(re.escape, ordered))) if ordered else None
+        self.version = zlib.crc32("\n".join(sorted(folded) + ["|"] + sorted(self.critical)).encode("utf-8"))
+
+    def match(self, title):
+        """Palauttaa PriorityMatch(taso, [osuneet termit]) yhdellä läpikäynnillä."""
+        if self.pattern is None or not title:
+            return PriorityMatch(NONE, [])
+        terms = []
+        for found in self.pattern.findall(title.casefold()):
+            if found not in terms:
+                terms.append(found)
+        if not terms:
+            return PriorityMatch(NONE, [])
+        level = CRITICAL if any(t in self.critical for t in terms) else PRIORITY
+        return PriorityMatch(level, terms)
+
+    def level(self, title):
+        return self.match(title).level
+
+    def score_entry(self, entry):
+        """Merkinnän taso: tallennettu priority_score, jos se on laskettu näillä avainsanoilla."""
+        if entry.get("priority_version") == self.version and "priority_score" in entry:
+            return entry["priority_score"]
+        return self.level(entry.get("title", ""))
+
+    def stamp(self, entry):
+        """Tallentaa tason merkintään (uutisen lisäyksen yhteydessä)."""
+        entry["priority_score"] = self.level(entry.get("title", ""))
+        entry["priority_version"] = self.version
+        return entry
@@ -0,0 +1,251 @@
+# -*- coding: utf-8 -*-
+
+"""
+Jeeves - Personal News Butler
+File: jeeves_providers.py
+Author: Tuomas Lähteenmäki
+Version: 3.1.0
+Licence: GNU GPLv3
+Source: https://github.com/lahtis/Flow/tree/main/Ask%20Jeeves
+
+Description:
+    Hedged requests over two AI providers (Gemini primary, Groq secondary).
+    If the primary has not answered within its p95 latency, the same news
+    item is also sent to the secondary. The first valid answer wins and
+    the other request is cancelled. Latency histograms are kept per
+    provider/model in archive/provider_latency.json and set the hedge delay:
+
+        [HEDGING]
+        enabled = yes
+        percentile = 95
+        min_samples = 20      ; below this the default delay is used
+        default_delay = 10
+        min_delay = 2
+        max_delay = 30
+"""
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# Lokerot 0,05 s ... ~300 s, jokainen 25 % edellistä leveämpi
+BUCKET_EDGES = [round(0.05 * 1.25 ** i, 3) for i in range(40)]
+MAX_SAMPLES = 1000
+
+DEFAULT_HEDGING = {
+    "enabled": True,
+    "percentile": 95.0,
+    "min_samples": 20,
+    "default_delay": 10.0,
+    "min_delay": 2.0,
+    "max_delay": 30.0,
+}
+
+# Kuinka usein odottaja tarkistaa, onko ensisijainen pyyntö jo lähtenyt jonosta
+SEND_POLL_INTERVAL = 0.1
+
+class LatencyHistogram:
+    """Vastausaikojen histogrammi; vanhat havainnot puoliintuvat MAX_SAMPLES:n jälkeen."""
+
+    def __init__(self, counts=None):
+        if counts and len(counts) == len(BUCKET_EDGES):
+            self.counts = [int(c) for c in counts]
+        else:
+            self.counts = [0] * len(BUCKET_EDGES)
+        self.lock = threading.Lock()
+
+    @property
+    def total(self):
+        return sum(self.counts)
+
+    def record(self, seconds):
+        index = min(bisect_left(BUCKET_EDGES, seconds), len(BUCKET_EDGES) - 1)
+        with self.lock:
+            self.counts[index] += 1
+            if sum(self.counts) > MAX_SAMPLES:
+                self.counts = [c // 2 for c in self.counts]
+
+    def percentile(self, p):
+        """Palauttaa lokeron ylärajan, jonka alle p % havainnoista jää (tai None)."""
+        with self.lock:
+            total = sum(self.counts)
+            if not total:
+                return None
+            target = total * p / 100.0
+            running = 0
+            for edge, count in zip(BUCKET_EDGES, self.counts):
+                running += count
+                if running >= target:
+                    return edge
+        return BUCKET_EDGES[-1]
+
+class ProviderCall:
+    """Yhden pyynnön tila: lähetyshetki ja peruutuslippu."""
+
+    def __init__(self):
+        self.cancelled = threading.Event()
+        self.sent_at = None
+
+    def send(self):
+        """Kutsutaan juuri ennen API-pyyntöä. False = pyyntö on jo peruttu."""
+        if self.cancelled.is_set():
+            return False
+        self.sent_at = time.monotonic()
+        return True
+
+class Provider:
+    """call(title, url, provider_call) palauttaa tiivistelmän tai nostaa poikkeuksen."""
+
+    def __init__(self, name, call, workers=1):
+        self.name = name
+        self.call = call
+        self.workers = workers
+
+def get_hedging_settings(config=None):
+    settings = dict(DEFAULT_HEDGING)
+    if config is None or 'HEDGING' not in config:
+        return settings
+    section = config['HEDGING']
+    for key, default in DEFAULT_HEDGING.items():
+        if key not in section:
+            continue
+        try:
+            if isinstance(default, bool):
+                settings[key] = section.getboolean(key)
+            else:
+                settings[key] = type(default)(float(section[key]))
+        except ValueError:
+            print(f"[!] Jeeves: Invalid [HEDGING] {key} = {section[key]}")
+    return settings
+
+class HedgedProviders:
+    def __init__(self, primary, secondary=None, config=None, filename="provider_latency.json"):
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+        self.path = os.path.join(base_dir, "archive", filename)
+        self.primary = primary
+        self.secondary = secondary
+        self.settings = get_hedging_settings(config)
+        if not self.settings["enabled"]:
+            self.secondary = None
+
+        self.histograms = self._load()
+        for provider in (primary, secondary):
+            if provider is not None:
+                self.histograms.setdefault(provider.name, LatencyHistogram())
+
+        # Jokainen uutinen voi varata kaksi säiettä (ensisijainen + varmistus)
+        workers = primary.workers + (secondary.workers if secondary else 0)
+        self.pool = ThreadPoolExecutor(max_workers=max(2, workers * 2))
+        self.hedged = 0
+        self.wins = {}
+
+    # --- HISTOGRAMMIT ---
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return {name: LatencyHistogram(counts) for name, counts in data.items()}
+        except (OSError, ValueError, AttributeError) as e:
+            print(f"[!] Jeeves: Latency statistics unreadable, starting over: {e}")
+            return {}
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({name: h.counts for name, h in self.histograms.items()}, f)
+        os.replace(tmp_path, self.path)
+
+    def hedge_delay(self):
+        """Ensisijaisen tarjoajan p95-vasteaika rajattuna [min_delay, max_delay] väliin."""
+        s = self.settings
+        histogram = self.histograms[self.primary.name]
+        if histogram.total < s["min_samples"]:
+            return s["default_delay"]
+        return min(s["max_delay"], max(s["min_delay"], histogram.percentile(s["percentile"])))
+
+    # --- PYYNNÖT ---
+
+    def _run(self, provider, call, title, url):
+        summary = provider.call(title, url, call)
+        # Välimuistiosumat (ei lähetetty) eivät kuulu vasteaikoihin
+        if summary and call.sent_at is not None:
+            self.histograms[provider.name].record(time.monotonic() - call.sent_at)
+        return summary
+
+    def _submit(self, futures, provider, title, url):
+        call = ProviderCall()
+        futures[self.pool.submit(self._run, provider, call, title, url)] = (provider, call)
+        return call
+
+    def ask(self, title, url):
+        """Palauttaa (tiivistelmä, tarjoajan nimi, [(tarjoaja, poikkeus), ...]).
+
+        Tiivistelmä on None, jos kaikki tarjoajat epäonnistuivat.
+        """
+        futures = {}
+        primary_call = self._submit(futures, self.primary, title, url)
+        errors = []
+        hedged = self.secondary is None
+
+        while futures:
+            timeout = None
+            if not hedged:
+                if primary_call.sent_at is None:
+                    # Pyyntö odottaa vielä kiintiötä: ajastin alkaa vasta lähetyksestä
+                    timeout = SEND_POLL_INTERVAL
+                else:
+                    timeout = max(0.0, primary_call.sent_at + self.hedge_delay() - time.monotonic())
+
+            done, _ = wait(futures, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                provider, call = futures.pop(future)
+                try:
+                    summary = future.result()
+                except Exception as e:
+                    errors.append((provider.name, e))
+                    continue
+                if summary:
+                    self._cancel(futures)
+                    self.wins[provider.name] = self.wins.get(provider.name, 0) + 1
+                    return summary, provider.name, errors
+                errors.append((provider.name, RuntimeError("empty response")))
+
+            if not hedged:
+                overdue = primary_call.sent_at is not None and \
+                    time.monotonic() >= primary_call.sent_at + self.hedge_delay()
+                # Varmistuspyyntö: ensisijainen on hidas tai jo epäonnistunut
+                if overdue or not futures:
+                    hedged = True
+                    if overdue:
+                        self.hedged += 1
+                    self._submit(futures, self.secondary, title, url)
+
+        return None, None, errors
+
+    def _cancel(self, futures):
+        """Hävinnyt pyyntö perutaan: jonossa oleva ei lähde, käynnissä olevan tulos hylätään."""
+        for future, (provider, call) in futures.items():
+            call.cancelled.set()
+            future.cancel()
+
+    def stats_line(self):
+        parts = []
+        for name, histogram in self.histograms.items():
+            p95 = histogram.percentile(self.settings["percentile"])
+            p95_txt = f"{p95:.1f}s" if p95 is not None else "-"
+            parts.append(f"{name} p{self.settings['percentile']:.0f}={p95_txt} wins={self.wins.get(name, 0)}")
+        return f"Providers: {', '.join(parts)}; hedged {self.hedged}x"
+
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+        try:
+            self.save()
+        except OSError as e:
+            print(f"[!] Jeeves: Could not save latency statistics: {e}")
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+"""
+Jeeves - Personal News Butler
+File: jeeves_ratelimit.py
+Author: Tuomas Lähteenmäki
+Version: 3.1.0
+Licence: GNU GPLv3
+Source: https://github.com/lahtis/Flow/tree/main/Ask%20Jeeves
+
+Description:
+    Token-bucket rate limiting for AI providers. Each provider/model pair
+    gets a requests-per-minute and a tokens-per-minute bucket, configured
+    in the [RATE_LIMITS] section of jeeves.conf:
+
+        [RATE_LIMITS]
+        gemini.rpm = 10
+        gemini.tpm = 250000
+        gemini.workers = 4
+        groq.llama-3.3-70b-versatile.rpm = 30
+
+    Model-specific keys override provider-wide keys.
+"""
+
+import threading
+import time
+
+# Oletusrajat, jos jeeves.conf ei kerro muuta (ilmaisen tason varovaiset arvot)
+DEFAULT_LIMITS = {
+    "gemini": {"rpm": 10, "tpm": 250000, "workers": 4},
+    "groq": {"rpm": 30, "tpm": 6000, "workers": 2},
+}
+FALLBACK_LIMITS = {"rpm": 10, "tpm": 100000, "workers": 2}
+
+class TokenBucket:
+    """Klassinen token bucket: täyttyy tasaisesti per_minute / 60 nopeudella."""
+
+    def __init__(self, per_minute):
+        self.capacity = float(max(1, per_minute))
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, amount=1):
+        """Odottaa, kunnes amount tokenia on saatavilla. Palauttaa odotusajan sekunteina."""
+        amount = min(float(amount), self.capacity)
+        waited = 0.0
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return waited
+                delay = (amount - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+class RateLimiter:
+    """Pyyntö- ja token-kiintiö yhdelle provider/malli-parille."""
+
+    def __init__(self, name, rpm, tpm, workers):
+        self.name = name
+        self.rpm = rpm
+        self.tpm = tpm
+        self.workers = max(1, workers)
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+
+    def acquire(self, estimated_tokens):
+        """Varaa yhden pyynnön ja arvioidun määrän tokeneita."""
+        waited = self.requests.acquire(1)
+        waited += self.tokens.acquire(estimated_tokens)
+        return waited
+
+def estimate_tokens(prompt, max_output=500):
+    """Karkea arvio: ~4 merkkiä per token + vastauksen enimmäispituus."""
+    return len(prompt) // 4 + max_output
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+def _limit_value(config, provider, model, key):
+    default = DEFAULT_LIMITS.get(provider, FALLBACK_LIMITS)[key]
+    if config is None or 'RATE_LIMITS' not in config:
+        return default
+    section = config['RATE_LIMITS']
+    for option in (f"{provider}.{model}.{key}", f"{provider}.{key}"):
+        if option in section:
+            try:
+                return int(float(section[option]))
+            except ValueError:
+                print(f"[!] Jeeves: Invalid [RATE_LIMITS] {option} = {section[option]}")
+    return default
+
+def get_rate_limiter(provider, model, config=None):
+    """Palauttaa prosessinlaajuisen rajoittimen provider/malli-parille."""
+    key = (provider, model)
+    with _limiters_lock:
+        if key not in _limiters:
+            _limiters[key] = RateLimiter(
+                f"{provider}/{model}",
+                _limit_value(config, provider, model, "rpm"),
+                _limit_value(config, provider, model, "tpm"),
+                _limit_value(config, provider, model, "workers"))
+        return _limiters[key]
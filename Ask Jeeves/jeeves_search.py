@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+
+"""
+Jeeves - Personal News Butler
+File: jeeves_search.py
+Author: Tuomas Lähteenmäki
+Version: 3.1.0
+Licence: GNU GPLv3
+Source: https://github.com/lahtis/Flow/tree/main/Ask%20Jeeves
+
+Description:
+    Full-text search over everything Jeeves has stored: the active memory,
+    the news archive, retired days and old jeeves_archive_*.json files.
+    One SQLite FTS5 table (archive/search_index.db) holds title, summary,
+    category and url, one row per URL (rowid = 64-bit URL hash, so a
+    later version of the same item replaces the earlier one). Results are
+    ranked with BM25, title and category weighted above the summary.
+
+    JeevesMemory.add_entry/update_entry and JeevesArchive.save_to_archive
+    keep the index up to date; jeeves_logic.get_search_index(build=True)
+    fills it once from the existing data.
+
+        python jeeves.py search kernel rust
+        python jeeves.py search category:security cve --limit 10
+        python jeeves.py search --reindex
+"""
+
+import re
+import sqlite3
+import threading
+from collections import namedtuple
+from jeeves_segments import url_key
+
+FIELDS = ("title", "summary", "category", "url")
+# bm25()-painot sarakkeille samassa järjestyksessä kuin FIELDS
+WEIGHTS = (10.0, 1.0, 4.0, 0.5)
+
+SearchHit = namedtuple("SearchHit", "url title summary category timestamp snippet score")
+
+SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS docs USING fts5(
+    title, summary, category, url, timestamp UNINDEXED,
+    tokenize = "unicode61 remove_diacritics 2"
+);
+CREATE TABLE IF NOT EXISTS meta (k TEXT PRIMARY KEY, v);
+"""
+
+TOKEN_RE = re.compile(r'(?:(title|summary|category|url):)?("[^"]*"|[\w*]+)', re.UNICODE)
+
+def build_query(text):
+    """Muuntaa käyttäjän hakusanat FTS5-kyselyksi.
+
+    Jokainen sana on etuliitehaku ("kern" löytää "kernel"), lainausmerkeissä
+    oleva fraasi haetaan sellaisenaan ja "sarake:sana" rajaa sarakkeeseen.
+    Sanat yhdistetään AND-ehdolla. Palauttaa None, jos haettavaa ei ole.
+    """
+    terms = []
+    for column, token in TOKEN_RE.findall(text or ""):
+        if token.startswith('"'):
+            words = token.strip('"').split()
+            term = '"' + " ".join(w.replace('"', "") for w in words) + '"' if words else None
+        else:
+            word = token.replace("*", "")
+            term = f'"{word}"*' if word else None
+        if term:
+            terms.append(f"{column}:{term}" if column else term)
+    return " AND ".join(terms) or None
+
+class SearchIndex:
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+        self._in_batch = 0
+
+    # --- KIRJOITUS ---
+
+    def upsert(self, entries):
+        """Lisää tai korvaa merkinnät (avain: URL). Palauttaa indeksoitujen määrän."""
+        rows = []
+        for entry in entries:
+            url = entry.get("url")
+            if not url:
+                continue
+            rows.append((url_key(url), entry.get("title") or "", entry.get("summary") or "",
+                         entry.get("category") or "", url, entry.get("timestamp")))
+        if not rows:
+            return 0
+        with self.lock:
+            self.conn.executemany("DELETE FROM docs WHERE rowid = ?", [(row[0],) for row in rows])
+            self.conn.executemany(
+                "INSERT INTO docs (rowid, title, summary, category, url, timestamp) VALUES (?, ?, ?, ?, ?, ?)", rows)
+            if not self._in_batch:
+                self.conn.commit()
+        return len(rows)
+
+    def begin(self):
+        with self.lock:
+            self._in_batch += 1
+
+    def end(self):
+        with self.lock:
+            self._in_batch -= 1
+            if self._in_batch == 0:
+                self.conn.commit()
+
+    def clear(self):
+        with self.lock:
+            self.conn.execute("DELETE FROM docs")
+            self.conn.execute("DELETE FROM meta")
+            self.conn.commit()
+
+    def optimize(self):
+        """Yhdistää FTS5:n b-puusegmentit (täyden rakennuksen jälkeen)."""
+        with self.lock:
+            self.conn.execute("INSERT INTO docs (docs) VALUES ('optimize')")
+            self.conn.commit()
+
+    def get_meta(self, key, default=None):
+        row = self.conn.execute("SELECT v FROM meta WHERE k = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO meta (k, v) VALUES (?, ?)", (key, value))
+            if not self._in_batch:
+                self.conn.commit()
+
+    # --- HAKU ---
+
+    def search(self, text, limit=50, category=None):
+        """Palauttaa [SearchHit] parhaasta alkaen (score: pienempi = parempi)."""
+        query = build_query(text)
+        if query is None:
+            return []
+        sql = ("SELECT url, title, summary, category, timestamp, "
+               "snippet(docs, 1, '[', ']', '…', 16), "
+               f"bm25(docs, {', '.join(str(w) for w in WEIGHTS)}) AS score "
+               "FROM docs WHERE docs MATCH ?")
+        params = [query]
+        if category:
+            sql += " AND category = ?"
+            params.append(category)
+        sql += " ORDER BY score, timestamp DESC LIMIT ?"
+        params.append(limit)
+        try:
+            with self.lock:
+                rows = self.conn.execute(sql, params).fetchall()
+        except sqlite3.OperationalError as e:
+            print(f"[!] Jeeves: Invalid search '{text}': {e}")
+            return []
+        return [SearchHit(*row) for row in rows]
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.conn.commit()
+            self.conn.close()
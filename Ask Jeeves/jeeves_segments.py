@@ -0,0 +1,645 @@
+# -*- coding: utf-8 -*-
+
+"""
+Jeeves - Personal News Butler
+File: jeeves_segments.py
+Author: Tuomas Lähteenmäki
+Version: 3.1.0
+Licence: GNU GPLv3
+Source: https://github.com/lahtis/Flow/tree/main/Ask%20Jeeves
+
+Description:
+    Day-partitioned, append-only JSONL segments. A store is one folder:
+
+        archive/news_archive/
+            manifest.json       {"version": 1, "segments": {"2026-10-18": {...}}}
+            2026-10-17.jsonl
+            2026-10-18.jsonl
+
+    Records are only ever appended to the segment of their day. Reads for a
+    time window open only the segments whose day falls inside it, and
+    retention retires whole segments (one rename each) instead of
+    rewriting a file. Used by jeeves_archive.py (news_archive) and by
+    JeevesMemory ([MEMORY] backend = segments, and retired entries).
+
+    SegmentMemoryStore is the JeevesMemory backend on top of a store: a
+    changed entry is appended again to the segment of its own day and the
+    last line per URL wins when the segments are replayed. A removed entry
+    gets a tombstone ({"url": ..., "deleted": true}) in the same day's
+    segment, and replay drops it.
+
+    Compaction seals old segments into gzip blocks (YYYY-MM-DD.jsonl.gz,
+    one gzip member per block). A sidecar YYYY-MM-DD.blocks.json lists
+    each block's byte range, first/last timestamp and a bloom filter of
+    the record keys, so readers decompress only the blocks they need:
+
+        [ARCHIVE]
+        compress = yes
+        seal_after_days = 1   ; today's segment stays plain for appends
+        block_records = 1000
+        level = 6
+"""
+
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from datetime import datetime, timedelta
+from jeeves_storage import entry_timestamp
+
+MANIFEST = "manifest.json"
+MANIFEST_VERSION = 1
+SEGMENT_SUFFIX = ".jsonl"
+SEALED_SUFFIX = ".jsonl.gz"
+BLOCKS_SUFFIX = ".blocks.json"
+DAY_FORMAT = "%Y-%m-%d"
+
+DEFAULT_COMPACTION = {
+    "compress": True,
+    "seal_after_days": 1,
+    "block_records": 1000,
+    "level": 6,
+}
+
+# Bloom-suodatin: 10 bittiä ja 7 tiivistettä avainta kohden (~1 % vääriä osumia)
+BLOOM_BITS_PER_KEY = 10
+BLOOM_HASHES = 7
+
+def day_of_timestamp(ts):
+    return datetime.fromtimestamp(float(ts)).strftime(DAY_FORMAT)
+
+def day_range(start=None, end=None):
+    """Aikaikkuna (unix-aikaleimat) päivinä: (ensimmäinen, viimeinen) tai None rajattomalle."""
+    first = day_of_timestamp(start) if start is not None else None
+    last = day_of_timestamp(end) if end is not None else None
+    return first, last
+
+def cutoff_day(days_to_keep, now=None):
+    """Vanhin päivä, joka vielä säilytetään."""
+    return ((now or datetime.now()) - timedelta(days=days_to_keep)).strftime(DAY_FORMAT)
+
+def url_key(url):
+    """Palauttaa URL:n 64-bittisen tiivisteen (SQLite INTEGER -avain, bloom-suodatin)."""
+    digest = hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+def record_key(record):
+    url = record.get("url")
+    return url_key(url) if url else None
+
+def get_compaction_settings(config=None):
+    settings = dict(DEFAULT_COMPACTION)
+    if config is None or 'ARCHIVE' not in config:
+        return settings
+    section = config['ARCHIVE']
+    for key, default in DEFAULT_COMPACTION.items():
+        if key not in section:
+            continue
+        try:
+            if isinstance(default, bool):
+                settings[key] = section.getboolean(key)
+            else:
+                settings[key] = type(default)(float(section[key]))
+        except ValueError:
+            print(f"[!] Jeeves: Invalid [ARCHIVE] {key} = {section[key]}")
+    return settings
+
+class BloomFilter:
+    """Lohkon avainten (64-bittiset kokonaisluvut) bloom-suodatin."""
+
+    def __init__(self, size, bits=None):
+        self.size = max(64, size)
+        self.bits = bits if bits is not None else bytearray((self.size + 7) // 8)
+
+    @classmethod
+    def for_keys(cls, keys):
+        bloom = cls(len(keys) * BLOOM_BITS_PER_KEY)
+        for key in keys:
+            bloom.add(key)
+        return bloom
+
+    def _positions(self, key):
+        # Kaksoistiivistys: yksi 64-bittinen avain riittää kaikkiin k:hon
+        h1 = key & 0xFFFFFFFF
+        h2 = ((key >> 32) & 0xFFFFFFFF) | 1
+        return [(h1 + i * h2) % self.size for i in range(BLOOM_HASHES)]
+
+    def add(self, key):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    def dump(self):
+        return {"size": self.size, "bits": base64.b64encode(bytes(self.bits)).decode("ascii")}
+
+    @classmethod
+    def load(cls, data):
+        return cls(data["size"], bytearray(base64.b64decode(data["bits"])))
+
+class SegmentStore:
+    """day_of(record) kertoo, mihin päivän segmenttiin tietue kuuluu ('YYYY-MM-DD').
+
+    time_of(record) (unix-aikaleima) ja key_of(record) (64-bittinen avain)
+    tarvitaan vain tiivistettyjen lohkojen hakemistoon.
+    """
+
+    def __init__(self, folder, day_of, time_of=None, key_of=None):
+        self.folder = folder
+        self.day_of = day_of
+        self.time_of = time_of
+        self.key_of = key_of
+        self.manifest_path = os.path.join(folder, MANIFEST)
+        self.lock = threading.RLock()
+        self._blocks = {}
+        self.manifest = self._load_manifest()
+
+    # --- MANIFESTI ---
+
+    def _load_manifest(self):
+        manifest = {"version": MANIFEST_VERSION, "segments": {}}
+        if os.path.exists(self.manifest_path):
+            try:
+                with open(self.manifest_path, "r", encoding="utf-8") as f:
+                    loaded = json.load(f)
+                if loaded.get("version") == MANIFEST_VERSION:
+                    manifest = loaded
+            except (OSError, ValueError) as e:
+                print(f"[!] Jeeves: Segment manifest unreadable, rebuilding: {e}")
+        # Kaatuminen lisäyksen ja manifestin tallennuksen välissä: levyllä oleva tiedosto voittaa
+        if os.path.isdir(self.folder):
+            for name in os.listdir(self.folder):
+                if name.endswith(SEALED_SUFFIX):
+                    meta = manifest["segments"].setdefault(name[:-len(SEALED_SUFFIX)], {"records": None})
+                    if not os.path.exists(os.path.join(self.folder, name[:-len(SEALED_SUFFIX)] + SEGMENT_SUFFIX)):
+                        meta["sealed"] = True
+                elif name.endswith(SEGMENT_SUFFIX):
+                    manifest["segments"].setdefault(name[:-len(SEGMENT_SUFFIX)], {"records": None})
+        return manifest
+
+    def reload(self):
+        """Lukee manifestin uudelleen (toinen prosessi on voinut lisätä segmenttejä)."""
+        with self.lock:
+            self.manifest = self._load_manifest()
+
+    def _save_manifest(self):
+        os.makedirs(self.folder, exist_ok=True)
+        tmp_path = f"{self.manifest_path}.tmp.{os.getpid()}"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    def segment_path(self, day):
+        return os.path.join(self.folder, day + SEGMENT_SUFFIX)
+
+    def sealed_path(self, day):
+        return os.path.join(self.folder, day + SEALED_SUFFIX)
+
+    def blocks_path(self, day):
+        return os.path.join(self.folder, day + BLOCKS_SUFFIX)
+
+    def _day_files(self, day):
+        return [p for p in (self.segment_path(day), self.sealed_path(day), self.blocks_path(day))
+                if os.path.exists(p)]
+
+    def days(self, first=None, last=None):
+        """Segmenttien päivät järjestyksessä, valinnaisesti rajattuna [first, last] väliin."""
+        return sorted(day for day in self.manifest["segments"]
+                      if (first is None or day >= first) and (last is None or day <= last))
+
+    def info(self, day):
+        return self.manifest["segments"].get(day, {})
+
+    def is_empty(self):
+        return not self.manifest["segments"]
+
+    def disk_usage(self):
+        """Segmenttien koko levyllä tavuina (manifesti mukaan lukien)."""
+        if not os.path.isdir(self.folder):
+            return 0
+        return sum(os.path.getsize(os.path.join(self.folder, name)) for name in os.listdir(self.folder))
+
+    # --- KIRJOITUS ---
+
+    def append(self, records):
+        """Lisää tietueet päiviensä segmenttien loppuun. Palauttaa lisättyjen määrän."""
+        by_day = {}
+        for record in records:
+            by_day.setdefault(self.day_of(record), []).append(record)
+        if not by_day:
+            return 0
+
+        with self.lock:
+            for day, items in by_day.items():
+                self._append_day(day, items)
+            self._save_manifest()
+        return sum(len(items) for items in by_day.values())
+
+    def _append_day(self, day, items):
+        # Tiivistettyyn päivään lisätyt rivit menevät tavalliseen tiedostoon sen rinnalle
+        os.makedirs(self.folder, exist_ok=True)
+        payload = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in items)
+        with open(self.segment_path(day), "a", encoding="utf-8") as f:
+            f.write(payload)
+        meta = self.manifest["segments"].setdefault(day, {"records": 0})
+        if meta.get("records") is not None:
+            meta["records"] += len(items)
+
+    # --- LUKU ---
+
+    def blocks(self, day):
+        """Tiivistetyn päivän lohkohakemisto (välimuistissa tiedoston mtime:n mukaan)."""
+        path = self.blocks_path(day)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return []
+        cached = self._blocks.get(day)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        with open(path, "r", encoding="utf-8") as f:
+            blocks = json.load(f)
+        self._blocks[day] = (mtime, blocks)
+        return blocks
+
+    def _read_block(self, f, block):
+        f.seek(block["offset"])
+        data = zlib.decompress(f.read(block["length"]), wbits=31)
+        for line in data.splitlines():
+            yield json.loads(line)
+
+    def _read_plain(self, day):
+        path = self.segment_path(day)
+        if not os.path.exists(path):
+            return
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.endswith("\n"):
+                    break
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+    def read_day(self, day, start=None, end=None):
+        """Yhden päivän tietueet; keskeneräinen viimeinen rivi ohitetaan.
+
+        Tiivistetyistä lohkoista puretaan vain ne, joiden aikaväli osuu
+        [start, end] ikkunaan.
+        """
+        yield from self.read_sealed(day, start, end)
+        yield from self._read_plain(day)
+
+    def read_sealed(self, day, start=None, end=None):
+        if not self.info(day).get("sealed"):
+            return
+        with open(self.sealed_path(day), "rb") as f:
+            for block in self.blocks(day):
+                if (start is not None and block["last"] is not None and block["last"] < start) or \
+                        (end is not None and block["first"] is not None and block["first"] > end):
+                    continue
+                yield from self._read_block(f, block)
+
+    def read(self, start=None, end=None):
+        """Tietueet aikaikkunasta (unix-aikaleimat); avaa vain ikkunan segmentit."""
+        first, last = day_range(start, end)
+        for day in self.days(first, last):
+            yield from self.read_day(day, start, end)
+
+    def find(self, key, match):
+        """Uusin tietue, jolle match(record) on tosi; key = key_of-avain.
+
+        Tiivistetyistä päivistä puretaan vain lohkot, joiden bloom-suodatin
+        sisältää avaimen.
+        """
+        for day in reversed(self.days()):
+            found = None
+            for record in self._read_plain(day):
+                if match(record):
+                    found = record
+            if found is None and self.info(day).get("sealed"):
+                with open(self.sealed_path(day), "rb") as f:
+                    for block in reversed(self.blocks(day)):
+                        if key not in BloomFilter.load(block["bloom"]):
+                            continue
+                        for record in self._read_block(f, block):
+                            if match(record):
+                                found = record
+                        if found is not None:
+                            break
+            if found is not None:
+                return found
+        return None
+
+    # --- TIIVISTYS ---
+
+    def seal(self, before_day, block_records=1000, level=6):
+        """Tiivistää before_day-päivää vanhemmat tavalliset segmentit gzip-lohkoiksi.
+
+        Palauttaa tiivistettyjen päivien listan.
+        """
+        sealed = []
+        with self.lock:
+            for day in self.days(last=before_day):
+                if day >= before_day or not os.path.exists(self.segment_path(day)):
+                    continue
+                self._seal_day(day, block_records, level)
+                sealed.append(day)
+            if sealed:
+                self._save_manifest()
+        return sealed
+
+    def _seal_day(self, day, block_records, level):
+        records = list(self.read_day(day))
+        tmp_path = f"{self.sealed_path(day)}.tmp.{os.getpid()}"
+        blocks = []
+        with open(tmp_path, "wb") as f:
+            for i in range(0, len(records), block_records):
+                chunk = records[i:i + block_records]
+                payload = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in chunk).encode("utf-8")
+                # wbits=31: jokainen lohko on itsenäinen gzip-jäsen (zcat lukee koko tiedoston)
+                compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+                data = compressor.compress(payload) + compressor.flush()
+                times = [t for t in map(self.time_of, chunk) if t is not None] if self.time_of else []
+                keys = [k for k in map(self.key_of, chunk) if k is not None] if self.key_of else []
+                blocks.append({
+                    "offset": f.tell(),
+                    "length": len(data),
+                    "records": len(chunk),
+                    "first": min(times) if times else None,
+                    "last": max(times) if times else None,
+                    "bloom": BloomFilter.for_keys(keys).dump(),
+                })
+                f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+        blocks_tmp = f"{self.blocks_path(day)}.tmp.{os.getpid()}"
+        with open(blocks_tmp, "w", encoding="utf-8") as f:
+            json.dump(blocks, f)
+        os.replace(blocks_tmp, self.blocks_path(day))
+        os.replace(tmp_path, self.sealed_path(day))
+        self.manifest["segments"][day] = {"records": len(records), "sealed": True}
+        # Tavallinen tiedosto poistetaan vasta, kun tiivistetty on paikallaan
+        os.remove(self.segment_path(day))
+        self._blocks.pop(day, None)
+
+    # --- ELINKAARI ---
+
+    def retire(self, before_day, into=None):
+        """Poistaa kaikki before_day-päivää vanhemmat segmentit.
+
+        into: toinen SegmentStore, johon tiedostot siirretään (os.replace);
+        None poistaa ne. Palauttaa siirrettyjen päivien listan.
+        """
+        with self.lock:
+            retired = [day for day in self.days() if day < before_day]
+            for day in retired:
+                if into is None:
+                    for path in self._day_files(day):
+                        os.remove(path)
+                else:
+                    into.adopt(self, day)
+                del self.manifest["segments"][day]
+                self._blocks.pop(day, None)
+            if retired:
+                self._save_manifest()
+        return retired
+
+    def adopt(self, source, day):
+        """Ottaa toisen säilön päivän omakseen (siirto, ei kopiota)."""
+        with self.lock:
+            os.makedirs(self.folder, exist_ok=True)
+            if day in self.manifest["segments"]:
+                # Päivä on jo olemassa: rivit liitetään perään (harvinainen tapaus)
+                self._append_day(day, list(source.read_day(day)))
+                for path in source._day_files(day):
+                    os.remove(path)
+            else:
+                for path in source._day_files(day):
+                    os.replace(path, os.path.join(self.folder, os.path.basename(path)))
+                self.manifest["segments"][day] = dict(source.info(day))
+            self._blocks.pop(day, None)
+            self._save_manifest()
+
+def entry_day(entry):
+    """Muistimerkinnän päivä sen omasta aikaleimasta (puuttuessa: tänään)."""
+    ts = entry_timestamp(entry)
+    return day_of_timestamp(ts if ts is not None else time.time())
+
+def replay(records, entries=None):
+    """Kokoaa tietueet URL:n mukaan; sama URL myöhemmin = uudempi versio.
+
+    Hautakivi ("deleted": true) poistaa avaimen aiemmat versiot.
+    """
+    entries = {} if entries is None else entries
+    for record in records:
+        key = record.get("url") or record.get("title")
+        if record.get("deleted"):
+            entries.pop(key, None)
+            continue
+        # Avain säilyttää ensimmäisen paikkansa, arvo on viimeisin versio
+        entries[key] = record
+    return entries
+
+def live_records(store):
+    """Säilön voimassa olevat merkinnät päivä kerrallaan (hautakivi on aina samassa päivässä)."""
+    for day in store.days():
+        yield from replay(store.read_day(day)).values()
+
+def tombstone(entry):
+    """Poistomerkintä: sama avain ja aikaleima, joten se päätyy merkinnän omaan päivään."""
+    return {"url": entry.get("url"), "title": entry.get("title"), "timestamp": entry.get("timestamp"),
+            "date": entry.get("date"), "deleted": True}
+
+class SegmentMemoryStore:
+    """JeevesMemoryn [MEMORY] backend = segments (archive/memory/).
+
+    Sama rajapinta kuin jeeves_storage.SqliteMemoryStore. Koko muisti
+    ladataan vasta, kun sitä tarvitaan (pending, has_url, data); since()
+    lukee ennen sitä vain aikaikkunan segmentit.
+    """
+
+    def __init__(self, folder):
+        self.segments = SegmentStore(folder, entry_day)
+        self.path = self.segments.manifest_path
+        self._entries = None       # url -> merkintä (koko muisti ladattu)
+        self._live = {}            # url -> kutsujille annettu merkintä
+        self._flushed = {}         # url -> viimeksi levylle kirjoitettu JSON
+        self._materialized = None
+        self._in_batch = 0
+
+    # --- LATAUS ---
+
+    @staticmethod
+    def _snapshot(entry):
+        return json.dumps(entry, ensure_ascii=False, sort_keys=True)
+
+    def _adopt(self, records):
+        """Rekisteröi luetut merkinnät; jo annettu olio palautetaan sellaisenaan."""
+        result = []
+        for key, entry in replay(records).items():
+            if key not in self._live:
+                self._live[key] = entry
+                self._flushed[key] = self._snapshot(entry)
+            result.append(self._live[key])
+        return result
+
+    def _load(self):
+        if self._entries is None:
+            self.segments.reload()
+            self._entries = {}
+            for entry in self._adopt(self.segments.read()):
+                self._entries[entry.get("url") or entry.get("title")] = entry
+        return self._entries
+
+    # --- KIRJOITUS ---
+
+    def insert(self, entry):
+        key = entry.get("url") or entry.get("title")
+        if self.has_url(key):
+            return False
+        self._entries[key] = self._live[key] = entry
+        if self._materialized is not None:
+            self._materialized["archive"].append(entry)
+        if not self._in_batch:
+            self.save_changed()
+        return True
+
+    def update(self, entry):
+        """Tallentaa yhden merkinnän muutokset (uusi rivi sen päivän segmenttiin)."""
+        key = entry.get("url") or entry.get("title")
+        self._live.setdefault(key, entry)
+        if not self._in_batch:
+            self._append([entry])
+
+    def _append(self, entries):
+        changed = []
+        for entry in entries:
+            snapshot = self._snapshot(entry)
+            key = entry.get("url") or entry.get("title")
+            if self._flushed.get(key) != snapshot:
+                self._flushed[key] = snapshot
+                changed.append(entry)
+        return self.segments.append(changed)
+
+    def save_changed(self):
+        """Kirjoittaa kaikki muuttuneet merkinnät; muuttumattomat ohitetaan."""
+        return self._append(list(self._live.values()))
+
+    def delete(self, entries):
+        """Poistaa merkinnät kirjoittamalla niille hautakivet (segmenttejä ei kirjoiteta uudelleen)."""
+        self._load()
+        removed = []
+        for entry in entries:
+            key = entry.get("url") or entry.get("title")
+            if self._entries.pop(key, None) is None:
+                continue
+            self._live.pop(key, None)
+            self._flushed.pop(key, None)
+            removed.append(entry)
+        if not removed:
+            return
+        self.segments.append([tombstone(entry) for entry in removed])
+        if self._materialized is not None:
+            gone = {id(e) for e in removed}
+            self._materialized["archive"] = [e for e in self._materialized["archive"] if id(e) not in gone]
+
+    def begin(self):
+        self._in_batch += 1
+
+    def end(self):
+        self._in_batch -= 1
+        if self._in_batch == 0:
+            self.save_changed()
+
+    def retire(self, cutoff, into=None):
+        """Poistaa cutoff-aikaleimaa vanhempien päivien segmentit kokonaisina.
+
+        Palauttaa poistettujen merkintöjen määrän (lataamattomana: rivien määrän).
+        """
+        self.save_changed()
+        before_day = day_of_timestamp(cutoff)
+        old_days = [day for day in self.segments.days() if day < before_day]
+        if not old_days:
+            return 0
+        if self._entries is None:
+            count = sum(self.segments.info(day).get("records") or 0 for day in old_days)
+        else:
+            count = sum(1 for entry in self._entries.values() if entry_day(entry) < before_day)
+        for key in [key for key, entry in self._live.items() if entry_day(entry) < before_day]:
+            del self._live[key]
+            self._flushed.pop(key, None)
+            if self._entries is not None:
+                self._entries.pop(key, None)
+        self._materialized = None
+        self.segments.retire(before_day, into)
+        return count
+
+    # --- HAUT ---
+
+    def materialize(self):
+        """Koko muisti listana vanhoille kutsujille (memory.data['archive'])."""
+        if self._materialized is None:
+            self._materialized = {"archive": list(self._load().values())}
+        return self._materialized
+
+    def older_than(self, cutoff):
+        return [e for e in self._load().values() if (entry_timestamp(e) or 0) < cutoff]
+
+    def since(self, cutoff):
+        if self._entries is not None:
+            entries = self._entries.values()
+        else:
+            # Vain aikaikkunan segmentit: vanhempia päiviä ei avata lainkaan
+            self.segments.reload()
+            entries = self._adopt(self.segments.read(start=cutoff))
+        return [e for e in entries if (entry_timestamp(e) or 0) >= cutoff]
+
+    def by_url(self, url):
+        entry = self._load().get(url)
+        return [entry] if entry is not None else []
+
+    def has_url(self, url):
+        return url in self._load()
+
+    def pending(self, markers, min_length=None, error_terms=()):
+        return [e for e in self._load().values()
+                if e["summary"] in markers
+                or (min_length and len(e["summary"]) < min_length)
+                or any(t in e["summary"].lower() for t in error_terms)]
+
+    def category_counts(self, cutoff):
+        counts = {}
+        for e in self.since(cutoff):
+            counts[e.get("category")] = counts.get(e.get("category"), 0) + 1
+        return counts
+
+    def count(self):
+        return len(self._load())
+
+    # --- MIGRAATIO ---
+
+    def migrate_from_json(self, json_path):
+        """Tuo olemassa olevan jeeves_memory.json-tiedoston segmentteihin (kertaluonteinen)."""
+        if not os.path.exists(json_path):
+            return 0
+        try:
+            with open(json_path, "r", encoding="utf-8") as f:
+                entries = json.load(f).get("archive", [])
+        except Exception as e:
+            print(f"[!] Jeeves: Migraatio epäonnistui: {e}")
+            return 0
+
+        fresh = [e for e in entries if not self.has_url(e.get("url") or e.get("title"))]
+        for entry in fresh:
+            key = entry.get("url") or entry.get("title")
+            self._entries[key] = self._live[key] = entry
+        self._append(fresh)
+        self._materialized = None
+        os.replace(json_path, json_path + ".migrated")
+        return len(fresh)
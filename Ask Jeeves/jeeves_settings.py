@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+
+"""
+Jeeves - Personal News Butler
+File: jeeves_settings.py
+Author: Tuomas Lähteenmäki
+Version: 3.1.0
+Licence: GNU GPLv3
+Source: https://github.com/lahtis/Flow/tree/main/Ask%20Jeeves
+
+Description:
+    One process-wide view of jeeves.conf. get_settings() returns the shared
+    JeevesSettings object; the file is parsed on first use and again only
+    when its modification time changes. Every reload produces a fresh
+    ConfigParser (holders of the old one keep a consistent snapshot), bumps
+    `version` and notifies subscribers of the sections that changed:
+
+        settings = get_settings()
+        settings.subscribe(lambda s, changed: print(changed), sections={"FEEDS"})
+
+    Callbacks run in the thread that noticed the change; GUI code should
+    hand them over to the main thread (e.g. through a queue).
+"""
+
+import configparser
+import os
+import threading
+
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "jeeves.conf")
+DEFAULT_LANGUAGE = "fi"
+DEFAULT_GEMINI_MODEL = "gemini-2.0-flash"
+DEFAULT_GROQ_MODEL = "llama-3.3-70b-versatile"
+
+def _split_list(value):
+    return [part.strip() for part in value.split(',') if part.strip()]
+
+def get_language(config):
+    """Kieli [SETTINGS]-lohkosta; sama oletus kaikkialla."""
+    if config is not None and 'SETTINGS' in config:
+        return config['SETTINGS'].get('language', DEFAULT_LANGUAGE).strip().lower() or DEFAULT_LANGUAGE
+    return DEFAULT_LANGUAGE
+
+def read_config(path):
+    """Lukee tiedoston UTF-8:na ja tarvittaessa latin-1:nä (Windowsin ä-kirjaimet)."""
+    config = configparser.ConfigParser()
+    if os.path.exists(path):
+        try:
+            config.read(path, encoding='utf-8')
+        except UnicodeDecodeError:
+            config = configparser.ConfigParser()
+            config.read(path, encoding='latin-1')
+    return config
+
+class JeevesSettings:
+    def __init__(self, path=CONFIG_FILE):
+        self.path = path
+        self.lock = threading.RLock()
+        self.config = configparser.ConfigParser()
+        self.mtime = False  # False = ei vielä luettu (None = tiedostoa ei ole)
+        self.version = 0
+        self.listeners = []
+        self.refresh()
+
+    def _stat(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except OSError:
+            return None
+
+    def refresh(self):
+        """Lataa tiedoston uudelleen, jos sen mtime on muuttunut. Palauttaa muuttuneet lohkot."""
+        mtime = self._stat()
+        if mtime == self.mtime:
+            return set()
+        with self.lock:
+            if mtime == self.mtime:
+                return set()
+            try:
+                config = read_config(self.path)
+            except configparser.Error as e:
+                # Puolivalmis tai virheellinen tiedosto: pidetään edellinen versio
+                print(f"[!] Jeeves: Could not read {os.path.basename(self.path)}: {e}")
+                return set()
+            changed = self._changed_sections(self.config, config)
+            first = self.mtime is False
+            self.config, self.mtime = config, mtime
+            if changed or first:
+                self.version += 1
+            listeners = list(self.listeners)
+
+        if changed and not first:
+            for callback, sections in listeners:
+                relevant = changed if sections is None else changed & sections
+                if relevant:
+                    try:
+                        callback(self, relevant)
+                    except Exception as e:
+                        print(f"[!] Jeeves: Settings listener failed: {e}")
+        return changed
+
+    @staticmethod
+    def _changed_sections(old, new):
+        names = set(old.sections()) | set(new.sections())
+        return {name for name in names
+                if (dict(old[name]) if old.has_section(name) else None) !=
+                   (dict(new[name]) if new.has_section(name) else None)}
+
+    def subscribe(self, callback, sections=None):
+        """callback(settings, muuttuneet_lohkot). Palauttaa funktion, joka peruu tilauksen."""
+        item = (callback, set(sections) if sections else None)
+        with self.lock:
+            self.listeners.append(item)
+
+        def unsubscribe():
+            with self.lock:
+                if item in self.listeners:
+                    self.listeners.remove(item)
+        return unsubscribe
+
+    # --- TYYPITETYT ASETUKSET ---
+
+    def _get(self, section, key, fallback=""):
+        return self.config.get(section, key, fallback=fallback).strip()
+
+    @property
+    def language(self):
+        return get_language(self.config)
+
+    @property
+    def gemini_api_key(self):
+        return self._get('SETTINGS', 'api_key') or None
+
+    @property
+    def groq_api_key(self):
+        return self._get('API_KEYS', 'groq') or None
+
+    @property
+    def gemini_model(self):
+        return self._get('MODELS', 'gemini') or DEFAULT_GEMINI_MODEL
+
+    @property
+    def groq_model(self):
+        return self._get('MODELS', 'groq') or DEFAULT_GROQ_MODEL
+
+    @property
+    def priority_keywords(self):
+        return _split_list(self._get('KEYWORDS', 'priority'))
+
+    @property
+    def critical_terms(self):
+        return _split_list(self._get('KEYWORDS', 'critical'))
+
+_settings = None
+_settings_lock = threading.Lock()
+
+def get_settings(path=CONFIG_FILE):
+    """Prosessinlaajuinen asetusolio; jokainen kutsu tarkistaa vain tiedoston mtime-arvon."""
+    global _settings
+    with _settings_lock:
+        if _settings is None or _settings.path != path:
+            _settings = JeevesSettings(path)
+            return _settings
+    _settings.refresh()
+    return _settings
@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+
+"""
+Jeeves - Personal News Butler
+File: jeeves_storage.py
+Author: Tuomas Lähteenmäki
+Version: 3.1.0
+Licence: GNU GPLv3
+Source: https://github.com/lahtis/Flow/tree/main/Ask%20Jeeves
+
+Description:
+    Optional SQLite backend for JeevesMemory (archive/jeeves_memory.db).
+    Enabled with [MEMORY] backend = sqlite in jeeves.conf. Report windows,
+    pending queues, category counts and URL dedup are indexed queries
+    instead of scans over the whole JSON list.
+"""
+
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+# Sarakkeet, joilla on oma kenttänsä; muut avaimet tallennetaan 'extra'-JSONiin
+CORE_FIELDS = ("title", "summary", "url", "category", "timestamp", "date")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    url TEXT UNIQUE,
+    title TEXT,
+    summary TEXT,
+    category TEXT,
+    timestamp REAL,
+    date TEXT,
+    status TEXT,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_entries_timestamp ON entries(timestamp);
+CREATE INDEX IF NOT EXISTS idx_entries_category ON entries(category, timestamp);
+CREATE INDEX IF NOT EXISTS idx_entries_status ON entries(status);
+"""
+
+def entry_timestamp(entry):
+    """Palauttaa merkinnän aikaleiman; vanhoissa merkinnöissä käytetään 'date'-kenttää."""
+    ts = entry.get("timestamp")
+    if ts:
+        return float(ts)
+    try:
+        return datetime.strptime(entry.get("date", "2000-01-01"), "%Y-%m-%d").timestamp()
+    except (TypeError, ValueError):
+        return None
+
+class SqliteMemoryStore:
+    def __init__(self, db_path, pending_markers):
+        self.path = db_path
+        self.pending_markers = set(pending_markers)
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+        # Kutsujille annetut merkinnät: rowid -> [dict, tilannekuva]
+        self._live = {}
+        self._rowids = {}
+        self._materialized = None
+        self._in_batch = 0
+
+    # --- MUUNNOKSET ---
+
+    def _status(self, summary):
+        return "pending" if summary in self.pending_markers else "done"
+
+    def _row_values(self, entry):
+        extra = {k: v for k, v in entry.items() if k not in CORE_FIELDS}
+        summary = entry.get("summary", "")
+        return (entry.get("url"), entry.get("title"), summary, entry.get("category"),
+                entry_timestamp(entry), entry.get("date"), self._status(summary),
+                json.dumps(extra, ensure_ascii=False) if extra else None)
+
+    def _to_entry(self, row):
+        entry = {
+            "title": row["title"],
+            "summary": row["summary"],
+            "url": row["url"],
+            "category": row["category"],
+            "timestamp": row["timestamp"],
+            "date": row["date"]
+        }
+        if row["extra"]:
+            entry.update(json.loads(row["extra"]))
+
+        # Sama rivi palautetaan samana oliona, jotta muutokset eivät katoa
+        live = self._live.get(row["id"])
+        if live:
+            return live[0]
+        self._track(row["id"], entry)
+        return entry
+
+    def _track(self, rowid, entry):
+        self._live[rowid] = [entry, dict(entry)]
+        self._rowids[id(entry)] = rowid
+
+    def _query(self, sql, params=()):
+        return [self._to_entry(row) for row in self.conn.execute(sql, params)]
+
+    def _commit(self):
+        if not self._in_batch:
+            self.conn.commit()
+
+    # --- KIRJOITUS ---
+
+    def insert(self, entry):
+        cur = self.conn.execute(
+            "INSERT OR IGNORE INTO entries (url, title, summary, category, timestamp, date, status, extra) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", self._row_values(entry))
+        if cur.rowcount:
+            self._track(cur.lastrowid, entry)
+            if self._materialized is not None:
+                self._materialized["archive"].append(entry)
+        self._commit()
+        return bool(cur.rowcount)
+
+    def update(self, entry):
+        """Tallentaa yhden merkinnän muutokset.
+
+        Erän sisällä seurattua merkintää ei kirjoiteta heti: save_changed()
+        kirjoittaa kaikki muutokset yhdellä lyhyellä transaktiolla, joten
+        kirjoituslukkoa ei pidetä AI-kutsujen ajan.
+        """
+        if self._in_batch and id(entry) in self._rowids:
+            return
+        self._write(entry)
+        self._commit()
+
+    def _write(self, entry):
+        rowid = self._rowids.get(id(entry))
+        values = self._row_values(entry)
+        if rowid is not None:
+            self.conn.execute(
+                "UPDATE entries SET url=?, title=?, summary=?, category=?, timestamp=?, date=?, status=?, extra=? "
+                "WHERE id=?", values + (rowid,))
+            self._live[rowid][1] = dict(entry)
+        else:
+            self.conn.execute(
+                "UPDATE entries SET title=?, summary=?, category=?, timestamp=?, date=?, status=?, extra=? "
+                "WHERE url=?", values[1:] + (values[0],))
+
+    def save_changed(self):
+        """Tallentaa kaikki kutsujille annetut merkinnät, joita on muutettu, ja vahvistaa ne.
+
+        Vahvistetaan myös erän sisällä: JeevesMemory.flush() kutsuu tätä
+        flush_every/flush_interval-rajoilla.
+        """
+        for entry, snapshot in list(self._live.values()):
+            if entry != snapshot:
+                self._write(entry)
+        self.conn.commit()
+
+    def begin(self):
+        self._in_batch += 1
+
+    def end(self):
+        self._in_batch -= 1
+        if self._in_batch == 0:
+            self.conn.commit()
+
+    def delete(self, entries):
+        """Poistaa annetut (kannasta haetut) merkinnät."""
+        rowids = [self._rowids.pop(id(e)) for e in entries if id(e) in self._rowids]
+        if not rowids:
+            return
+        self.conn.executemany("DELETE FROM entries WHERE id = ?", [(r,) for r in rowids])
+        self._commit()
+        for rowid in rowids:
+            self._live.pop(rowid, None)
+        if self._materialized is not None:
+            removed = {id(e) for e in entries}
+            self._materialized["archive"] = [e for e in self._materialized["archive"]
+                                             if id(e) not in removed]
+
+    # --- HAUT ---
+
+    def materialize(self):
+        """Koko muisti listana vanhoille kutsujille (memory.data['archive'])."""
+        if self._materialized is None:
+            self._materialized = {"archive": self._query("SELECT * FROM entries ORDER BY id")}
+        return self._materialized
+
+    def older_than(self, cutoff):
+        return self._query("SELECT * FROM entries WHERE timestamp < ? ORDER BY id", (cutoff,))
+
+    def since(self, cutoff):
+        return self._query("SELECT * FROM entries WHERE timestamp >= ? ORDER BY id", (cutoff,))
+
+    def by_url(self, url):
+        return self._query("SELECT * FROM entries WHERE url = ?", (url,))
+
+    def has_url(self, url):
+        return self.conn.execute("SELECT 1 FROM entries WHERE url = ?", (url,)).fetchone() is not None
+
+    def pending(self, markers, min_length=None, error_terms=()):
+        clauses = ["status = 'pending'"]
+        params = []
+        extra_markers = set(markers) - self.pending_markers
+        if extra_markers:
+            clauses.append(f"summary IN ({','.join('?' * len(extra_markers))})")
+            params.extend(extra_markers)
+        if min_length:
+            clauses.append("length(summary) < ?")
+            params.append(min_length)
+        for term in error_terms:
+            clauses.append("lower(summary) LIKE ?")
+            params.append(f"%{term.lower()}%")
+        return self._query(f"SELECT * FROM entries WHERE {' OR '.join(clauses)} ORDER BY id", params)
+
+    def category_counts(self, cutoff):
+        rows = self.conn.execute(
+            "SELECT category, COUNT(*) FROM entries WHERE timestamp >= ? GROUP BY category", (cutoff,))
+        return {row[0]: row[1] for row in rows}
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    # --- MIGRAATIO ---
+
+    def migrate_from_json(self, json_path):
+        """Tuo olemassa olevan jeeves_memory.json-tiedoston kantaan (kertaluonteinen)."""
+        if not os.path.exists(json_path):
+            return 0
+        try:
+            with open(json_path, "r", encoding="utf-8") as f:
+                entries = json.load(f).get("archive", [])
+        except Exception as e:
+            print(f"[!] Jeeves: Migraatio epäonnistui: {e}")
+            return 0
+
+        cur = self.conn.executemany(
+            "INSERT OR IGNORE INTO entries (url, title, summary, category, timestamp, date, status, extra) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", [self._row_values(e) for e in entries])
+        self.conn.commit()
+        os.replace(json_path, json_path + ".migrated")
+        return cur.rowcount
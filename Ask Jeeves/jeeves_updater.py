@@ -12,8 +12,6 @@ Description: This script check latest version of program.
 .
 """
 
-import requests
-
 VERSION_URL = "https://raw.githubusercontent.com/lahtis/Flow/refs/heads/main/Ask%20Jeeves/test/version.txt"
 
 def check_for_updates(current_version):
@@ -22,6 +20,9 @@ def check_for_updates(current_version):
     Palauttaa (uusi_versio, latauslinkki) jos päivitys löytyy, muuten None.
     """
     try:
+        # requests tuodaan vasta tarkistuksen yhteydessä (ei hidasta käynnistystä)
+        import requests
+
         # Asetetaan lyhyt timeout, ettei ohjelma jumiudu jos netti on hidas
         response = requests.get(VERSION_URL, timeout=5)
 
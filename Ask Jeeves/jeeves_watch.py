@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+
+"""
+Jeeves - Personal News Butler
+File: jeeves_watch.py
+Author: Tuomas Lähteenmäki
+Version: 3.1.0
+Licence: GNU GPLv3
+Source: https://github.com/lahtis/Flow/tree/main/Ask%20Jeeves
+
+Description:
+    Live reload for the GUI. MemoryWatcher follows the active memory
+    (jeeves_memory.json, or jeeves_memory.db with the SQLite backend) and
+    notices writes from any process, e.g. a cron run of jeeves.py. On
+    Linux it waits for inotify events on the archive folder; elsewhere it
+    polls the file's mtime and size. After a change the watcher thread
+    reloads the report window, compares it with the previous snapshot and
+    hands over only the added, changed and removed entries (ArchiveDelta).
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+from collections import namedtuple
+
+POLL_INTERVAL = 0.5  # sekuntia (mtime-tarkistus, kun inotify ei ole käytössä)
+DEBOUNCE = 0.1       # odotetaan, että kirjoittaja ehtii vaihtaa tiedoston kokonaan
+
+# Kentät, joiden muutos näkyy käyttäjälle
+FINGERPRINT_FIELDS = ("title", "summary", "category", "timestamp")
+
+ArchiveDelta = namedtuple("ArchiveDelta", "added changed removed")
+
+class ArchiveSnapshot:
+    """Edellinen tila URL -> sormenjälki; diff() palauttaa vain erot."""
+
+    def __init__(self):
+        self.fingerprints = {}
+
+    @staticmethod
+    def fingerprint(entry):
+        return tuple(entry.get(field) for field in FINGERPRINT_FIELDS)
+
+    def prime(self, entries):
+        self.fingerprints = {e.get('url'): self.fingerprint(e) for e in entries}
+
+    def diff(self, entries):
+        added, changed = [], []
+        current = {}
+        for entry in entries:
+            url = entry.get('url')
+            fingerprint = self.fingerprint(entry)
+            current[url] = fingerprint
+            previous = self.fingerprints.get(url)
+            if previous is None:
+                added.append(entry)
+            elif previous != fingerprint:
+                changed.append(entry)
+        removed = [url for url in self.fingerprints if url not in current]
+        self.fingerprints = current
+        return ArchiveDelta(added, changed, removed)
+
+# --- MUUTOSTEN TUNNISTUS ---
+
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+EVENT_HEADER = struct.Struct("iIII")
+
+class InotifySource:
+    """Linuxin inotify ctypesin kautta; seurataan kansiota, koska tiedosto vaihdetaan os.replace:lla."""
+
+    def __init__(self, path):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        folder = os.path.dirname(path) or "."
+        mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+        if libc.inotify_add_watch(self.fd, os.fsencode(folder), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch failed for {folder}")
+        # jeeves_memory.db muuttuu myös -wal/-journal-tiedostojen kautta
+        self.prefix = os.fsencode(os.path.basename(path))
+
+    def wait(self, timeout):
+        """True, jos seurattu tiedosto muuttui timeout-sekunnin aikana."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return False
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return False
+        offset = 0
+        hit = False
+        while offset + EVENT_HEADER.size <= len(data):
+            _, _, _, length = EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b"\0")
+            offset += EVENT_HEADER.size + length
+            if name.startswith(self.prefix):
+                hit = True
+        return hit
+
+    def close(self):
+        os.close(self.fd)
+
+class PollingSource:
+    """Varatapa: ei tapahtumia, tarkistus tehdään joka kierroksella."""
+
+    def wait(self, timeout):
+        return False
+
+    def close(self):
+        pass
+
+def open_source(path):
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifySource(path)
+        except (OSError, AttributeError) as e:
+            print(f"[!] Jeeves: inotify unavailable, polling instead: {e}")
+    return PollingSource()
+
+# --- SEURAAJA ---
+
+class MemoryWatcher:
+    """Taustasäie, joka kutsuu on_change(ArchiveDelta) vain todellisista muutoksista.
+
+    load() palauttaa raporttiikkunan merkinnät (esim. JeevesMemory().get_report(days=7)).
+    on_change kutsutaan seuraajan säikeessä: GUI vie muutokset jonoon.
+    """
+
+    def __init__(self, path, load, on_change, poll_interval=POLL_INTERVAL):
+        self.path = path
+        self.load = load
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        self.snapshot = ArchiveSnapshot()
+        self.signature = self._signature()
+        self.wakeup = threading.Event()
+        self.stopped = threading.Event()
+        self.thread = None
+        self.mode = None
+
+    def _signature(self):
+        """(mtime_ns, koko) muistista ja SQLite-lokitiedostosta."""
+        parts = []
+        for path in (self.path, f"{self.path}-wal"):
+            try:
+                st = os.stat(path)
+                parts.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                parts.append(None)
+        return tuple(parts)
+
+    def prime(self, entries):
+        """Asettaa lähtötilan, jotta ensimmäinen muutos ei näytä koko listaa uutena."""
+        self.snapshot.prime(entries)
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name="MemoryWatcher", daemon=True)
+        self.thread.start()
+
+    def check_now(self):
+        """Pakottaa tarkistuksen heti (esim. oman päivityksen jälkeen)."""
+        self.wakeup.set()
+
+    def stop(self):
+        self.stopped.set()
+        self.wakeup.set()
+
+    def _run(self):
+        source = open_source(self.path)
+        self.mode = "inotify" if isinstance(source, InotifySource) else "polling"
+        try:
+            while not self.stopped.is_set():
+                forced = self.wakeup.is_set()
+                if not forced:
+                    # inotify herättää heti; ilman sitä wait palaa aikakatkaisulla
+                    if source.wait(self.poll_interval):
+                        self.stopped.wait(DEBOUNCE)
+                self.wakeup.clear()
+                self._check(forced)
+        finally:
+            source.close()
+
+    def _check(self, forced=False):
+        signature = self._signature()
+        if signature == self.signature and not forced:
+            return
+        self.signature = signature
+        try:
+            entries = self.load()
+        except Exception as e:
+            print(f"[!] Jeeves: Live reload failed: {e}")
+            return
+        delta = self.snapshot.diff(entries)
+        if delta.added or delta.changed or delta.removed:
+            self.on_change(delta)
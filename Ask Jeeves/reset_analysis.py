@@ -1,9 +1,10 @@
+# -*- coding: utf-8 -*-
 # reset_analysis.py
 
 """
 Jeeves - Personal news butler
 File: reset_analysis.py
-Author: [Tuomas Lhteenmki]
+Author: [Tuomas Lähteenmäki]
 Version: 3.1.0
 Licence: GNU General Public License v3.0 (GPLv3)
 Source: https://github.com/lahtis/Flow/tree/main/Ask%20Jeeves
@@ -20,10 +21,11 @@ memory = JeevesMemory()
 new_pending_msg = get_localized_text("pending", "en")
 
 count = 0
-for entry in memory.data['archive']:
-    # Muutetaan kaikki uutiset takaisin odottamaan analyysia
-    entry['summary'] = new_pending_msg
-    count += 1
-
-memory._save_data()
+# Jokainen merkintä tallennetaan muistin oman tallennustavan kautta (json, sqlite tai segments)
+with memory.batch():
+    for entry in memory.data['archive']:
+        # Muutetaan kaikki uutiset takaisin odottamaan analyysia
+        entry['summary'] = new_pending_msg
+        memory.update_entry(entry)
+        count += 1
 print(f"[*] Arkisto nollattu. {count} uutista palautettu tilaan: '{new_pending_msg}'")
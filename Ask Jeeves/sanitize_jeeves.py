@@ -8,7 +8,9 @@ Source: https://github.com/lahtis/Flow/tree/main/Ask%20Jeeves
 
 Description:
 This script repairs JSON syntax errors in personality.json and
-removes duplicate news entries from the memory archive.
+removes duplicate news entries from the memory archive. The memory is
+opened through JeevesMemory, so the configured [MEMORY] backend (json,
+sqlite or segments) is used.
 """
 
 import json
@@ -17,7 +19,6 @@ import os
 # Define paths
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 PERSONALITY_FILE = os.path.join(BASE_DIR, "resources", "personality.json")
-MEMORY_FILE = os.path.join(BASE_DIR, "archive", "jeeves_memory.json")
 
 def repair_json_syntax(file_path):
     """Attempts to load the JSON file and reports specific error locations."""
@@ -53,33 +54,24 @@ def repair_json_syntax(file_path):
 
 def clean_duplicates():
     """Removes identical news titles from the memory archive."""
-    print(f"[*] Checking for duplicates in: {MEMORY_FILE}")
-    if not os.path.exists(MEMORY_FILE):
-        print("[!] Memory file not found. Skipping duplicate check.")
-        return
-
     try:
-        with open(MEMORY_FILE, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-
-        if 'archive' not in data:
-            return
+        from jeeves_logic import JeevesMemory
+        memory = JeevesMemory()
+        print(f"[*] Checking for duplicates in: {memory.path} (backend = {memory.backend})")
 
-        original_count = len(data['archive'])
         seen_titles = set()
-        new_archive = []
+        duplicates = []
 
-        for entry in data['archive']:
+        for entry in memory.data['archive']:
             title = entry.get('title', '').strip()
-            if title not in seen_titles:
-                new_archive.append(entry)
+            if title in seen_titles:
+                duplicates.append(entry)
+            else:
                 seen_titles.add(title)
 
-        if len(new_archive) < original_count:
-            data['archive'] = new_archive
-            with open(MEMORY_FILE, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=4, ensure_ascii=False)
-            print(f"[+] Cleanup complete: Removed {original_count - len(new_archive)} duplicates.")
+        if duplicates:
+            removed = memory.remove_entries(duplicates)
+            print(f"[+] Cleanup complete: Removed {removed} duplicates.")
         else:
             print("[+] No duplicates found.")
 
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+Jeeves - Archive URL index benchmark
+File: test/bench_archive_index.py
+
+Description: Builds a synthetic news_archive.jsonl (default 1,000,000 lines)
+in a temporary folder and compares the old line-by-line scan of
+is_already_archived with the persistent URL index. The archive is split
+into day segments on first open; a one-day window read is timed against
+the full scan. Finally the segments are sealed into gzip blocks and the
+disk size, lookups, window reads and bloom-filtered find() are measured
+again.
+Usage: python test/bench_archive_index.py [lines]
+"""
+
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+# Lisätään juurikansio polkuun (kuten test_jeeves.py)
+root_folder = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root_folder not in sys.path:
+    sys.path.insert(0, root_folder)
+
+from jeeves_archive import JeevesArchive
+
+def legacy_is_already_archived(path, url):
+    """Alkuperäinen toteutus: lukee ja jäsentää koko tiedoston joka kutsulla."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                if json.loads(line).get("url") == url:
+                    return True
+            except json.JSONDecodeError:
+                continue
+    return False
+
+def write_archive(path, lines):
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(lines):
+            f.write(json.dumps({
+                "title": f"Synthetic headline number {i}",
+                "summary": "Lorem ipsum dolor sit amet, consectetur adipiscing elit.",
+                "url": f"https://example.org/news/{i}",
+                "category": "Linux",
+                "timestamp": 1700000000 + i,
+                # 10 000 riviä päivää kohden -> 100 segmenttiä miljoonasta rivistä
+                "archived_at": f"2024-{1 + (i // 10000) // 28 % 12:02d}-{1 + (i // 10000) % 28:02d} 12:00:00"
+            }) + "\n")
+
+def run_benchmark(lines=1_000_000, lookups=20000, legacy_lookups=3):
+    tmp_dir = tempfile.mkdtemp(prefix="jeeves_bench_")
+    path = os.path.join(tmp_dir, "news_archive.jsonl")
+    try:
+        print(f"[*] Writing {lines:,} archive lines to {path}...")
+        write_archive(path, lines)
+        print(f"[*] Archive size: {os.path.getsize(path) / 1e6:,.1f} MB")
+
+        # 1. Vanha lineaarinen haku (pahin tapaus: URL puuttuu)
+        start = time.perf_counter()
+        for _ in range(legacy_lookups):
+            legacy_is_already_archived(path, "https://example.org/missing")
+        legacy_per_call = (time.perf_counter() - start) / legacy_lookups
+
+        # 2. Kertaluonteinen jako päiväsegmentteihin ja indeksin rakennus
+        start = time.perf_counter()
+        archive = JeevesArchive(path, index_search=False)
+        split_time = time.perf_counter() - start
+        start = time.perf_counter()
+        archive.is_already_archived("https://example.org/news/0")
+        build_time = time.perf_counter() - start
+
+        # 3. Indeksin uudelleenavaus toisessa "prosessissa"
+        reopened = JeevesArchive(path, index_search=False)
+        start = time.perf_counter()
+        reopened.is_already_archived("https://example.org/news/0")
+        reopen_time = time.perf_counter() - start
+
+        # 4. Jäsenyystarkistukset indeksistä
+        urls = [f"https://example.org/news/{random.randrange(lines * 2)}" for _ in range(lookups)]
+        start = time.perf_counter()
+        hits = sum(1 for url in urls if reopened.is_already_archived(url))
+        index_per_call = (time.perf_counter() - start) / lookups
+
+        # 5. Tallennus päivittää indeksin
+        reopened.save_to_archive({"title": "new", "url": "https://example.org/fresh"})
+        assert reopened.is_already_archived("https://example.org/fresh")
+        assert hits == sum(1 for url in urls if int(url.rsplit("/", 1)[1]) < lines)
+
+        # 6. Yhden päivän ikkuna avaa vain yhden segmentin
+        day = time.mktime(time.strptime("2024-01-02 00:00:00", "%Y-%m-%d %H:%M:%S"))
+        start = time.perf_counter()
+        window = sum(1 for _ in reopened.read(day, day + 86399))
+        window_time = time.perf_counter() - start
+
+        # 7. Tiivistys gzip-lohkoiksi (kaikki päivät ennen tätä päivää)
+        plain_size = reopened.store.disk_usage()
+        start = time.perf_counter()
+        sealed = reopened.compact({"compress": True, "seal_after_days": 0, "block_records": 1000, "level": 6})
+        compact_time = time.perf_counter() - start
+        sealed_size = reopened.store.disk_usage()
+
+        start = time.perf_counter()
+        sealed_hits = sum(1 for url in urls if reopened.is_already_archived(url))
+        sealed_per_call = (time.perf_counter() - start) / lookups
+        assert sealed_hits == hits
+
+        start = time.perf_counter()
+        sealed_window = sum(1 for _ in reopened.read(day, day + 86399))
+        sealed_window_time = time.perf_counter() - start
+        assert sealed_window == window
+
+        # Bloom-suodatin: vain osuvat lohkot puretaan
+        probes = [f"https://example.org/news/{random.randrange(lines)}" for _ in range(20)]
+        start = time.perf_counter()
+        assert all(reopened.find(url)["url"] == url for url in probes)
+        find_time = (time.perf_counter() - start) / len(probes)
+
+        # Indeksin uudelleenrakennus toimii myös tiivistetyistä päivistä
+        reopened.rebuild_index()
+        assert sum(1 for url in urls if reopened.is_already_archived(url)) == hits
+
+        print(f"{'='*50}")
+        print(" JEEVES ARCHIVE INDEX BENCHMARK")
+        print(f"{'='*50}")
+        print(f"[*] Legacy scan:      {legacy_per_call * 1000:>12,.1f} ms / lookup")
+        print(f"[*] Segment split:    {split_time:>12,.2f} s (one-off, {len(archive.store.days())} segments)")
+        print(f"[*] Index build:      {build_time:>12,.2f} s (one-off)")
+        print(f"[*] Index reopen:     {reopen_time * 1000:>12,.1f} ms")
+        print(f"[*] Indexed lookup:   {index_per_call * 1e6:>12,.1f} µs / lookup")
+        print(f"[*] One-day window:   {window_time * 1000:>12,.1f} ms ({window:,} lines)")
+        print(f"[*] Compaction:       {compact_time:>12,.2f} s ({len(sealed)} days sealed)")
+        print(f"[*] Disk size:        {plain_size / 1e6:>12,.1f} MB -> {sealed_size / 1e6:,.1f} MB "
+              f"({plain_size / sealed_size:,.1f}x smaller)")
+        print(f"[*] Sealed lookup:    {sealed_per_call * 1e6:>12,.1f} µs / lookup")
+        print(f"[*] Sealed window:    {sealed_window_time * 1000:>12,.1f} ms ({sealed_window:,} lines)")
+        print(f"[*] Bloom find():     {find_time * 1000:>12,.1f} ms / url")
+        print(f"[+] Speedup per lookup: {legacy_per_call / index_per_call:,.0f}x")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000)
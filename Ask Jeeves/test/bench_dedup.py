@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""
+Jeeves - Near-duplicate detection benchmark
+File: test/bench_dedup.py
+
+Description: Fills a temporary LSH index (jeeves_dedup.py) with synthetic
+headlines (default 50,000, roughly the 30-day window of a busy setup) and
+probes it with retitled copies (words reordered, one word dropped or
+added) and with unrelated headlines. Reports recall, false positives and
+lookup time against a brute-force Jaccard scan.
+Usage: python test/bench_dedup.py [stories]
+"""
+
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+# Lisätään juurikansio polkuun (kuten test_jeeves.py)
+root_folder = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root_folder not in sys.path:
+    sys.path.insert(0, root_folder)
+
+from jeeves_dedup import NearDuplicateIndex, title_features, jaccard, DEFAULT_DEDUP
+
+SYLLABLES = ("ka", "lo", "mi", "ne", "ru", "sa", "te", "vi", "po", "da", "ri", "on", "el", "ta")
+
+def make_words(rng, count=8000):
+    return sorted({"".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))) for _ in range(count)})
+
+def headline(rng, words):
+    return " ".join(rng.choice(words) for _ in range(rng.randint(7, 11))).capitalize()
+
+def retitle(rng, title, words):
+    """Sama uutinen toisesta syötteestä: sanajärjestys vaihtuu, sana puuttuu tai tulee lisää."""
+    parts = title.split()
+    rng.shuffle(parts)
+    if rng.random() < 0.5:
+        parts.pop()
+    else:
+        parts.append(rng.choice(words))
+    return " ".join(parts)
+
+def run_benchmark(stories=50_000, probes=500, brute_probes=20):
+    rng = random.Random(7)
+    words = make_words(rng)
+    titles = [headline(rng, words) for _ in range(stories)]
+    tmp_dir = tempfile.mkdtemp(prefix="jeeves_dedup_")
+    try:
+        index = NearDuplicateIndex(os.path.join(tmp_dir, "dedup_index.db"))
+        start = time.perf_counter()
+        for i, title in enumerate(titles):
+            index.add(f"https://example.org/{i}", title, commit=False)
+        index.commit()
+        build_time = time.perf_counter() - start
+
+        targets = rng.sample(range(stories), probes)
+        times = []
+        found = 0
+        for i in targets:
+            variant = retitle(rng, titles[i], words)
+            started = time.perf_counter()
+            match = index.find(variant)
+            times.append((time.perf_counter() - started) * 1000)
+            # Vain ne, jotka todella ylittävät kynnyksen, lasketaan odotetuiksi osumiksi
+            expected = jaccard(title_features(variant), title_features(titles[i])) >= DEFAULT_DEDUP["title_threshold"]
+            if expected and match and match.url == f"https://example.org/{i}":
+                found += 1
+            elif not expected:
+                probes -= 1
+
+        false_positives = sum(1 for _ in range(500) if index.find(headline(rng, words)))
+
+        # Vertailukohta: jokainen haku vertaa kaikkiin tallennettuihin otsikoihin
+        feature_sets = [title_features(t) for t in titles]
+        start = time.perf_counter()
+        for i in targets[:brute_probes]:
+            probe = title_features(retitle(rng, titles[i], words))
+            max(jaccard(probe, f) for f in feature_sets)
+        brute_ms = (time.perf_counter() - start) / brute_probes * 1000
+
+        print(f"{'='*55}")
+        print(" JEEVES NEAR-DUPLICATE BENCHMARK")
+        print(f"{'='*55}")
+        print(f"[*] Stories indexed:   {stories:>10,} in {build_time:.1f} s")
+        print(f"[*] Recall:            {found:>10,} / {probes:,} retitled copies found")
+        print(f"[*] False positives:   {false_positives:>10,} / 500 unrelated headlines")
+        print(f"[*] LSH lookup:        {statistics.median(times):>10.2f} ms (p50), "
+              f"{sorted(times)[int(len(times) * 0.95)]:.2f} ms (p95)")
+        print(f"[*] Brute-force scan:  {brute_ms:>10.2f} ms")
+        index.close()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
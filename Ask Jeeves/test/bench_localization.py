@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+Jeeves - Localization micro-benchmark
+File: test/bench_localization.py
+
+Description: Compares lookups per second of the old get_localized_text
+(re-parses personality.json on every call) against the in-memory catalog.
+Usage: python test/bench_localization.py [iterations]
+"""
+
+import json
+import os
+import sys
+import time
+
+# Lisätään juurikansio polkuun (kuten test_jeeves.py)
+root_folder = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root_folder not in sys.path:
+    sys.path.insert(0, root_folder)
+
+from jeeves_logic import METADATA_FILE, get_localized_text
+
+KEYS = [
+    "personality.greetings.morning",
+    "personality.category_comments.Security",
+    "ui.pending",
+    "pending",
+    "ai_instruction",
+    "analysis_done",
+    "idle_comments",
+    "missing.key.path",
+]
+
+def legacy_get_localized_text(key_path, lang="fi"):
+    """Alkuperäinen toteutus: avaa ja jäsentää tiedoston joka kutsulla."""
+    try:
+        if not os.path.exists(METADATA_FILE):
+            return f"[{key_path}]"
+        with open(METADATA_FILE, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        lang_data = data.get(lang, data.get("en", {}))
+        val = lang_data
+        for k in key_path.split('.'):
+            if isinstance(val, dict) and k in val:
+                val = val[k]
+            else:
+                val = None
+                break
+        if val and isinstance(val, str):
+            return val
+        for section in ["ui", "personality"]:
+            if section in lang_data and key_path in lang_data[section]:
+                return lang_data[section][key_path]
+        return f"[{key_path}]"
+    except Exception:
+        return f"[{key_path}]"
+
+def measure(func, iterations):
+    start = time.perf_counter()
+    for i in range(iterations):
+        func(KEYS[i % len(KEYS)], "fi" if i % 2 else "en")
+    elapsed = time.perf_counter() - start
+    return iterations / elapsed if elapsed else float("inf")
+
+def run_benchmark(iterations=20000):
+    # Varmistetaan ensin, että molemmat toteutukset palauttavat saman tuloksen
+    for lang in ["fi", "en", "sv"]:
+        for key in KEYS:
+            assert legacy_get_localized_text(key, lang) == get_localized_text(key, lang), (key, lang)
+
+    legacy_rate = measure(legacy_get_localized_text, max(iterations // 20, 100))
+    catalog_rate = measure(get_localized_text, iterations)
+
+    print(f"{'='*50}")
+    print(" JEEVES LOCALIZATION BENCHMARK")
+    print(f"{'='*50}")
+    print(f"[*] Before (re-parse per call): {legacy_rate:>12,.0f} lookups/s")
+    print(f"[*] After  (catalog):           {catalog_rate:>12,.0f} lookups/s")
+    print(f"[+] Speedup: {catalog_rate / legacy_rate:,.1f}x")
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
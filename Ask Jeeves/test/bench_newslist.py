@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+"""
+Jeeves - News list benchmark
+File: test/bench_newslist.py
+
+Description: Renders 10 000 synthetic news entries through the virtualized
+news list model (jeeves_newslist.py) and reports the frame time for
+scrolling and the cost of a refresh where 1 % of the entries changed.
+Widget work is counted as the number of button reconfigurations per frame;
+with customtkinter and a display available, the real VirtualNewsList is
+timed as well.
+Usage: python test/bench_newslist.py [entries]
+"""
+
+import os
+import random
+import statistics
+import sys
+import time
+
+# Lisätään juurikansio polkuun (kuten test_jeeves.py)
+test_folder = os.path.dirname(os.path.abspath(__file__))
+root_folder = os.path.dirname(test_folder)
+sys.path.insert(0, root_folder)
+
+from jeeves_newslist import NewsListModel, NewsRow, ROW_HEIGHT
+
+VIEWPORT_HEIGHT = 700
+CATEGORIES = ["Tech", "Security", "Linux", "Science", "Default"]
+
+def make_rows(count, seed=1):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        entry = {"url": f"https://example.com/news/{i}",
+                 "title": f"Synthetic headline number {i} " + "x" * rng.randint(0, 40),
+                 "category": rng.choice(CATEGORIES)}
+        rows.append(NewsRow(entry["url"], f"• {entry['title'][:38]}..", "#2b2b2b", entry))
+    return rows
+
+def percentiles(samples_ms):
+    ordered = sorted(samples_ms)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return statistics.median(ordered), p95
+
+def bench_model(rows, frames=2000):
+    model = NewsListModel()
+    model.visible = VIEWPORT_HEIGHT // ROW_HEIGHT + 1
+    bound = [None] * model.visible
+
+    started = time.perf_counter()
+    model.set_rows(rows)
+    model.render_plan(bound)
+    build_ms = (time.perf_counter() - started) * 1000
+
+    # 1 % muuttuneita otsikoita + näkyvä ikkuna keskellä listaa
+    model.scroll_to(len(rows) // 2)
+    model.render_plan(bound)
+    refreshed = list(rows)
+    for i in range(0, len(refreshed), 100):
+        refreshed[i] = refreshed[i]._replace(text=refreshed[i].text + " (updated)")
+    started = time.perf_counter()
+    changed = model.set_rows(refreshed)
+    refresh_updates = len(model.render_plan(bound))
+    refresh_ms = (time.perf_counter() - started) * 1000
+
+    # Vieritys: rullan askeleita ja satunnaisia hyppyjä vierityspalkilla
+    rng = random.Random(2)
+    frame_ms, updates = [], []
+    for _ in range(frames):
+        if rng.random() < 0.9:
+            target = model.top + rng.choice((-3, 3))
+        else:
+            target = rng.randrange(len(rows))
+        started = time.perf_counter()
+        model.scroll_to(target)
+        plan = model.render_plan(bound)
+        model.fractions()
+        frame_ms.append((time.perf_counter() - started) * 1000)
+        updates.append(len(plan))
+
+    return {"build_ms": build_ms, "refresh_ms": refresh_ms, "changed": len(changed),
+            "refresh_updates": refresh_updates, "frame_ms": percentiles(frame_ms),
+            "updates": statistics.mean(updates), "pool": model.visible}
+
+def bench_widget(rows, frames=300):
+    """Oikea VirtualNewsList; vaatii customtkinterin ja näytön."""
+    try:
+        import customtkinter as ctk
+        from jeeves_gui import VirtualNewsList
+        app = ctk.CTk()
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+    app.geometry(f"400x{VIEWPORT_HEIGHT}")
+    news_list = VirtualNewsList(app, on_select=lambda entry: None)
+    news_list.pack(expand=True, fill="both")
+    app.update()
+
+    started = time.perf_counter()
+    news_list.set_rows(rows)
+    app.update()
+    build_ms = (time.perf_counter() - started) * 1000
+
+    frame_ms = []
+    for i in range(frames):
+        started = time.perf_counter()
+        news_list.scroll_by(3 if i % 2 == 0 else 4)
+        app.update()
+        frame_ms.append((time.perf_counter() - started) * 1000)
+    app.destroy()
+    return {"build_ms": build_ms, "frame_ms": percentiles(frame_ms)}, None
+
+def run_benchmark(count=10000):
+    rows = make_rows(count)
+
+    print(f"{'='*60}")
+    print(f" JEEVES NEWS LIST BENCHMARK ({count} entries)")
+    print(f"{'='*60}")
+
+    result = bench_model(rows)
+    p50, p95 = result["frame_ms"]
+    print(f"\n[*] Model (pool of {result['pool']} buttons for a {VIEWPORT_HEIGHT}px viewport)")
+    print(f"    Initial build:   {result['build_ms']:.2f} ms")
+    print(f"    1% refresh:      {result['refresh_ms']:.2f} ms, {result['changed']} ids changed, "
+          f"{result['refresh_updates']} visible buttons reconfigured")
+    print(f"    Scroll frame:    p50 {p50:.3f} ms, p95 {p95:.3f} ms")
+    print(f"    Buttons touched: {result['updates']:.1f} per frame (of {count} entries)")
+
+    widget, error = bench_widget(rows)
+    if widget is None:
+        print(f"\n[!] Widget benchmark skipped ({error})")
+    else:
+        p50, p95 = widget["frame_ms"]
+        print("\n[*] VirtualNewsList (customtkinter)")
+        print(f"    Initial build:   {widget['build_ms']:.1f} ms")
+        print(f"    Scroll frame:    p50 {p50:.2f} ms, p95 {p95:.2f} ms")
+    return result, widget
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+Jeeves - Report renderer benchmark
+File: test/bench_report.py
+
+Description: Renders a synthetic weekly report (default 100,000 entries)
+with every backend in jeeves_formatter.FORMATS into a sink that only
+counts characters. Reports the time and the tracemalloc peak (from a
+second run) for each one. For comparison, the old list-building renderer (url in list +
+list.index) runs on a smaller report, because its source numbering is
+quadratic.
+Usage: python test/bench_report.py [entries]
+"""
+
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+# Lisätään juurikansio polkuun (kuten test_jeeves.py)
+root_folder = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root_folder not in sys.path:
+    sys.path.insert(0, root_folder)
+
+from jeeves_formatter import JeevesFormatter, FORMATS
+from jeeves_priority import PriorityMatcher
+
+CATEGORIES = ("Linux", "Hardware", "Security", "Gaming", "General")
+PENDING = "analysoimatta"
+
+class CountingSink:
+    """Kirjoituskohde, joka vain laskee merkit (kuin putki tai tiedosto)."""
+
+    def __init__(self):
+        self.chars = 0
+
+    def write(self, text):
+        self.chars += len(text)
+        return len(text)
+
+def get_text(key, lang):
+    return "LÄHTEET JA VIITTEET:" if key == "ui.sources_label" else "Kommentti, sir."
+
+def make_entries(count, seed=11):
+    rng = random.Random(seed)
+    return [{"title": f"Story {i} about kernel {rng.randint(1, 9)}.{rng.randint(0, 20)} release",
+             "url": f"https://example.org/news/{i}",
+             "summary": PENDING if i % 10 == 0 else f"Summary of story {i}.\nSecond line of the summary.",
+             "category": rng.choice(CATEGORIES),
+             "timestamp": 1_700_000_000 + i} for i in range(count)]
+
+def legacy_report(entries, matcher, show_full):
+    """Entinen build_report: rivilista muistiin ja lähteet listana (index = O(n))."""
+    sources, lines = [], []
+    groups = {}
+    for e in entries:
+        groups.setdefault(e.get('category', 'General'), []).append(e)
+    for category, items in groups.items():
+        lines.append(f"--- {category.upper()} ---")
+        for item in items:
+            url = item.get('url', '')
+            if url and url not in sources:
+                sources.append(url)
+            source_idx = sources.index(url) + 1 if url else "?"
+            prefix = "[!!!]" if matcher.score_entry(item) > 0 else "[ + ]"
+            lines.append(f"  {prefix} {item.get('title', '')} [{source_idx}]")
+            if show_full:
+                lines.append(f"      {item.get('summary', '')}")
+        lines.append("")
+    lines.extend(f"[{i}] {url}" for i, url in enumerate(sources, 1))
+    return "\n".join(lines)
+
+def measure(fn):
+    """Aika ilman tracemallocia (se hidastaa moninkertaisesti), huippumuisti erikseen."""
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak / 1024 / 1024
+
+def run_benchmark(entries=100_000, legacy_entries=20_000):
+    matcher = PriorityMatcher(["Security", "exploit", "kernel 9.20"])
+    report = make_entries(entries)
+    formatter = JeevesFormatter(get_text, "fi")
+
+    print(f"{'='*60}")
+    print(f" JEEVES REPORT RENDERER BENCHMARK ({entries:,} entries, --full)")
+    print(f"{'='*60}")
+    for fmt in FORMATS:
+        def render(fmt=fmt):
+            sink = CountingSink()
+            return formatter.render(report, matcher, "Hyvää iltaa", PENDING, sink, fmt=fmt, show_full=True), sink
+        (counts, sink), elapsed, peak = measure(render)
+        print(f"[*] {fmt:<9} {elapsed * 1000:>8.0f} ms  peak {peak:>6.1f} MB  "
+              f"output {sink.chars / 1024 / 1024:>6.1f} MB  ({counts['sources']:,} sources)")
+
+    # Vertailu pienemmällä raportilla: vanha lähdenumerointi on O(n²)
+    small = report[:legacy_entries]
+    _, new_time, new_peak = measure(
+        lambda: formatter.render(small, matcher, "Hyvää iltaa", PENDING, CountingSink(), show_full=True))
+    text, old_time, old_peak = measure(lambda: legacy_report(small, matcher, True))
+    print(f"\n[*] {legacy_entries:,} entries, text:")
+    print(f"    streaming  {new_time * 1000:>8.0f} ms  peak {new_peak:>6.1f} MB")
+    print(f"    list-built {old_time * 1000:>8.0f} ms  peak {old_peak:>6.1f} MB  (report {len(text) / 1024 / 1024:.1f} MB)")
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000)
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+Jeeves - Full-text search benchmark
+File: test/bench_search.py
+
+Description: Indexes a synthetic news history (default 200,000 items, about
+five years at ~100 items a day) into a temporary FTS5 index and compares
+ranked searches with a plain substring scan over the same entries.
+Usage: python test/bench_search.py [items]
+"""
+
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from itertools import accumulate
+
+# Lisätään juurikansio polkuun (kuten test_jeeves.py)
+root_folder = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if root_folder not in sys.path:
+    sys.path.insert(0, root_folder)
+
+from jeeves_search import SearchIndex
+
+WORDS = ("kernel", "driver", "release", "security", "patch", "update", "graphics", "mesa",
+         "vulkan", "benchmark", "ubuntu", "fedora", "wayland", "compiler", "rust", "scheduler",
+         "filesystem", "btrfs", "performance", "laptop", "firmware", "vulnerability", "exploit",
+         "steam", "proton", "gaming", "amd", "intel", "nvidia", "arm", "risc-v", "systemd")
+CATEGORIES = ("Linux", "Security", "Hardware", "Gaming", "Ubuntu")
+QUERIES = ("kernel rust", "vulnerability", "mesa vulkan", "wayl", "category:security exploit",
+           '"graphics driver"', "steam proton amd", "btrfs performance")
+
+def make_vocabulary(rng, size=20000):
+    """Zipf-jakautunut sanasto: aiheen sanat ovat harvinaisempia kuin tavalliset täytesanat."""
+    syllables = ("ka", "lo", "mi", "ne", "ru", "sa", "te", "vi", "po", "da", "ri", "on", "el", "ta")
+    filler = {"".join(rng.choice(syllables) for _ in range(rng.randint(1, 4))) for _ in range(size)}
+    vocabulary = sorted(filler)
+    rng.shuffle(vocabulary)
+    # Aihesanat sijoitetaan keskitaajuuksille (kuin oikeissa uutisissa)
+    for rank, word in enumerate(WORDS):
+        vocabulary.insert(20 + rank * 15, word)
+    weights = [1.0 / (rank + 1) for rank in range(len(vocabulary))]
+    return vocabulary, list(accumulate(weights))
+
+def make_entries(count, seed=1):
+    rng = random.Random(seed)
+    vocabulary, cum_weights = make_vocabulary(rng)
+    start = time.time() - count * 864  # ~100 uutista päivässä
+    for i in range(count):
+        title = " ".join(rng.choices(vocabulary, cum_weights=cum_weights, k=8)).capitalize()
+        summary = " ".join(rng.choices(vocabulary, cum_weights=cum_weights, k=60))
+        yield {"title": f"{title} {i}", "summary": summary, "url": f"https://example.org/{i}",
+               "category": rng.choice(CATEGORIES), "timestamp": start + i * 864}
+
+def scan(entries, query):
+    """Vertailukohta: lineaarinen osamerkkijonohaku kaikista kentistä."""
+    words = [w.lower() for w in query.replace('"', " ").split() if ":" not in w]
+    return [e for e in entries
+            if all(w in f"{e['title']} {e['summary']} {e['category']}".lower() for w in words)]
+
+def run_benchmark(items=200_000, repeats=5):
+    tmp_dir = tempfile.mkdtemp(prefix="jeeves_search_")
+    try:
+        entries = list(make_entries(items))
+        index = SearchIndex(os.path.join(tmp_dir, "search_index.db"))
+
+        start = time.perf_counter()
+        index.begin()
+        for i in range(0, items, 5000):
+            index.upsert(entries[i:i + 5000])
+        index.end()
+        index.optimize()
+        build_time = time.perf_counter() - start
+
+        # Yksittäiset päivitykset (add_entry / save_to_archive)
+        start = time.perf_counter()
+        for entry in entries[:200]:
+            index.upsert([dict(entry, summary=entry["summary"] + " analysed")])
+        upsert_ms = (time.perf_counter() - start) / 200 * 1000
+        assert index.count() == items
+
+        print(f"{'='*60}")
+        print(" JEEVES FULL-TEXT SEARCH BENCHMARK")
+        print(f"{'='*60}")
+        print(f"[*] Items:          {items:>10,}")
+        print(f"[*] Index build:    {build_time:>10,.2f} s ({os.path.getsize(index.path) / 1e6:,.1f} MB)")
+        print(f"[*] Single upsert:  {upsert_ms:>10,.2f} ms")
+        print(f"\n{'Query':<28}{'hits':>8}{'p50 ms':>10}{'scan ms':>10}")
+
+        for query in QUERIES:
+            times = []
+            for _ in range(repeats):
+                start = time.perf_counter()
+                hits = index.search(query, limit=50)
+                times.append((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            scan(entries, query)
+            scan_ms = (time.perf_counter() - start) * 1000
+            print(f"{query:<28}{len(hits):>8}{statistics.median(times):>10.2f}{scan_ms:>10.1f}")
+        index.close()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+Jeeves - Cold-start benchmark
+File: test/bench_startup.py
+
+Description: Imports every Flow entry point in a fresh interpreter with
+`python -X importtime` and reports the import time, the wall-clock time and
+the slowest imports. Each run is appended to archive/startup_history.jsonl,
+so a regression shows up as a delta against the previous run.
+Usage: python test/bench_startup.py [repeats]
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+
+# Lisätään juurikansio polkuun (kuten test_jeeves.py)
+test_folder = os.path.dirname(os.path.abspath(__file__))
+root_folder = os.path.dirname(test_folder)
+repo_folder = os.path.dirname(root_folder)
+
+HISTORY_FILE = os.path.join(root_folder, "archive", "startup_history.jsonl")
+
+# Nimi -> (kansio, moduuli tai tiedostopolku)
+ENTRY_POINTS = {
+    "jeeves_logic": (root_folder, "jeeves_logic"),
+    "jeeves": (root_folder, "jeeves"),
+    "ask_jeeves": (root_folder, "ask_jeeves"),
+    "jeeves_mirror": (root_folder, "jeeves_mirror"),
+    "jeeves_gui": (root_folder, "jeeves_gui"),
+    "linux-news": (os.path.join(repo_folder, "linux-news"), "linux-news.py"),
+    "gbridge": (os.path.join(repo_folder, "Gemini-bridge"), "gbridge.py"),
+    "clipboard_analyzer": (os.path.join(repo_folder, "Clipboard analyzer"), "clipboard_analyzer.py"),
+    "mmAnalyzer": (os.path.join(repo_folder, "Multi-Mode Gemini Bridge Analyzer"), "mmAnalyzer.py"),
+}
+
+def import_code(target):
+    """Python-koodi, joka tuo kohteen suorittamatta sen __main__-lohkoa."""
+    if target.endswith(".py"):
+        # Väliviivallisia tiedostonimiä (linux-news.py) ei voi tuoda import-lauseella
+        return ("import importlib.util, sys; sys.path.insert(0, '.'); "
+                f"spec = importlib.util.spec_from_file_location('entry', {target!r}); "
+                "spec.loader.exec_module(importlib.util.module_from_spec(spec))")
+    return f"import sys; sys.path.insert(0, '.'); import {target}"
+
+def parse_importtime(stderr):
+    """Palauttaa (kokonaisaika µs, [(kumulatiivinen µs, moduuli), ...]) -X importtime -tulosteesta."""
+    total = 0
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            total += int(self_us)
+            modules.append((int(cumulative_us), name.rstrip()))
+        except ValueError:
+            continue
+    return total, modules
+
+def measure(folder, target):
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", import_code(target)],
+        cwd=folder, capture_output=True, text=True, encoding="utf-8", errors="replace")
+    wall = time.perf_counter() - started
+
+    total, modules = parse_importtime(result.stderr)
+    error = None
+    if result.returncode != 0:
+        # Puuttuva riippuvuus tms.: otetaan talteen virheen viimeinen rivi
+        lines = [l for l in result.stderr.splitlines() if l and not l.startswith("import time:")]
+        error = lines[-1] if lines else f"exit code {result.returncode}"
+    return {"wall_ms": wall * 1000, "import_ms": total / 1000, "modules": modules, "error": error}
+
+def load_previous():
+    if not os.path.exists(HISTORY_FILE):
+        return {}
+    last = None
+    with open(HISTORY_FILE, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                last = line
+    try:
+        return json.loads(last).get("results", {}) if last else {}
+    except json.JSONDecodeError:
+        return {}
+
+def save_history(results):
+    os.makedirs(os.path.dirname(HISTORY_FILE), exist_ok=True)
+    record = {
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": sys.version.split()[0],
+        "results": results
+    }
+    with open(HISTORY_FILE, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+def run_benchmark(repeats=5, top=5):
+    previous = load_previous()
+    results = {}
+
+    print(f"{'='*60}")
+    print(" JEEVES COLD-START BENCHMARK (python -X importtime)")
+    print(f"{'='*60}")
+
+    for name, (folder, target) in ENTRY_POINTS.items():
+        if not os.path.exists(os.path.join(folder, target if target.endswith(".py") else target + ".py")):
+            print(f"[!] {name}: entry point not found, skipped.")
+            continue
+
+        # Paras (pienin) tulos useasta ajosta: vähentää käyttöjärjestelmän kohinaa
+        runs = [measure(folder, target) for _ in range(repeats)]
+        best = min(runs, key=lambda r: r["wall_ms"])
+        results[name] = {"wall_ms": round(best["wall_ms"], 1),
+                         "import_ms": round(best["import_ms"], 1),
+                         "error": best["error"]}
+
+        delta = ""
+        if name in previous:
+            diff = best["wall_ms"] - previous[name]["wall_ms"]
+            delta = f" ({diff:+.1f} ms vs. previous)"
+        print(f"\n[*] {name}: wall {best['wall_ms']:.1f} ms, imports {best['import_ms']:.1f} ms{delta}")
+        if best["error"]:
+            print(f"    [!] Import failed: {best['error']}")
+        for cumulative_us, module in sorted(best["modules"], reverse=True)[:top]:
+            print(f"    {cumulative_us / 1000:>8.1f} ms  {module.strip()}")
+
+    save_history(results)
+    print(f"\n[+] History appended to {HISTORY_FILE}")
+    return results
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -8,14 +8,18 @@ Description: Analyzes code from clipboard and saves reports to a dedicated folde
 """
 
 import os
+import sys
 import time
 import configparser
-import pyperclip
-from google import genai
+
+# Shared error handling (flow_resilience.py) lives in the Flow root folder
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from flow_resilience import call_with_retry, get_breaker, CircuitOpenError
 
 # --- CONSTANTS ---
 CONFIG_FILE = "clipboard_config.conf"
 REPORTS_DIR = "clipboard_reports"
+CIRCUIT_STATE_FILE = "circuit_state.json"
 
 def setup_analyzer():
     """Initializes config and reports directory."""
@@ -52,6 +56,7 @@ def run_analysis():
         return
 
     # Get code from clipboard
+    import pyperclip
     code_snippet = pyperclip.paste()
     if not code_snippet.strip():
         print("[!] Clipboard is empty! Copy some code from CodeBlocks first.")
@@ -59,37 +64,39 @@ def run_analysis():
 
     print(f"[*] Analyzing clipboard content (Length: {len(code_snippet)} characters)...")
 
+    from google import genai
     client = genai.Client(api_key=api_key)
     final_prompt = prompt_template.replace("{code}", code_snippet)
 
-    for i in range(attempts):
-        try:
-            response = client.models.generate_content(model=model_id, contents=final_prompt)
-            
-            # Create a unique filename for the report
-            timestamp = time.strftime("%Y%m%d_%H%M%S")
-            report_name = f"clipboard_analysis_{timestamp}.txt"
-            report_path = os.path.join(REPORTS_DIR, report_name)
-            
-            # Save the report
-            with open(report_path, "w", encoding="utf-8") as f:
-                f.write("CLIPBOARD ANALYSIS REPORT\n")
-                f.write(f"DATE: {time.ctime()}\n")
-                f.write("="*40 + "\n\n")
-                f.write(response.text)
-            
-            print("\n--- ANALYSIS SUCCESSFUL ---")
-            print(response.text)
-            print(f"\n[+] Saved to: {report_path}")
-            return
+    # The breaker remembers an exhausted quota between runs; waits follow the API's retry delay
+    breaker = get_breaker(f"gemini/{model_id}", CIRCUIT_STATE_FILE)
+    try:
+        response = call_with_retry(
+            lambda: client.models.generate_content(model=model_id, contents=final_prompt),
+            breaker, attempts=attempts,
+            on_retry=lambda e, kind, delay: print(f"{kind.capitalize()} error, retrying in {delay:.0f}s..."))
+    except CircuitOpenError as e:
+        print(f"[!] Quota full, skipping: {e}")
+        return
+    except Exception as e:
+        print(f"Error: {e}")
+        return
+
+    # Create a unique filename for the report
+    timestamp = time.strftime("%Y%m%d_%H%M%S")
+    report_name = f"clipboard_analysis_{timestamp}.txt"
+    report_path = os.path.join(REPORTS_DIR, report_name)
+
+    # Save the report
+    with open(report_path, "w", encoding="utf-8") as f:
+        f.write("CLIPBOARD ANALYSIS REPORT\n")
+        f.write(f"DATE: {time.ctime()}\n")
+        f.write("="*40 + "\n\n")
+        f.write(response.text)
 
-        except Exception as e:
-            if "429" in str(e):
-                print(f"Quota full, retrying {i+1}/{attempts} in 30s...")
-                time.sleep(30)
-            else:
-                print(f"Error: {e}")
-                break
+    print("\n--- ANALYSIS SUCCESSFUL ---")
+    print(response.text)
+    print(f"\n[+] Saved to: {report_path}")
 
 if __name__ == "__main__":
     run_analysis()
@@ -7,13 +7,18 @@ Description: Professional AI bridge for source code analysis with Windows path s
 """
 
 import os
+import sys
 import time
 import configparser
-from google import genai
+
+# Shared error handling (flow_resilience.py) lives in the Flow root folder
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from flow_resilience import call_with_retry, get_breaker, CircuitOpenError
 
 # --- CONSTANTS ---
 CONFIG_FILE = "gbridge_config.conf"
 REPORTS_DIR = "analysis_reports"
+CIRCUIT_STATE_FILE = "circuit_state.json"
 
 def setup_bridge():
     """Initializes the configuration and reports directory if missing."""
@@ -65,37 +70,41 @@ def run_bridge():
         print(f"[!] Read error: {e}")
         return
 
+    # Import the SDK only once there is something to analyze
+    from google import genai
     client = genai.Client(api_key=api_key)
     final_prompt = prompt_template.replace("{code}", source_code)
     print(f"[*] Analyzing: {input_path} using {model_id}...")
 
-    for i in range(attempts):
-        try:
-            response = client.models.generate_content(model=model_id, contents=final_prompt)
-            print("\n--- ANALYSIS SUCCESSFUL ---")
-
-            # Extract only the filename (basename) for the report to avoid path errors
-            file_only = os.path.basename(input_path)
-            ts = time.strftime("%Y%m%d_%H%M")
-            report_name = f"analysis_{file_only}_{ts}.txt"
-            report_path = os.path.join(REPORTS_DIR, report_name)
-
-            with open(report_path, "w", encoding="utf-8") as f:
-                f.write(f"FILE: {input_path}\nDATE: {time.ctime()}\n")
-                f.write("="*40 + "\n\n")
-                f.write(response.text)
-
-            print(f"[+] Report saved to: {report_path}\n")
-            print(response.text)
-            return
-
-        except Exception as e:
-            if "429" in str(e):
-                print(f"Quota exhausted, retrying {i+1}/{attempts} in 30s...")
-                time.sleep(30)
-            else:
-                print(f"Error during attempt {i+1}: {e}")
-                time.sleep(2)
+    # The breaker remembers an exhausted quota between runs; waits follow the API's retry delay
+    breaker = get_breaker(f"gemini/{model_id}", CIRCUIT_STATE_FILE)
+    try:
+        response = call_with_retry(
+            lambda: client.models.generate_content(model=model_id, contents=final_prompt),
+            breaker, attempts=attempts,
+            on_retry=lambda e, kind, delay: print(f"[*] {kind.capitalize()} error, retrying in {delay:.0f}s: {e}"))
+    except CircuitOpenError as e:
+        print(f"[!] Quota exhausted, skipping: {e}")
+        return
+    except Exception as e:
+        print(f"[!] Error: {e}")
+        return
+
+    print("\n--- ANALYSIS SUCCESSFUL ---")
+
+    # Extract only the filename (basename) for the report to avoid path errors
+    file_only = os.path.basename(input_path)
+    ts = time.strftime("%Y%m%d_%H%M")
+    report_name = f"analysis_{file_only}_{ts}.txt"
+    report_path = os.path.join(REPORTS_DIR, report_name)
+
+    with open(report_path, "w", encoding="utf-8") as f:
+        f.write(f"FILE: {input_path}\nDATE: {time.ctime()}\n")
+        f.write("="*40 + "\n\n")
+        f.write(response.text)
+
+    print(f"[+] Report saved to: {report_path}\n")
+    print(response.text)
 
 if __name__ == "__main__":
     run_bridge()
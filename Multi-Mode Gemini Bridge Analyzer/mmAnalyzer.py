@@ -8,15 +8,19 @@ Description: Hybrid analyzer (File/Clipboard/Static) with Latin-1 fallback suppo
 """
 
 import os
+import sys
 import time
 import configparser
-import pyperclip
-from google import genai
+
+# Shared error handling (flow_resilience.py) lives in the Flow root folder
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from flow_resilience import call_with_retry, get_breaker, CircuitOpenError
 
 # --- CONSTANTS ---
 CONFIG_FILE = "mmAnalyzer_config.conf"
 REPORTS_DIR = "analysis_reports"
 DEFAULT_INPUT = "input_code.txt"
+CIRCUIT_STATE_FILE = "circuit_state.json"
 
 def setup_bridge():
     """Initializes config, reports directory and default input file."""
@@ -83,6 +87,7 @@ def run_bridge():
 
     # 2. CLIPBOARD MODE
     elif not user_input:
+        import pyperclip
         source_code = pyperclip.paste().strip()
         if source_code:
             origin_name = "clipboard_content"
@@ -99,12 +104,20 @@ def run_bridge():
         return
 
     # ANALYSIS LOGIC
+    from google import genai
     client = genai.Client(api_key=api_key)
     prompt = config['PROMPT'].get('template').replace("{code}", source_code)
 
+    model_id = config['SETTINGS'].get('model_id')
+    attempts = int(config['SETTINGS'].get('attempts', 3))
+    breaker = get_breaker(f"gemini/{model_id}", CIRCUIT_STATE_FILE)
+
     print(f"[*] Analyzing {origin_name}...")
     try:
-        response = client.models.generate_content(model=config['SETTINGS'].get('model_id'), contents=prompt)
+        response = call_with_retry(
+            lambda: client.models.generate_content(model=model_id, contents=prompt),
+            breaker, attempts=attempts,
+            on_retry=lambda e, kind, delay: print(f"[*] {kind.capitalize()} error, retrying in {delay:.0f}s..."))
 
         # Save Report
         ts = time.strftime("%Y%m%d_%H%M%S")
@@ -114,6 +127,8 @@ def run_bridge():
 
         print("\n" + "="*30 + "\n" + response.text + "\n" + "="*30)
         print(f"[+] Saved to: {report_path}")
+    except CircuitOpenError as e:
+        print(f"[!] Quota full, skipping: {e}")
     except Exception as e:
         print(f"[!] API Error: {e}")
 
@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+"""
+Flow Resilience: shared error handling for every AI caller in Flow
+License: GPLv3
+Version: 1.0
+Author: Tuomas Lähteenmäki
+Description: Error classification (quota / transient / permanent), jittered
+backoff that honors Retry-After and Gemini's retryDelay, and a per-provider
+circuit breaker whose state survives between runs. An open breaker makes
+calls fail instantly instead of burning a request to rediscover that the
+quota is exhausted.
+
+Usage:
+    breaker = get_breaker("gemini/gemini-2.0-flash", "circuit_state.json")
+    response = call_with_retry(lambda: client.models.generate_content(...), breaker)
+"""
+
+import json
+import os
+import random
+import re
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+QUOTA = "quota"
+TRANSIENT = "transient"
+PERMANENT = "permanent"
+
+DEFAULTS = {
+    "attempts": 3,
+    "failure_threshold": 3,   # peräkkäiset tilapäisvirheet ennen katkaisua
+    "reset_timeout": 60.0,    # sekuntia, kunnes avattu katkaisin kokeilee uudelleen
+    "quota_cooldown": 300.0,  # kiintiökatkon kesto, jos palvelu ei kerro viivettä
+    "base_delay": 1.0,
+    "max_delay": 60.0,
+    "max_wait": 30.0,         # pidempiä odotuksia ei nukuta, vaan kutsu ohitetaan
+}
+
+QUOTA_STATUS = {429}
+TRANSIENT_STATUS = {408, 409, 500, 502, 503, 504}
+PERMANENT_STATUS = {400, 401, 403, 404, 422}
+
+QUOTA_MARKERS = ("RESOURCE_EXHAUSTED", "RATE LIMIT", "RATE_LIMIT", "QUOTA", "TOO MANY REQUESTS")
+TRANSIENT_MARKERS = ("UNAVAILABLE", "DEADLINE_EXCEEDED", "INTERNAL", "OVERLOADED", "TIMED OUT", "TIMEOUT")
+PERMANENT_MARKERS = ("INVALID_ARGUMENT", "PERMISSION_DENIED", "NOT_FOUND", "UNAUTHENTICATED", "API KEY NOT VALID")
+
+RETRY_DELAY_PATTERNS = (
+    re.compile(r"retryDelay['\"]?\s*[:=]\s*['\"]?(\d+(?:\.\d+)?)s", re.IGNORECASE),
+    re.compile(r"retry (?:in|after) (\d+(?:\.\d+)?)\s*s", re.IGNORECASE),
+)
+
+class CircuitOpenError(Exception):
+    """Katkaisin on auki: kutsua ei lähetetty lainkaan."""
+
+    def __init__(self, name, remaining, reason=None):
+        self.name = name
+        self.remaining = remaining
+        self.reason = reason
+        super().__init__(f"{name}: circuit open for {remaining:.0f}s ({reason or 'errors'})")
+
+# --- VIRHEIDEN LUOKITTELU ---
+
+def _status_code(exc):
+    for attr in ("status_code", "code", "status"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(exc, "response", None)
+    value = getattr(response, "status_code", None) or getattr(response, "status", None)
+    return value if isinstance(value, int) else None
+
+def classify_error(exc):
+    """Palauttaa QUOTA, TRANSIENT tai PERMANENT."""
+    if isinstance(exc, CircuitOpenError):
+        return QUOTA if exc.reason == QUOTA else TRANSIENT
+
+    status = _status_code(exc)
+    if status in QUOTA_STATUS:
+        return QUOTA
+    if status in TRANSIENT_STATUS:
+        return TRANSIENT
+    if status in PERMANENT_STATUS:
+        return PERMANENT
+
+    text = str(exc).upper()
+    if "429" in text or any(marker in text for marker in QUOTA_MARKERS):
+        return QUOTA
+    if any(marker in text for marker in PERMANENT_MARKERS):
+        return PERMANENT
+    if isinstance(exc, (TimeoutError, ConnectionError)) or any(marker in text for marker in TRANSIENT_MARKERS):
+        return TRANSIENT
+    # Tuntematon virhe: yritetään uudelleen rajallisesti
+    return TRANSIENT
+
+def retry_after(exc):
+    """Palvelun pyytämä odotus sekunteina (Retry-After tai Geminin retryDelay) tai None."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or getattr(exc, "headers", None)
+    if headers:
+        try:
+            value = headers.get("retry-after") or headers.get("Retry-After")
+        except AttributeError:
+            value = None
+        if value:
+            try:
+                return max(0.0, float(value))
+            except ValueError:
+                try:
+                    return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+                except (TypeError, ValueError):
+                    pass
+
+    # google-genai: yksityiskohdat ovat virheen tekstissä / details-kentässä
+    text = str(exc) + str(getattr(exc, "details", ""))
+    for pattern in RETRY_DELAY_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            return float(match.group(1))
+    return None
+
+def backoff_delay(attempt, base_delay=1.0, max_delay=60.0, hint=None):
+    """Täysi jitter (0 ... base*2^attempt); palvelun vihje on alaraja."""
+    delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+    if hint is not None:
+        delay = hint + random.uniform(0, base_delay)
+    return delay
+
+# --- KATKAISIN ---
+
+class CircuitBreaker:
+    """Yhden tarjoajan (esim. 'gemini/gemini-2.0-flash') katkaisin: closed -> open -> half-open."""
+
+    def __init__(self, name, board, settings):
+        self.name = name
+        self.board = board
+        self.settings = settings
+        self.probing = False
+
+    @property
+    def state(self):
+        return self.board.state(self.name)
+
+    def allow(self):
+        """True, jos kutsun saa lähettää. Aukiolon jälkeen päästetään yksi koekutsu."""
+        with self.board.lock:
+            state = self.board.state(self.name)
+            if state["opened_until"] <= time.time():
+                if state["opened_until"] and self.probing:
+                    return False
+                self.probing = bool(state["opened_until"])
+                return True
+            return False
+
+    def check(self):
+        """Nostaa CircuitOpenError, jos katkaisin on auki."""
+        if not self.allow():
+            state = self.state
+            raise CircuitOpenError(self.name, max(0.0, state["opened_until"] - time.time()), state["reason"])
+
+    def release(self):
+        with self.board.lock:
+            self.probing = False
+
+    def record_success(self):
+        with self.board.lock:
+            self.probing = False
+            state = self.board.state(self.name)
+            changed = state["failures"] or state["opened_until"]
+            state.update(failures=0, opened_until=0.0, reason=None)
+        if changed:
+            self.board.save()
+
+    def record_failure(self, kind, hint=None):
+        """Kiintiövirhe avaa katkaisimen heti; tilapäisvirheet vasta kynnyksen jälkeen."""
+        with self.board.lock:
+            self.probing = False
+            state = self.board.state(self.name)
+            if kind == PERMANENT:
+                return
+            state["failures"] += 1
+            if kind == QUOTA:
+                cooldown = hint if hint is not None else self.settings["quota_cooldown"]
+            elif state["failures"] >= self.settings["failure_threshold"]:
+                cooldown = self.settings["reset_timeout"]
+            else:
+                cooldown = 0
+            if cooldown:
+                state.update(opened_until=time.time() + cooldown, reason=kind)
+        self.board.save()
+
+class CircuitBoard:
+    """Kaikkien katkaisimien tila yhdessä JSON-tiedostossa (säilyy ajojen välillä)."""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.RLock()
+        self.states = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.states = json.load(f)
+            except (OSError, ValueError):
+                self.states = {}
+
+    def state(self, name):
+        return self.states.setdefault(name, {"failures": 0, "opened_until": 0.0, "reason": None})
+
+    def save(self):
+        with self.lock:
+            payload = json.dumps(self.states, indent=2)
+        try:
+            folder = os.path.dirname(self.path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+            tmp_path = f"{self.path}.tmp.{threading.get_ident()}"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(payload)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"[!] Could not save circuit state: {e}")
+
+_boards = {}
+_breakers = {}
+_registry_lock = threading.Lock()
+
+def get_breaker(name, state_path, settings=None):
+    """Palauttaa prosessinlaajuisen katkaisimen; sama tilatiedosto jaetaan kaikkien kesken."""
+    state_path = os.path.abspath(state_path)
+    with _registry_lock:
+        key = (state_path, name)
+        if key not in _breakers:
+            board = _boards.setdefault(state_path, CircuitBoard(state_path))
+            _breakers[key] = CircuitBreaker(name, board, dict(DEFAULTS, **(settings or {})))
+        return _breakers[key]
+
+def read_settings(config, section="RESILIENCE"):
+    """Lukee DEFAULTS-avaimet configparser-lohkosta (puuttuvat oletuksina)."""
+    settings = dict(DEFAULTS)
+    if config is None or section not in config:
+        return settings
+    for key, default in DEFAULTS.items():
+        if key in config[section]:
+            try:
+                settings[key] = type(default)(float(config[section][key]))
+            except ValueError:
+                print(f"[!] Invalid [{section}] {key} = {config[section][key]}")
+    return settings
+
+# --- UUDELLEENYRITYS ---
+
+def call_with_retry(fn, breaker, attempts=None, on_retry=None, sleep=time.sleep):
+    """Kutsuu fn():ää katkaisimen ja jitteröidyn uudelleenyrityksen suojaamana.
+
+    Pysyvä virhe nostetaan heti. Jos palvelun pyytämä odotus on pidempi kuin
+    max_wait, ei nukuta vaan nostetaan CircuitOpenError (katkaisin on jo auki).
+    on_retry(exc, kind, delay) kutsutaan ennen jokaista odotusta.
+    """
+    settings = breaker.settings
+    attempts = max(1, int(attempts or settings["attempts"]))
+    for attempt in range(attempts):
+        breaker.check()
+        try:
+            result = fn()
+        except Exception as exc:
+            kind = classify_error(exc)
+            hint = retry_after(exc)
+            breaker.record_failure(kind, hint)
+            if kind == PERMANENT or attempt == attempts - 1:
+                raise
+            delay = backoff_delay(attempt, settings["base_delay"], settings["max_delay"], hint)
+            if kind == QUOTA and hint is None:
+                raise
+            if delay > settings["max_wait"]:
+                raise CircuitOpenError(breaker.name, delay, kind) from exc
+            if on_retry:
+                on_retry(exc, kind, delay)
+            sleep(delay)
+        else:
+            if result is None:
+                breaker.release()
+            else:
+                breaker.record_success()
+            return result
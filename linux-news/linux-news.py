@@ -7,16 +7,20 @@ Author: Tuomas Lähteenmäki
 Description: Automated AI-based Linux news reader with your key words.
 """
 
-from google import genai
 import os
-import time
+import sys
 import configparser
 from datetime import datetime
 
+# Jaettu virheenkäsittely (flow_resilience.py) on Flow-juurikansiossa
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from flow_resilience import call_with_retry, get_breaker, CircuitOpenError
+
 # --- CONSTANTS ---
 CONFIG_FILE = "config.conf"
 KEYWORDS_FILE = "keywords.txt"
 REPORTS_DIR = "reports"
+CIRCUIT_STATE_FILE = "circuit_state.json"
 
 def setup_environment():
     """Initializes files and folders on the first run."""
@@ -64,6 +68,8 @@ def fetch_linux_news():
         print("[!] Update the API key in the config.conf file!")
         return
 
+    # SDK tuodaan vasta, kun asetukset on todettu kunnossa oleviksi
+    from google import genai
     client = genai.Client(api_key=api_key)
 
     # Luetaan hakusanat
@@ -76,27 +82,28 @@ def fetch_linux_news():
     # Yhdistetään hakusanat prompt-pohjaan
     final_prompt = prompt_template.replace("{topics}", topics_string)
 
-    for attempt in range(3):
-        try:
-            response = client.models.generate_content(model=model_id, contents=final_prompt)
-
-            timestamp = datetime.now().strftime("%Y-%m-%d_%H%M")
-            filename = os.path.join(REPORTS_DIR, f"news_report_{timestamp}.txt")
+    # Katkaisin muistaa täyden kiintiön ajojen välillä; odotus noudattaa palvelun retryDelay-arvoa
+    breaker = get_breaker(f"gemini/{model_id}", CIRCUIT_STATE_FILE)
+    try:
+        response = call_with_retry(
+            lambda: client.models.generate_content(model=model_id, contents=final_prompt),
+            breaker, attempts=3,
+            on_retry=lambda e, kind, delay: print(f"{kind.capitalize()} error, retrying in {delay:.0f}s..."))
+    except CircuitOpenError as e:
+        print(f"Quota full, skipping this run: {e}")
+        return
+    except Exception as e:
+        print(f"Error: {e}")
+        return
 
-            with open(filename, "w", encoding="utf-8") as f:
-                f.write(f"--- REPORT ---\nTime: {datetime.now()}\n\n")
-                f.write(response.text)
+    timestamp = datetime.now().strftime("%Y-%m-%d_%H%M")
+    filename = os.path.join(REPORTS_DIR, f"news_report_{timestamp}.txt")
 
-            print(f"Succeeded! Saved: {filename}")
-            return
+    with open(filename, "w", encoding="utf-8") as f:
+        f.write(f"--- REPORT ---\nTime: {datetime.now()}\n\n")
+        f.write(response.text)
 
-        except Exception as e:
-            if "429" in str(e):
-                print("Quota full, please wait 30s...")
-                time.sleep(30)
-            else:
-                print(f"Error: {e}")
-                break
+    print(f"Succeeded! Saved: {filename}")
 
 if __name__ == "__main__":
     fetch_linux_news()